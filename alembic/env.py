@@ -24,8 +24,9 @@ fileConfig(config.config_file_name)
 #   DEFINE SQLALCHEMY MODELS
 # ------------------------------------
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Boolean, Date, DateTime, Text, JSON, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.dialects.mysql import LONGTEXT
 
 Base = declarative_base()
 
@@ -51,20 +52,74 @@ class Documents(Base):
 
 class OCRFiles(Base):
     __tablename__ = "ocr_files"
+    __table_args__ = (Index("ix_ocr_files_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
 
     metadata_file = Column(JSON)
-    extracted_text = Column(Text)
     status = Column(String(20), default="pending")
 
+    # Full text ada di ocr_texts, di sini hanya ringkasan untuk status/list
+    text_length = Column(Integer, nullable=False, server_default="0")
+    text_preview = Column(String(500))
+    error_message = Column(String(1000))
+
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+
+class OCRTexts(Base):
+    __tablename__ = "ocr_texts"
+
+    ocr_id = Column(Integer, ForeignKey("ocr_files.id", ondelete="CASCADE"), primary_key=True)
+    extracted_text = Column(LONGTEXT)
+
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+
+class OCRPages(Base):
+    __tablename__ = "ocr_pages"
+    __table_args__ = (
+        UniqueConstraint("ocr_id", "page_number", name="uq_ocr_pages_ocr_page"),
+        Index("ft_ocr_pages_text", "extracted_text", mysql_prefix="FULLTEXT"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ocr_id = Column(Integer, ForeignKey("ocr_files.id", ondelete="CASCADE"), nullable=False)
+
+    page_number = Column(Integer, nullable=False)
+    method = Column(String(20), nullable=False, server_default="ocr")
+    extracted_text = Column(Text)
+    char_count = Column(Integer, default=0)
+
     created_at = Column(DateTime)
+
+
+class OCRStats(Base):
+    __tablename__ = "ocr_stats"
+
+    status = Column(String(20), primary_key=True)
+    file_count = Column(BigInteger, nullable=False, server_default="0")
+
     updated_at = Column(DateTime)
 
 
+class OCRStatsDaily(Base):
+    __tablename__ = "ocr_stats_daily"
+
+    stat_date = Column(Date, primary_key=True)
+    status = Column(String(20), primary_key=True)
+
+    job_count = Column(Integer, nullable=False, server_default="0")
+    pages = Column(BigInteger, nullable=False, server_default="0")
+    processing_seconds = Column(Float, nullable=False, server_default="0")
+
+
 class CompressedFiles(Base):
     __tablename__ = "compressed_files"
+    __table_args__ = (Index("ix_compressed_files_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
@@ -77,6 +132,48 @@ class CompressedFiles(Base):
     updated_at = Column(DateTime)
 
 
+class Jobs(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_status_created_at", "status", "created_at"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    uuid = Column(String(64), nullable=False, unique=True)
+
+    tool = Column(String(30), nullable=False)
+    status = Column(String(20), nullable=False, server_default="queued")
+    progress = Column(Integer, nullable=False, server_default="0")
+    params = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+
+    created_at = Column(DateTime)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+
+class ProcessingProfiles(Base):
+    __tablename__ = "processing_profiles"
+    __table_args__ = (
+        Index("ix_processing_profiles_ocr_id", "ocr_id"),
+        Index("ix_processing_profiles_job_id", "job_id"),
+        Index("ix_processing_profiles_tool_created_at", "tool", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tool = Column(String(30), nullable=False)
+    ocr_id = Column(Integer, ForeignKey("ocr_files.id", ondelete="CASCADE"))
+    job_id = Column(String(64))
+
+    status = Column(String(20))
+    pages = Column(Integer)
+    input_bytes = Column(BigInteger)
+    total_seconds = Column(Float)
+    profile = Column(JSON)
+
+    created_at = Column(DateTime)
+
+
 # TARGET METADATA FOR MIGRATIONS
 target_metadata = Base.metadata
 
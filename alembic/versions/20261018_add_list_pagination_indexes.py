@@ -0,0 +1,24 @@
+"""add (created_at, id) indexes for keyset pagination on list endpoints
+
+Revision ID: add_list_pagination_indexes
+Revises: create_ocr_pages_table
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "add_list_pagination_indexes"
+down_revision = "create_ocr_pages_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ORDER BY created_at DESC, id DESC + cursor (created_at, id) di /ocr/list dan /compress/list
+    op.create_index("ix_ocr_files_created_at_id", "ocr_files", ["created_at", "id"])
+    op.create_index("ix_compressed_files_created_at_id", "compressed_files", ["created_at", "id"])
+
+
+def downgrade():
+    op.drop_index("ix_compressed_files_created_at_id", table_name="compressed_files")
+    op.drop_index("ix_ocr_files_created_at_id", table_name="ocr_files")
@@ -0,0 +1,86 @@
+"""add FULLTEXT index on ocr_pages for OCR search
+
+Revision ID: add_ocr_pages_fulltext
+Revises: create_ocr_stats_tables
+Create Date: 2026-10-18
+"""
+import re
+import json
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "add_ocr_pages_fulltext"
+down_revision = "create_ocr_stats_tables"
+branch_labels = None
+depends_on = None
+
+PAGE_MARKER_RE = re.compile(r"^===== PAGE (\d+) =====$", re.MULTILINE)
+BATCH_SIZE = 200
+
+
+def page_methods(metadata_file):
+    """{page: method} dari ocr_files.metadata_file → pages[].method (kosong jika tidak ada)"""
+    try:
+        metadata = json.loads(metadata_file) if isinstance(metadata_file, (str, bytes)) else metadata_file
+        return {p["page"]: p.get("method") for p in (metadata or {}).get("pages", [])}
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return {}
+
+
+def backfill_pages(conn):
+    """
+    Dokumen lama hanya punya halaman OCR di ocr_pages (checkpoint).
+    Pecah full text di ocr_texts per halaman agar halaman text layer ikut terindex.
+    Metode per halaman diambil dari metadata_file (fallback 'ocr', sama seperti
+    complete_ocr_from_cache). Halaman yang sudah ada tidak ditimpa.
+    """
+    last_id = 0
+    now = datetime.now()
+
+    while True:
+        rows = conn.execute(sa.text("""
+            SELECT t.ocr_id, t.extracted_text, o.metadata_file
+            FROM ocr_texts t
+            JOIN ocr_files o ON o.id = t.ocr_id
+            WHERE t.ocr_id > :last_id AND o.status = 'completed'
+            ORDER BY t.ocr_id
+            LIMIT :batch
+        """), {"last_id": last_id, "batch": BATCH_SIZE}).fetchall()
+
+        if not rows:
+            break
+
+        for ocr_id, full_text, metadata_file in rows:
+            methods = page_methods(metadata_file)
+            parts = PAGE_MARKER_RE.split(full_text or "")
+            pages = [
+                {
+                    "ocr_id": ocr_id,
+                    "page_number": int(parts[i]),
+                    "method": methods.get(int(parts[i])) or "ocr",
+                    "text": parts[i + 1].strip(),
+                    "char_count": len(parts[i + 1].strip()),
+                    "created_at": now,
+                }
+                for i in range(1, len(parts) - 1, 2)
+            ]
+            if pages:
+                conn.execute(sa.text("""
+                    INSERT IGNORE INTO ocr_pages (ocr_id, page_number, method, extracted_text, char_count, created_at)
+                    VALUES (:ocr_id, :page_number, :method, :text, :char_count, :created_at)
+                """), pages)
+
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    backfill_pages(op.get_bind())
+
+    # InnoDB FULLTEXT: ter-update otomatis setiap INSERT/UPDATE ocr_pages
+    op.execute("ALTER TABLE ocr_pages ADD FULLTEXT INDEX ft_ocr_pages_text (extracted_text)")
+
+
+def downgrade():
+    op.execute("ALTER TABLE ocr_pages DROP INDEX ft_ocr_pages_text")
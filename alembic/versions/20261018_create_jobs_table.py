@@ -0,0 +1,39 @@
+"""create jobs table (unified async job status)
+
+Revision ID: create_jobs_table
+Revises: add_ocr_pages_fulltext
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "create_jobs_table"
+down_revision = "add_ocr_pages_fulltext"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # jobs: status tunggal semua job tool (compress, convert, merge, split)
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("uuid", sa.String(64), nullable=False, unique=True),  # juga Celery task id
+        sa.Column("tool", sa.String(30), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default=sa.text("'queued'")),
+        sa.Column("progress", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("params", sa.JSON),
+        sa.Column("result", sa.JSON),
+        sa.Column("error", sa.Text),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("started_at", sa.DateTime),
+        sa.Column("finished_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+    )
+    op.create_index("ix_jobs_status_created_at", "jobs", ["status", "created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_jobs_status_created_at", table_name="jobs")
+    op.drop_table("jobs")
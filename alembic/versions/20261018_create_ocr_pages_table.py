@@ -0,0 +1,33 @@
+"""create ocr_pages table (per-page OCR checkpoints)
+
+Revision ID: create_ocr_pages_table
+Revises: create_convert_merge_split_tables
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "create_ocr_pages_table"
+down_revision = "create_convert_merge_split_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ocr_pages table: hasil per halaman, dipakai untuk resume OCR saat retry
+    op.create_table(
+        "ocr_pages",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("ocr_id", sa.Integer, sa.ForeignKey("ocr_files.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("page_number", sa.Integer, nullable=False),
+        sa.Column("method", sa.String(20), nullable=False, server_default=sa.text("'ocr'")),
+        sa.Column("extracted_text", sa.Text),
+        sa.Column("char_count", sa.Integer, default=0),
+        sa.Column("created_at", sa.DateTime),
+        sa.UniqueConstraint("ocr_id", "page_number", name="uq_ocr_pages_ocr_page"),
+    )
+
+
+def downgrade():
+    op.drop_table("ocr_pages")
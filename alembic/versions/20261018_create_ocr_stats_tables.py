@@ -0,0 +1,65 @@
+"""create ocr_stats and ocr_stats_daily counter tables
+
+Revision ID: create_ocr_stats_tables
+Revises: split_ocr_texts
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "create_ocr_stats_tables"
+down_revision = "split_ocr_texts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Gauge: jumlah file per status saat ini
+    op.create_table(
+        "ocr_stats",
+        sa.Column("status", sa.String(20), primary_key=True),
+        sa.Column("file_count", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime),
+    )
+
+    # Per hari: job yang masuk ke status tsb, halaman + detik proses untuk 'completed'
+    op.create_table(
+        "ocr_stats_daily",
+        sa.Column("stat_date", sa.Date, primary_key=True),
+        sa.Column("status", sa.String(20), primary_key=True),
+        sa.Column("job_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("pages", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("processing_seconds", sa.Float, nullable=False, server_default="0"),
+    )
+
+    # Isi awal dari data yang sudah ada
+    op.execute("""
+        INSERT INTO ocr_stats (status, file_count, updated_at)
+        SELECT status, COUNT(*), NOW()
+        FROM ocr_files
+        WHERE status IS NOT NULL
+        GROUP BY status
+    """)
+    op.execute("""
+        INSERT INTO ocr_stats_daily (stat_date, status, job_count, pages, processing_seconds)
+        SELECT DATE(o.created_at), 'processing', COUNT(*), 0, 0
+        FROM ocr_files o
+        WHERE o.created_at IS NOT NULL
+        GROUP BY DATE(o.created_at)
+    """)
+    op.execute("""
+        INSERT INTO ocr_stats_daily (stat_date, status, job_count, pages, processing_seconds)
+        SELECT DATE(o.updated_at), o.status, COUNT(*),
+               SUM(CASE WHEN o.status = 'completed' THEN COALESCE(d.total_page, 0) ELSE 0 END),
+               SUM(CASE WHEN o.status = 'completed' THEN TIMESTAMPDIFF(SECOND, o.created_at, o.updated_at) ELSE 0 END)
+        FROM ocr_files o
+        JOIN documents d ON o.document_id = d.id
+        WHERE o.status IN ('completed', 'failed') AND o.updated_at IS NOT NULL
+        GROUP BY DATE(o.updated_at), o.status
+    """)
+
+
+def downgrade():
+    op.drop_table("ocr_stats_daily")
+    op.drop_table("ocr_stats")
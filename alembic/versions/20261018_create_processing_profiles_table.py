@@ -0,0 +1,42 @@
+"""create processing_profiles table (per-job stage timing & resource usage)
+
+Revision ID: create_processing_profiles_table
+Revises: create_jobs_table
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "create_processing_profiles_table"
+down_revision = "create_jobs_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Satu row per eksekusi task (termasuk retry dan chunk OCR paralel).
+    # Kolom ringkas untuk query agregat, detail lengkap di kolom profile (JSON).
+    op.create_table(
+        "processing_profiles",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("tool", sa.String(30), nullable=False),  # ocr, ocr_chunk, ocr_finalize, compress, merge, ...
+        sa.Column("ocr_id", sa.Integer, sa.ForeignKey("ocr_files.id", ondelete="CASCADE")),
+        sa.Column("job_id", sa.String(64)),  # jobs.uuid
+        sa.Column("status", sa.String(20)),
+        sa.Column("pages", sa.Integer),
+        sa.Column("input_bytes", sa.BigInteger),
+        sa.Column("total_seconds", sa.Float),
+        sa.Column("profile", sa.JSON),
+        sa.Column("created_at", sa.DateTime),
+    )
+    op.create_index("ix_processing_profiles_ocr_id", "processing_profiles", ["ocr_id"])
+    op.create_index("ix_processing_profiles_job_id", "processing_profiles", ["job_id"])
+    op.create_index("ix_processing_profiles_tool_created_at", "processing_profiles", ["tool", "created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_processing_profiles_tool_created_at", table_name="processing_profiles")
+    op.drop_index("ix_processing_profiles_job_id", table_name="processing_profiles")
+    op.drop_index("ix_processing_profiles_ocr_id", table_name="processing_profiles")
+    op.drop_table("processing_profiles")
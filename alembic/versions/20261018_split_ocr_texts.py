@@ -0,0 +1,71 @@
+"""move full OCR text from ocr_files to ocr_texts
+
+Revision ID: split_ocr_texts
+Revises: add_list_pagination_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+revision = "split_ocr_texts"
+down_revision = "add_list_pagination_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ocr_texts: full text, hanya dibaca oleh detail/text endpoint
+    op.create_table(
+        "ocr_texts",
+        sa.Column("ocr_id", sa.Integer, sa.ForeignKey("ocr_files.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("extracted_text", mysql.LONGTEXT),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime),
+    )
+
+    # ocr_files tetap sempit: status poll cukup membaca kolom ini
+    op.add_column("ocr_files", sa.Column("text_length", sa.Integer, nullable=False, server_default="0"))
+    op.add_column("ocr_files", sa.Column("text_preview", sa.String(500)))
+    op.add_column("ocr_files", sa.Column("error_message", sa.String(1000)))
+
+    # Pindahkan data lama
+    op.execute("""
+        INSERT INTO ocr_texts (ocr_id, extracted_text, created_at, updated_at)
+        SELECT id, extracted_text, created_at, updated_at
+        FROM ocr_files
+        WHERE status <> 'failed' AND extracted_text IS NOT NULL AND extracted_text <> ''
+    """)
+    op.execute("""
+        UPDATE ocr_files
+        SET text_length = CHAR_LENGTH(extracted_text), text_preview = LEFT(extracted_text, 500)
+        WHERE status <> 'failed' AND extracted_text IS NOT NULL
+    """)
+    op.execute("""
+        UPDATE ocr_files
+        SET error_message = LEFT(extracted_text, 1000)
+        WHERE status = 'failed'
+    """)
+
+    op.drop_column("ocr_files", "extracted_text")
+
+
+def downgrade():
+    op.add_column("ocr_files", sa.Column("extracted_text", sa.Text))
+
+    op.execute("""
+        UPDATE ocr_files o
+        JOIN ocr_texts t ON t.ocr_id = o.id
+        SET o.extracted_text = t.extracted_text
+    """)
+    op.execute("""
+        UPDATE ocr_files
+        SET extracted_text = error_message
+        WHERE status = 'failed'
+    """)
+
+    op.drop_column("ocr_files", "error_message")
+    op.drop_column("ocr_files", "text_preview")
+    op.drop_column("ocr_files", "text_length")
+    op.drop_table("ocr_texts")
@@ -1,21 +1,33 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_swagger_ui import get_swaggerui_blueprint
 from flask_cors import CORS, cross_origin
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import PyPDF2
 import uuid
-from pdf2image import convert_from_path
-import pytesseract
-from PIL import Image
 import mysql.connector
 from mysql.connector import Error
 import json
 import subprocess
 from dotenv import load_dotenv
+from celery.exceptions import TimeoutError as CeleryTimeoutError
 from tasks import ocr_task
-from tools_config import GHOSTSCRIPT_PATH, LIBREOFFICE_PATH, POPPLER_PATH
+from ocr_pipeline import iter_selected_page_images, classify_pages, extraction_method
+import ocr_cache
+import ocr_engine
+import ocr_stats
+import progress_events
+import metrics
+import job_profile
+from tools_config import GHOSTSCRIPT_PATH, POPPLER_PATH
+import jobs
+import tool_handlers
+import pdf_merge
+import zip_stream
+import db
+from db import get_db_connection, db_cursor
 
 app = Flask(__name__)
 
@@ -77,11 +89,62 @@ os.makedirs(MERGED_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['COMPRESSED_FOLDER'] = COMPRESSED_FOLDER
 app.config['OUTPUT_OCR_FOLDER'] = OUTPUT_OCR_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Max 16MB
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Max 16MB (default semua endpoint)
 app.config['CONVERTED_FOLDER'] = CONVERTED_FOLDER
 app.config['SPLIT_FOLDER'] = SPLIT_FOLDER
 app.config['MERGED_FOLDER'] = MERGED_FOLDER
 
+# Folder yang bisa didownload lewat /download/<folder>/... dan /download/zip
+DOWNLOAD_FOLDERS = {
+    "ocr": OUTPUT_OCR_FOLDER,
+    "compressed": COMPRESSED_FOLDER,
+    "converted": CONVERTED_FOLDER,
+    "splitted": SPLIT_FOLDER,
+    "merged": MERGED_FOLDER,
+}
+
+# Folder output yang boleh dipakai sebagai input merge tanpa upload ulang (sources[])
+MERGE_REFERENCE_FOLDERS = {
+    "converted": CONVERTED_FOLDER,
+    "compressed": COMPRESSED_FOLDER,
+    "splitted": SPLIT_FOLDER,
+    "merged": MERGED_FOLDER,
+}
+
+# Maksimal file per download ZIP /download/zip?files=...
+ZIP_MAX_FILES = int(os.getenv("ZIP_MAX_FILES", 500))
+
+# simple-ocr / simple-ocr-save: English + Indonesian @300 DPI
+SIMPLE_OCR_LANG = "eng+ind"
+SIMPLE_OCR_DPI = 300
+
+# File PDF di atas ukuran ini dikompres di Celery (async), sisanya langsung
+COMPRESS_ASYNC_THRESHOLD = int(os.getenv("COMPRESS_ASYNC_THRESHOLD", 5 * 1024 * 1024))
+
+# Endpoint tool menunggu hasil job maksimal sekian detik, selebihnya return 202
+JOB_SYNC_DEADLINE = float(os.getenv("JOB_SYNC_DEADLINE", 10))
+
+# Jumlah gambar maksimal per request convert-image-to-pdf (files[])
+CONVERT_IMAGE_MAX_FILES = int(os.getenv("CONVERT_IMAGE_MAX_FILES", 100))
+
+# Batas upload khusus convert-image-to-pdf: TIFF multi-halaman dari scanner bisa 300+ MB.
+# Werkzeug menulis file upload > 500KB ke temporary file (bukan memory) saat parsing,
+# save_upload lalu menyalinnya per chunk.
+CONVERT_IMAGE_MAX_UPLOAD = int(os.getenv("CONVERT_IMAGE_MAX_UPLOAD", 512 * 1024 * 1024))
+LARGE_UPLOAD_LIMITS = {
+    "convert_image_to_pdf": CONVERT_IMAGE_MAX_UPLOAD,
+}
+# Sama untuk POST /docs/api/tools/jobs, per tool. Form belum di-parse saat batas dipasang,
+# jadi tool dikirim lewat query string: POST /docs/api/tools/jobs?tool=convert-image
+LARGE_UPLOAD_JOB_LIMITS = {
+    "convert-image": CONVERT_IMAGE_MAX_UPLOAD,
+}
+UPLOAD_COPY_BUFFER = 1024 * 1024
+
+# Pagination endpoint list (ocr/list, compress/list)
+LIST_DEFAULT_LIMIT = int(os.getenv("LIST_DEFAULT_LIMIT", 50))
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", 200))
+
 # ==================== DATABASE CONFIGURATION ====================
 # Konfigurasi untuk DBngin (Mac)
 # DBngin biasanya menggunakan port berbeda, cek di aplikasi DBngin
@@ -93,23 +156,6 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', 3306)),
 }
 
-def get_db_connection():
-    """Get connection to dokumi database using environment variables"""
-    try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', '127.0.0.1'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASS', ''),
-            database=os.getenv('DB_NAME', 'dokumi'),
-            port=int(os.getenv('DB_PORT', 3306)),
-            charset='utf8mb4',
-            use_unicode=True
-        )
-        return connection
-    except Error as e:
-        print(f"Error connecting to dokumi database: {e}")
-        return None
-
 def init_database():
     """Inisialisasi database dan tabel"""
     try:
@@ -287,9 +333,6 @@ def get_compress_from_db(file_id):
 
 # ===================== OCR AND COMPRESS helper function ===========================
 def create_documents_entry(original_filename, file_path, file_type, size, total_page):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     sql = """
         INSERT INTO documents 
         (uuid, file_name, type, size, total_page, file_path, 
@@ -301,40 +344,34 @@ def create_documents_entry(original_filename, file_path, file_type, size, total_
     uuid_str = uuid.uuid4().hex
     now = datetime.now()
 
-    cursor.execute(sql, (
-        uuid_str,
-        original_filename,
-        file_type,
-        size,
-        total_page,
-        file_path,
-        now, now, now
-    ))
-    conn.commit()
+    with db_cursor() as cursor:
+        cursor.execute(sql, (
+            uuid_str,
+            original_filename,
+            file_type,
+            size,
+            total_page,
+            file_path,
+            now, now, now
+        ))
+        document_id = cursor.lastrowid
 
-    document_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
     return document_id
 
 
 def create_ocr_entry(document_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     sql = """
-        INSERT INTO ocr_files (document_id, metadata_file, extracted_text, status, created_at, updated_at)
-        VALUES (%s, %s, %s, %s, %s, %s)
+        INSERT INTO ocr_files (document_id, metadata_file, status, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, %s)
     """
 
     now = datetime.now()
 
-    cursor.execute(sql, (document_id, "{}", "", "processing", now, now))
-    conn.commit()
+    with db_cursor() as cursor:
+        cursor.execute(sql, (document_id, "{}", "processing", now, now))
+        ocr_id = cursor.lastrowid
+        ocr_stats.record_created(cursor, "processing", now)
 
-    ocr_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
     return ocr_id
 
 
@@ -350,58 +387,62 @@ def update_ocr_status(ocr_id, status, extracted_text="", metadata_file=None):
     # Convert to str explicitly (safety)
     extracted_text = str(extracted_text)
 
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Jika ingin juga menyimpan metadata JSON (opsional)
-        if metadata_file is not None:
-            sql = """
-                UPDATE ocr_files
-                SET status=%s, extracted_text=%s, metadata_file=%s, updated_at=%s
-                WHERE id=%s
-            """
-            params = (status, extracted_text, metadata_file, datetime.now(), ocr_id)
-        else:
-            sql = """
-                UPDATE ocr_files
-                SET status=%s, extracted_text=%s, updated_at=%s
-                WHERE id=%s
-            """
-            params = (status, extracted_text, datetime.now(), ocr_id)
-
-        cursor.execute(sql, params)
-        conn.commit()
+    now = datetime.now()
+    sets = ["status=%s", "updated_at=%s"]
+    params = [status, now]
+
+    # Jika ingin juga menyimpan metadata JSON (opsional)
+    if metadata_file is not None:
+        sets.append("metadata_file=%s")
+        params.append(metadata_file)
+
+    # Full text disimpan di ocr_texts, ocr_files hanya menyimpan ringkasan
+    # sehingga status poll tidak ikut membaca LONGTEXT
+    if status == "failed":
+        sets.append("error_message=%s")
+        params.append(extracted_text[:1000])
+    elif extracted_text:
+        sets.extend(["text_length=%s", "text_preview=%s"])
+        params.extend([len(extracted_text), extracted_text[:500]])
 
-        cursor.close()
-        conn.close()
+    try:
+        with db_cursor() as cursor:
+            ocr_stats.record_transition(cursor, ocr_id, status, now)
+            cursor.execute(f"UPDATE ocr_files SET {', '.join(sets)} WHERE id=%s", params + [ocr_id])
+
+            if status != "failed" and extracted_text:
+                cursor.execute("""
+                    INSERT INTO ocr_texts (ocr_id, extracted_text, created_at, updated_at)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE extracted_text=VALUES(extracted_text), updated_at=VALUES(updated_at)
+                """, (ocr_id, extracted_text, now, now))
+
+        if status == "failed":
+            metrics.count_failure("ocr")
+        if status in ("completed", "failed"):
+            progress_events.ocr_finished(ocr_id, status, error=extracted_text[:1000] if status == "failed" else None)
         return True
 
     except Error as e:
         # Anda bisa mengganti print dengan logger jika tersedia
         print(f"[update_ocr_status] MySQL Error: {e}")
-        try:
-            if cursor:
-                cursor.close()
-            if conn and conn.is_connected():
-                conn.close()
-        except:
-            pass
         return False
 
-def insert_ocr_page(document_id, page_number, text):
+def insert_ocr_page(ocr_id, page_number, text, method="ocr"):
+    """Simpan hasil satu halaman ke ocr_pages (checkpoint per halaman)"""
     try:
-        connection = get_connection()
-        cursor = connection.cursor()
-
         query = """
-            INSERT INTO ocr_files (document_id, page_number, extracted_text, status)
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO ocr_pages (ocr_id, page_number, method, extracted_text, char_count, created_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                method=VALUES(method), extracted_text=VALUES(extracted_text),
+                char_count=VALUES(char_count), created_at=VALUES(created_at)
         """
-        cursor.execute(query, (document_id, page_number, text, "completed"))
-        connection.commit()
+        with db_cursor() as cursor:
+            cursor.execute(query, (ocr_id, page_number, method, text, len(text), datetime.now()))
+            page_id = cursor.lastrowid
 
-        return cursor.lastrowid
+        return page_id
 
     except Exception as e:
         print("DB Error (insert_ocr_page):", e)
@@ -409,9 +450,6 @@ def insert_ocr_page(document_id, page_number, text):
 
 
 def create_compressed_entry(document_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     now = datetime.now()
 
     sql = """
@@ -419,32 +457,99 @@ def create_compressed_entry(document_id):
         VALUES (%s, %s, %s, %s, %s, %s)
     """
 
-    cursor.execute(sql, (document_id, "processing", None, None, now, now))
-    conn.commit()
+    with db_cursor() as cursor:
+        cursor.execute(sql, (document_id, "processing", None, None, now, now))
+        compress_id = cursor.lastrowid
 
-    compress_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
     return compress_id
 
 
-def update_compress_status(compress_id, status, output_path=None, output_size=None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def parse_list_args(args):
+    """
+    Parse query string endpoint list (keyset pagination):
+    ?after=<created_at>,<id>&limit=&status=&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    Raise ValueError jika parameter tidak valid.
+    """
+    limit = int(args.get('limit', LIST_DEFAULT_LIMIT))
+    limit = max(1, min(limit, LIST_MAX_LIMIT))
+
+    after = None
+    if args.get('after'):
+        created_at_str, _, id_str = args['after'].rpartition(',')
+        after = (datetime.fromisoformat(created_at_str), int(id_str))
+
+    date_from = None
+    if args.get('date_from'):
+        date_from = datetime.strptime(args['date_from'], '%Y-%m-%d')
+
+    # date_to inklusif: ambil sampai akhir hari tersebut
+    date_to = None
+    if args.get('date_to'):
+        date_to = datetime.strptime(args['date_to'], '%Y-%m-%d') + timedelta(days=1)
+
+    return {
+        'limit': limit,
+        'after': after,
+        'status': args.get('status') or None,
+        'date_from': date_from,
+        'date_to': date_to,
+    }
+
 
-    sql = """
-        UPDATE compressed_files 
-        SET status=%s, extracted_path=%s, extracted_size=%s, updated_at=%s
-        WHERE id=%s
+def keyset_where(alias, list_args):
+    """
+    WHERE clause untuk filter + cursor. Urutan list: created_at DESC, id DESC,
+    sehingga memakai index (created_at, id) tanpa OFFSET.
     """
+    clauses = []
+    params = []
 
-    now = datetime.now()
+    if list_args['status']:
+        clauses.append(f"{alias}.status = %s")
+        params.append(list_args['status'])
+
+    if list_args['date_from']:
+        clauses.append(f"{alias}.created_at >= %s")
+        params.append(list_args['date_from'])
+
+    if list_args['date_to']:
+        clauses.append(f"{alias}.created_at < %s")
+        params.append(list_args['date_to'])
+
+    if list_args['after']:
+        created_at, last_id = list_args['after']
+        clauses.append(f"({alias}.created_at < %s OR ({alias}.created_at = %s AND {alias}.id < %s))")
+        params.extend([created_at, created_at, last_id])
+
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    return where, params
+
+
+def keyset_page(rows, limit, id_key):
+    """Potong hasil query (LIMIT limit + 1) dan buat cursor halaman berikutnya"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows[-1]['created_at']:
+        next_cursor = f"{rows[-1]['created_at'].isoformat()},{rows[-1][id_key]}"
 
-    cursor.execute(sql, (status, output_path, output_size, now, compress_id))
-    conn.commit()
+    return rows, next_cursor
+
+
+def build_search_snippet(text, terms, width=200):
+    """Potongan teks di sekitar kemunculan pertama salah satu kata pencarian"""
+    text = " ".join((text or "").split())
+    lower = text.lower()
+
+    positions = [lower.find(term) for term in terms if term and lower.find(term) >= 0]
+    if not positions:
+        return text[:width] + ("..." if len(text) > width else "")
+
+    start = max(0, min(positions) - width // 3)
+    end = min(len(text), start + width)
+    return ("..." if start > 0 else "") + text[start:end] + ("..." if end < len(text) else "")
 
-    cursor.close()
-    conn.close()
 
 # ===================== END OF OCR AND COMPRESS helper function ====================
 
@@ -504,9 +609,6 @@ def compress_with_gs(input_path, output_path, quality="screen"):
 
 
 def create_convert_entry(document_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     uuid_str = uuid.uuid4().hex
     now = datetime.now()
 
@@ -515,37 +617,14 @@ def create_convert_entry(document_id):
         VALUES (%s, %s, %s, %s, %s)
     """
 
-    cursor.execute(sql, (uuid_str, document_id, "processing", now, now))
-    conn.commit()
+    with db_cursor() as cursor:
+        cursor.execute(sql, (uuid_str, document_id, "processing", now, now))
+        convert_id = cursor.lastrowid
 
-    convert_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
     return convert_id, uuid_str
 
 
-def update_convert_status(convert_id, status, converted_path=None, converted_file_name=None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    sql = """
-        UPDATE convert_files 
-        SET status=%s, converted_path=%s, converted_file_name=%s, updated_at=%s
-        WHERE id=%s
-    """
-
-    now = datetime.now()
-    cursor.execute(sql, (status, converted_path, converted_file_name, now, convert_id))
-    conn.commit()
-
-    cursor.close()
-    conn.close()
-
-
 def create_merge_entry(document_ids):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     now = datetime.now()
     document_ids_json = json.dumps(document_ids)
 
@@ -554,37 +633,14 @@ def create_merge_entry(document_ids):
         VALUES (%s, %s, %s, %s)
     """
 
-    cursor.execute(sql, (document_ids_json, "processing", now, now))
-    conn.commit()
+    with db_cursor() as cursor:
+        cursor.execute(sql, (document_ids_json, "processing", now, now))
+        merge_id = cursor.lastrowid
 
-    merge_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
     return merge_id
 
 
-def update_merge_status(merge_id, status, merged_path=None, merged_file_name=None, merged_size=None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    sql = """
-        UPDATE merge_files 
-        SET status=%s, merged_path=%s, merged_file_name=%s, merged_size=%s, updated_at=%s
-        WHERE id=%s
-    """
-
-    now = datetime.now()
-    cursor.execute(sql, (status, merged_path, merged_file_name, merged_size, now, merge_id))
-    conn.commit()
-
-    cursor.close()
-    conn.close()
-
-
 def create_split_entry(document_id):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     uuid_str = uuid.uuid4().hex
     now = datetime.now()
 
@@ -593,32 +649,13 @@ def create_split_entry(document_id):
         VALUES (%s, %s, %s, %s, %s)
     """
 
-    cursor.execute(sql, (uuid_str, document_id, "processing", now, now))
-    conn.commit()
+    with db_cursor() as cursor:
+        cursor.execute(sql, (uuid_str, document_id, "processing", now, now))
+        split_id = cursor.lastrowid
 
-    split_id = cursor.lastrowid
-    cursor.close()
-    conn.close()
     return split_id, uuid_str
 
 
-def update_split_status(split_id, status, splited_path=None, splited_file_name=None, splited_size=None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    sql = """
-        UPDATE split_files 
-        SET status=%s, splited_path=%s, splited_file_name=%s, splited_size=%s, updated_at=%s
-        WHERE id=%s
-    """
-
-    now = datetime.now()
-    cursor.execute(sql, (status, splited_path, splited_file_name, splited_size, now, split_id))
-    conn.commit()
-
-    cursor.close()
-    conn.close()
-
 # Callback to Sirama API
 def send_callback_to_sirama(letter_id, full_text, compressed_url):
     payload = {
@@ -640,6 +677,122 @@ def send_callback_to_sirama(letter_id, full_text, compressed_url):
         print("Callback failed:", callback_err)
 
 
+def hybrid_extract_text(reader, file_path, pdf_password=None):
+    """
+    Ekstraksi text per halaman untuk simple-ocr.
+    Halaman dengan text layer diambil via PyPDF2, hanya halaman
+    image-only yang dirasterisasi dan di-OCR dengan Tesseract.
+    """
+    classified_pages = classify_pages(reader)
+    total_pages = len(classified_pages)
+
+    page_texts = {p["page"]: p["text"] for p in classified_pages if p["method"] == "text_layer"}
+    ocr_page_numbers = [p["page"] for p in classified_pages if p["method"] == "ocr"]
+    pages_text_layer = len(page_texts)
+    pages_failed = 0
+
+    if ocr_page_numbers:
+        print(f"🔍 Processing {len(ocr_page_numbers)}/{total_pages} pages with Tesseract OCR...")
+
+        pages = iter_selected_page_images(
+            file_path,
+            ocr_page_numbers,
+            dpi=SIMPLE_OCR_DPI,
+            pdf_password=pdf_password,
+            poppler_path=POPPLER_PATH
+        )
+
+        for page_num, img in pages:
+            try:
+                page_text = ocr_engine.image_to_string(img, lang=SIMPLE_OCR_LANG).strip()
+
+                if page_text:
+                    print(f"✓ Page {page_num}/{total_pages} - {len(page_text)} characters")
+                else:
+                    print(f"⚠️  Page {page_num}/{total_pages} - No text detected")
+                    page_text = "[No text detected]"
+
+            except Exception as e_page:
+                page_text = f"Error: {str(e_page)}"
+                pages_failed += 1
+                print(f"✗ Page {page_num}/{total_pages} failed: {page_text}")
+
+            page_texts[page_num] = page_text
+
+    extracted_text = ""
+    for page_num in sorted(page_texts):
+        extracted_text += f"\n\n===== PAGE {page_num} =====\n{page_texts[page_num]}\n"
+
+    return {
+        "extracted_text": extracted_text,
+        "method": extraction_method(pages_text_layer, len(ocr_page_numbers)),
+        "pages_text_layer": pages_text_layer,
+        "pages_ocr": len(ocr_page_numbers),
+        "pages_failed": pages_failed,
+        "total_pages": total_pages
+    }
+
+
+def cached_or_extract_text(reader, file_path, pdf_password=None):
+    """
+    hybrid_extract_text dengan cache berbasis hash file.
+    Return (extraction, cache_hit)
+    """
+    # Key terpisah dari /ocr: format extracted_text berbeda (marker "===== PAGE n =====")
+    cache_key = ocr_cache.cache_key_for_file(file_path, lang=SIMPLE_OCR_LANG, dpi=SIMPLE_OCR_DPI, variant="simple")
+    cached = ocr_cache.get_cached_ocr(cache_key)
+    if cached:
+        return cached, True
+
+    extraction = hybrid_extract_text(reader, file_path, pdf_password)
+    if not extraction["pages_failed"]:
+        ocr_cache.set_cached_ocr(cache_key, extraction)
+    return extraction, False
+
+
+def complete_ocr_from_cache(cached, ocr_id, ocr_output_path, callback_data):
+    """
+    Selesaikan ocr_files row langsung dari cache tanpa lewat Celery:
+    tulis file hasil, update database, dan kirim callback ke SIRAMA.
+    """
+    from tasks import send_callback, split_full_text, save_search_pages
+
+    extracted_text = cached.get("extracted_text", "")
+    has_protection = not cached.get("pages_text_layer")
+    metadata_file = cached.get("metadata_file") or json.dumps({
+        "has_protection": has_protection,
+        "total_pages": cached.get("total_pages", 0),
+        "pages_text_layer": cached.get("pages_text_layer", 0),
+        "pages_ocr": cached.get("pages_ocr", 0)
+    })
+
+    with open(ocr_output_path, "w", encoding="utf-8") as f:
+        f.write(extracted_text)
+
+    update_ocr_status(ocr_id, "completed", extracted_text, metadata_file)
+
+    # Index per halaman untuk full-text search (metode per halaman dari metadata jika ada)
+    try:
+        methods = {p["page"]: p.get("method") for p in json.loads(metadata_file).get("pages", [])}
+    except (ValueError, TypeError, KeyError):
+        methods = {}
+    pages = split_full_text(extracted_text)
+    for page in pages:
+        page["method"] = methods.get(page["page"]) or "ocr"
+    save_search_pages(ocr_id, pages)
+
+    if callback_data and callback_data.get("letter_id"):
+        send_callback(
+            letter_id=callback_data["letter_id"],
+            extracted_text=extracted_text,
+            download_url=callback_data.get("download_url"),
+            has_protection=has_protection,
+            total_pages=cached.get("total_pages", 0)
+        )
+
+    return extracted_text
+
+
 # ==================== OCR ENDPOINT ====================
 @app.route('/docs/api/tools/ocr', methods=['POST'])
 def ocr_pdf():
@@ -665,11 +818,13 @@ def ocr_pdf():
         original_filename = secure_filename(file.filename)
         file_id = f"ocr_{uuid.uuid4().hex}_{original_filename}"
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_id)
-        file.save(file_path)
+        with metrics.stage_timer("upload_save"):
+            file.save(file_path)
 
         # Quick validation
         try:
-            reader = PyPDF2.PdfReader(file_path)
+            with metrics.stage_timer("pdf_parse"):
+                reader = PyPDF2.PdfReader(file_path)
             
             # Handle encryption early
             if reader.is_encrypted:
@@ -725,7 +880,32 @@ def ocr_pdf():
         ocr_filename = f"{uuid.uuid4().hex}_ocr.txt"
         ocr_output_path = os.path.join(ocr_folder, ocr_filename)
 
-        # 4. QUEUE TO CELERY
+        callback_data = {
+            "letter_id": letter_id,
+            "download_url": f"{BASE_URL}/download/ocr/{ocr_filename}"
+        }
+
+        # 4. CEK CACHE - file yang sama sudah pernah di-OCR, skip Celery
+        cache_key = ocr_cache.cache_key_for_file(file_path)
+        cached = ocr_cache.get_cached_ocr(cache_key)
+        if cached:
+            extracted_text = complete_ocr_from_cache(cached, ocr_id, ocr_output_path, callback_data)
+
+            return jsonify({
+                "status": "completed",
+                "message": "OCR diambil dari cache",
+                "cached": True,
+                "document_id": document_id,
+                "ocr_id": ocr_id,
+                "filename": original_filename,
+                "download_url": f"{BASE_URL}/download/ocr/{ocr_filename}",
+                "total_pages": total_pages,
+                "total_characters": len(extracted_text),
+                "letter_id": letter_id,
+                "check_status_url": f"{BASE_URL}/docs/api/tools/ocr/status/{ocr_id}"
+            }), 200
+
+        # 5. QUEUE TO CELERY
         from tasks import ocr_task_with_db
         
         task = ocr_task_with_db.delay(
@@ -734,13 +914,11 @@ def ocr_pdf():
             file_path=file_path,
             pdf_password=pdf_password,
             ocr_output_path=ocr_output_path,
-            callback_data={
-                "letter_id": letter_id,
-                "download_url": f"{BASE_URL}/download/ocr/{ocr_filename}"
-            }
+            callback_data=callback_data,
+            cache_key=cache_key
         )
 
-        # 5. RETURN IMMEDIATELY
+        # 6. RETURN IMMEDIATELY
         return jsonify({
             "status": "processing",
             "message": "OCR sedang diproses secara asynchronous",
@@ -758,60 +936,239 @@ def ocr_pdf():
         return jsonify({'error': str(e), 'status': 'failed'}), 500
 
 
+def fetch_ocr_status(ocr_id):
+    """Status OCR (kolom sempit saja, full text ada di ocr_texts). None jika tidak ada."""
+    query = """
+        SELECT o.id, o.document_id, o.status, o.text_length, o.text_preview, o.error_message,
+               o.created_at, o.updated_at, d.file_name, d.total_page
+        FROM ocr_files o
+        JOIN documents d ON o.document_id = d.id
+        WHERE o.id = %s
+    """
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute(query, (ocr_id,))
+        result = cursor.fetchone()
+
+    if not result:
+        return None
+
+    # Format response
+    response = {
+        'status': result['status'],
+        'ocr_id': result['id'],
+        'document_id': result['document_id'],
+        'filename': result['file_name'],
+        'total_pages': result['total_page'],
+        'created_at': result['created_at'].isoformat() if result['created_at'] else None,
+        'updated_at': result['updated_at'].isoformat() if result['updated_at'] else None
+    }
+
+    # Progress per halaman dari counter Redis (diisi worker)
+    if result['status'] in ('pending', 'processing'):
+        pages_done = progress_events.ocr_progress(result['id'])
+        if pages_done is not None:
+            response['pages_done'] = pages_done
+            if result['total_page']:
+                response['percent'] = min(100, int(pages_done * 100 / result['total_page']))
+
+    # Add preview if completed, full text lewat text_url
+    if result['status'] == 'completed' and result['text_length']:
+        response['text_length'] = result['text_length']
+        response['preview'] = result['text_preview'] + '...' if result['text_length'] > 500 else result['text_preview']
+        response['text_url'] = f"/docs/api/tools/ocr/text/{result['id']}"
+
+    # Add error if failed
+    if result['status'] == 'failed':
+        response['error'] = result['error_message'] or 'Unknown error'
+
+    return response
+
+
+def event_stream_response(generator):
+    """Response text/event-stream (tanpa buffering proxy)"""
+    return Response(
+        stream_with_context(generator),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @app.route('/docs/api/tools/ocr/status/<int:ocr_id>', methods=['GET'])
 def ocr_status(ocr_id):
     """
-    Check OCR status dari database
+    Check OCR status dari database.
+    ?wait=N (detik): long-poll, response ditahan sampai ada event progress/selesai
+    dari worker (Redis pub/sub) atau N detik lewat.
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed', 'status': 'failed'}), 500
-            
-        cursor = connection.cursor(dictionary=True)
+        wait = progress_events.parse_wait(request.args.get('wait'))
+    except ValueError:
+        return jsonify({'error': 'Parameter wait harus angka >= 0', 'status': 'failed'}), 400
+
+    pubsub = progress_events.subscribe(progress_events.ocr_channel(ocr_id)) if wait else None
+    try:
+        response = fetch_ocr_status(ocr_id)
+        if not response:
+            return jsonify({'error': 'OCR record not found', 'status': 'failed'}), 404
+
+        if response['status'] in ('pending', 'processing') and progress_events.wait_for_change(pubsub, wait):
+            response = fetch_ocr_status(ocr_id)
+
+        return jsonify(response), 200
         
-        # Get OCR record
+    except Exception as e:
+        return jsonify({'error': str(e), 'status': 'failed'}), 500
+
+    finally:
+        progress_events.close(pubsub)
+
+
+@app.route('/docs/api/tools/ocr/events/<int:ocr_id>', methods=['GET'])
+def ocr_events(ocr_id):
+    """
+    Server-Sent Events progress OCR: event status (snapshot), started, page,
+    completed/failed. Stream ditutup setelah event terminal atau PROGRESS_STREAM_MAX detik.
+    """
+    pubsub = progress_events.subscribe(progress_events.ocr_channel(ocr_id))
+    try:
+        snapshot = fetch_ocr_status(ocr_id)
+    except Exception as e:
+        progress_events.close(pubsub)
+        return jsonify({'error': str(e), 'status': 'failed'}), 500
+
+    if not snapshot:
+        progress_events.close(pubsub)
+        return jsonify({'error': 'OCR record not found', 'status': 'failed'}), 404
+
+    return event_stream_response(progress_events.stream(pubsub, snapshot))
+
+
+@app.route('/docs/api/tools/ocr/text/<int:ocr_id>', methods=['GET'])
+def get_ocr_text(ocr_id):
+    """
+    Full extracted text dari ocr_texts.
+    Query: format=txt untuk response text/plain
+    """
+    try:
         query = """
-            SELECT o.*, d.file_name, d.total_page, d.size 
+            SELECT o.id, o.status, t.extracted_text
             FROM ocr_files o
-            JOIN documents d ON o.document_id = d.id
+            LEFT JOIN ocr_texts t ON t.ocr_id = o.id
             WHERE o.id = %s
         """
-        cursor.execute(query, (ocr_id,))
-        result = cursor.fetchone()
-        
-        cursor.close()
-        connection.close()
-        
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute(query, (ocr_id,))
+            result = cursor.fetchone()
+
         if not result:
             return jsonify({'error': 'OCR record not found', 'status': 'failed'}), 404
-        
-        # Format response
-        response = {
-            'status': result['status'],
+
+        if result['status'] != 'completed':
+            return jsonify({
+                'error': f"OCR belum selesai (status: {result['status']})",
+                'status': 'failed'
+            }), 409
+
+        extracted_text = result['extracted_text'] or ""
+
+        if request.args.get('format') == 'txt':
+            return app.response_class(extracted_text, mimetype='text/plain; charset=utf-8')
+
+        return jsonify({
+            'status': 'success',
             'ocr_id': result['id'],
-            'document_id': result['document_id'],
-            'filename': result['file_name'],
-            'total_pages': result['total_page'],
-            'created_at': result['created_at'].isoformat() if result['created_at'] else None,
-            'updated_at': result['updated_at'].isoformat() if result['updated_at'] else None
-        }
-        
-        # Add extracted text if completed
-        if result['status'] == 'completed' and result['extracted_text']:
-            response['extracted_text'] = result['extracted_text']
-            response['text_length'] = len(result['extracted_text'])
-            response['preview'] = result['extracted_text'][:500] + '...' if len(result['extracted_text']) > 500 else result['extracted_text']
-        
-        # Add error if failed
-        if result['status'] == 'failed':
-            response['error'] = result.get('extracted_text', 'Unknown error')
-        
-        return jsonify(response), 200
-        
+            'text_length': len(extracted_text),
+            'extracted_text': extracted_text
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e), 'status': 'failed'}), 500
+
+@app.route('/docs/api/tools/ocr/search', methods=['GET'])
+def search_ocr():
+    """
+    Full-text search hasil OCR (FULLTEXT index di ocr_pages.extracted_text).
+    Query: q (wajib), limit (dokumen, default 20, max 100), mode=natural|boolean
+    Return dokumen urut relevansi, dengan nomor halaman dan snippet.
+    """
+    try:
+        q = (request.args.get('q') or '').strip()
+        if not q:
+            return jsonify({'error': 'Parameter q wajib diisi', 'status': 'failed'}), 400
+
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
+        mode = "IN BOOLEAN MODE" if request.args.get('mode') == 'boolean' else "IN NATURAL LANGUAGE MODE"
+
+        # Ambil halaman teratas dulu (index lookup), lalu kelompokkan per dokumen
+        page_query = f"""
+            SELECT p.ocr_id, p.page_number, p.extracted_text,
+                   MATCH(p.extracted_text) AGAINST (%s {mode}) AS score
+            FROM ocr_pages p
+            WHERE MATCH(p.extracted_text) AGAINST (%s {mode})
+            ORDER BY score DESC
+            LIMIT %s
+        """
+
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute(page_query, (q, q, limit * 10))
+            pages = cursor.fetchall()
+
+            ocr_ids = list(dict.fromkeys(p['ocr_id'] for p in pages))
+            documents = {}
+            if ocr_ids:
+                placeholders = ", ".join(["%s"] * len(ocr_ids))
+                cursor.execute(f"""
+                    SELECT o.id, o.document_id, o.status, d.file_name, d.total_page
+                    FROM ocr_files o
+                    JOIN documents d ON o.document_id = d.id
+                    WHERE o.id IN ({placeholders}) AND o.status = 'completed'
+                """, ocr_ids)
+                documents = {row['id']: row for row in cursor.fetchall()}
+
+        terms = [t.strip('+-<>()~*"').lower() for t in q.split()]
+
+        results = []
+        by_ocr_id = {}
+        for page in pages:
+            document = documents.get(page['ocr_id'])
+            if not document:
+                continue
+
+            result = by_ocr_id.get(page['ocr_id'])
+            if result is None:
+                if len(results) >= limit:
+                    continue
+                result = {
+                    'ocr_id': page['ocr_id'],
+                    'document_id': document['document_id'],
+                    'filename': document['file_name'],
+                    'total_pages': document['total_page'],
+                    'score': round(float(page['score']), 4),
+                    'pages': []
+                }
+                by_ocr_id[page['ocr_id']] = result
+                results.append(result)
+
+            result['pages'].append({
+                'page': page['page_number'],
+                'score': round(float(page['score']), 4),
+                'snippet': build_search_snippet(page['extracted_text'], terms)
+            })
+
+        return jsonify({
+            'status': 'success',
+            'query': q,
+            'count': len(results),
+            'data': results
+        }), 200
+
     except Exception as e:
         return jsonify({'error': str(e), 'status': 'failed'}), 500
 
+
 @app.route('/docs/api/tools/ocr-async', methods=['POST'])
 def ocr_async():
     """
@@ -974,85 +1331,29 @@ def simple_ocr():
             
             total_pages = len(reader.pages)
             
-            # Check apakah PDF punya text yang bisa di-extract (digital text)
-            has_extractable_text = False
-            digital_text = ""
-            
+            # Ekstraksi per halaman: text layer jika ada, OCR hanya untuk halaman image-only
             print(f"📄 Checking {total_pages} pages for extractable text...")
+            extraction, cache_hit = cached_or_extract_text(reader, temp_path, pdf_password)
             
-            for page_num, page in enumerate(reader.pages, start=1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text and page_text.strip():
-                        has_extractable_text = True
-                        digital_text += f"\n\n===== PAGE {page_num} =====\n{page_text.strip()}\n"
-                except:
-                    pass
+            messages = {
+                'digital_extraction': 'Text extraction completed (Digital PDF)',
+                'tesseract_ocr': 'OCR completed (Scanned PDF)',
+                'hybrid': 'Text extraction completed (Mixed PDF)'
+            }
             
-            # Tentukan metode OCR
-            if has_extractable_text:
-                # PDF Digital Text - sudah ada text
-                print(f"✓ PDF memiliki digital text - menggunakan PyPDF2 extraction")
-                
-                result = {
-                    'status': 'success',
-                    'message': 'Text extraction completed (Digital PDF)',
-                    'method': 'digital_extraction',
-                    'filename': original_filename,
-                    'total_pages': total_pages,
-                    'total_characters': len(digital_text),
-                    'extracted_text': digital_text.strip(),
-                    'has_copy_protection': False
-                }
-                
-            else:
-                # PDF Scan - perlu OCR dengan Tesseract
-                print(f"🔒 PDF tidak punya text atau protected - menggunakan Tesseract OCR")
-                
-                # Convert PDF to images
-                print(f"🖼️  Converting PDF to images (DPI: 300)...")
-                pages = convert_from_path(
-                    temp_path,
-                    dpi=300,
-                    fmt="png",
-                    userpw=pdf_password if pdf_password else None,
-                    poppler_path=POPPLER_PATH if POPPLER_PATH else None
-                )
-                
-                # OCR with Tesseract
-                ocr_lang = "eng+ind"  # English + Indonesian
-                full_text = ""
-                
-                print(f"🔍 Processing {len(pages)} pages with Tesseract OCR...")
-                
-                for page_num, img in enumerate(pages, start=1):
-                    try:
-                        # OCR per page
-                        page_text = pytesseract.image_to_string(img, lang=ocr_lang)
-                        page_text = page_text.strip()
-                        
-                        if page_text:
-                            full_text += f"\n\n===== PAGE {page_num} =====\n{page_text}\n"
-                            print(f"✓ Page {page_num}/{len(pages)} - {len(page_text)} characters")
-                        else:
-                            print(f"⚠️  Page {page_num}/{len(pages)} - No text detected")
-                            full_text += f"\n\n===== PAGE {page_num} =====\n[No text detected]\n"
-                        
-                    except Exception as e_page:
-                        error_msg = f"Error: {str(e_page)}"
-                        print(f"✗ Page {page_num}/{len(pages)} failed: {error_msg}")
-                        full_text += f"\n\n===== PAGE {page_num} =====\n{error_msg}\n"
-                
-                result = {
-                    'status': 'success',
-                    'message': 'OCR completed (Scanned PDF)',
-                    'method': 'tesseract_ocr',
-                    'filename': original_filename,
-                    'total_pages': total_pages,
-                    'total_characters': len(full_text),
-                    'extracted_text': full_text.strip(),
-                    'has_copy_protection': True
-                }
+            result = {
+                'status': 'success',
+                'message': messages[extraction['method']],
+                'method': extraction['method'],
+                'filename': original_filename,
+                'total_pages': total_pages,
+                'total_characters': len(extraction['extracted_text']),
+                'extracted_text': extraction['extracted_text'].strip(),
+                'pages_text_layer': extraction['pages_text_layer'],
+                'pages_ocr': extraction['pages_ocr'],
+                'has_copy_protection': extraction['pages_text_layer'] == 0,
+                'cached': cache_hit
+            }
             
             # Cleanup temporary file
             os.remove(temp_path)
@@ -1137,39 +1438,10 @@ def simple_ocr_save():
             
             total_pages = len(reader.pages)
             
-            # Check extractable text
-            has_extractable_text = False
-            extracted_text = ""
-            
-            for page_num, page in enumerate(reader.pages, start=1):
-                try:
-                    page_text = page.extract_text()
-                    if page_text and page_text.strip():
-                        has_extractable_text = True
-                        extracted_text += f"\n\n===== PAGE {page_num} =====\n{page_text.strip()}\n"
-                except:
-                    pass
-            
-            # If no extractable text, use OCR
-            if not has_extractable_text:
-                pages = convert_from_path(
-                    temp_path,
-                    dpi=300,
-                    fmt="png",
-                    userpw=pdf_password if pdf_password else None,
-                    poppler_path=POPPLER_PATH if POPPLER_PATH else None
-                )
-                
-                ocr_lang = "eng+ind"
-                extracted_text = ""
-                
-                for page_num, img in enumerate(pages, start=1):
-                    try:
-                        page_text = pytesseract.image_to_string(img, lang=ocr_lang)
-                        page_text = page_text.strip()
-                        extracted_text += f"\n\n===== PAGE {page_num} =====\n{page_text}\n"
-                    except Exception as e_page:
-                        extracted_text += f"\n\n===== PAGE {page_num} =====\nError: {str(e_page)}\n"
+            # Ekstraksi per halaman: text layer jika ada, OCR hanya untuk halaman image-only
+            extraction, cache_hit = cached_or_extract_text(reader, temp_path, pdf_password)
+            extracted_text = extraction['extracted_text']
+            has_extractable_text = extraction['pages_text_layer'] > 0
             
             # Save to file
             output_filename = f"{uuid.uuid4().hex}_ocr.txt"
@@ -1184,13 +1456,16 @@ def simple_ocr_save():
             return jsonify({
                 'status': 'success',
                 'message': 'OCR completed and saved to file',
-                'method': 'digital_extraction' if has_extractable_text else 'tesseract_ocr',
+                'method': extraction['method'],
                 'filename': original_filename,
                 'total_pages': total_pages,
                 'total_characters': len(extracted_text),
+                'pages_text_layer': extraction['pages_text_layer'],
+                'pages_ocr': extraction['pages_ocr'],
                 'output_file': output_filename,
                 'download_url': f"{BASE_URL}/download/ocr/{output_filename}",
-                'has_copy_protection': not has_extractable_text
+                'has_copy_protection': not has_extractable_text,
+                'cached': cache_hit
             }), 200
             
         except Exception as e:
@@ -1211,12 +1486,25 @@ def simple_ocr_save():
 def check_celery_task_status(task_id):
     """
     Check Celery task status (dari Celery backend)
+    ?wait=N (detik): long-poll sampai task selesai. Result backend Redis
+    memakai pub/sub, jadi selama menunggu tidak ada polling ke backend.
     """
     from celery.result import AsyncResult
     from tasks import celery
     
+    try:
+        wait = progress_events.parse_wait(request.args.get('wait'))
+    except ValueError:
+        return jsonify({'error': 'Parameter wait harus angka >= 0', 'status': 'failed'}), 400
+
     try:
         task = AsyncResult(task_id, app=celery)
+
+        if wait and not task.ready():
+            try:
+                task.get(timeout=wait, propagate=False)
+            except CeleryTimeoutError:
+                pass
         
         response = {
             'task_id': task_id,
@@ -1260,22 +1548,26 @@ def check_celery_task_status(task_id):
 @app.route('/docs/api/tools/ocr/list', methods=['GET'])
 def list_ocr_files():
     """
-    List semua OCR files dengan detail status
+    List OCR files dengan detail status (keyset pagination).
+    Query: after=<created_at>,<id>, limit, status, date_from, date_to
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed', 'status': 'failed'}), 500
-            
-        cursor = connection.cursor(dictionary=True)
-        
-        # Join dengan documents table untuk info lengkap
-        query = """
+        try:
+            list_args = parse_list_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid query parameter: {e}', 'status': 'failed'}), 400
+
+        where, params = keyset_where("o", list_args)
+
+        # Join dengan documents table untuk info lengkap.
+        # Preview dan panjang teks dari ringkasan di ocr_files, full text tidak ikut dibaca
+        query = f"""
             SELECT 
                 o.id as ocr_id,
                 o.document_id,
                 o.status,
-                o.extracted_text,
+                LEFT(o.text_preview, 200) as text_preview,
+                o.text_length,
                 o.metadata_file,
                 o.created_at,
                 o.updated_at,
@@ -1286,11 +1578,16 @@ def list_ocr_files():
                 d.file_path
             FROM ocr_files o
             JOIN documents d ON o.document_id = d.id
-            ORDER BY o.created_at DESC
+            {where}
+            ORDER BY o.created_at DESC, o.id DESC
+            LIMIT %s
         """
         
-        cursor.execute(query)
-        results = cursor.fetchall()
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute(query, params + [list_args['limit'] + 1])
+            results = cursor.fetchall()
+
+        results, next_cursor = keyset_page(results, list_args['limit'], 'ocr_id')
         
         # Format results
         formatted_results = []
@@ -1307,30 +1604,27 @@ def list_ocr_files():
             }
             
             # Add text preview jika ada
-            if row['extracted_text']:
-                text_length = len(row['extracted_text'])
-                formatted_row['text_length'] = text_length
-                formatted_row['text_preview'] = row['extracted_text'][:200] + '...' if text_length > 200 else row['extracted_text']
+            text_length = row['text_length'] or 0
+            formatted_row['text_length'] = text_length
+            if text_length:
+                formatted_row['text_preview'] = row['text_preview'] + '...' if text_length > 200 else row['text_preview']
             else:
-                formatted_row['text_length'] = 0
                 formatted_row['text_preview'] = None
             
             # Parse metadata if exists
             if row['metadata_file']:
                 try:
-                    import json
                     formatted_row['metadata'] = json.loads(row['metadata_file'])
                 except:
                     formatted_row['metadata'] = None
             
             formatted_results.append(formatted_row)
         
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             'status': 'success',
             'count': len(formatted_results),
+            'limit': list_args['limit'],
+            'next_cursor': next_cursor,
             'data': formatted_results
         }), 200
         
@@ -1347,15 +1641,10 @@ def get_ocr_detail(ocr_id):
     Get full OCR detail termasuk full extracted text
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed', 'status': 'failed'}), 500
-            
-        cursor = connection.cursor(dictionary=True)
-        
         query = """
             SELECT 
                 o.*,
+                t.extracted_text,
                 d.file_name,
                 d.type,
                 d.size,
@@ -1364,14 +1653,14 @@ def get_ocr_detail(ocr_id):
                 d.upload_at
             FROM ocr_files o
             JOIN documents d ON o.document_id = d.id
+            LEFT JOIN ocr_texts t ON t.ocr_id = o.id
             WHERE o.id = %s
         """
         
-        cursor.execute(query, (ocr_id,))
-        result = cursor.fetchone()
-        
-        cursor.close()
-        connection.close()
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute(query, (ocr_id,))
+            result = cursor.fetchone()
+            profiles = job_profile.load_for_ocr(cursor, ocr_id) if result else []
         
         if not result:
             return jsonify({
@@ -1391,10 +1680,13 @@ def get_ocr_detail(ocr_id):
                 'total_pages': result['total_page'],
                 'ocr_status': result['status'],
                 'extracted_text': result['extracted_text'],
-                'text_length': len(result['extracted_text']) if result['extracted_text'] else 0,
+                'text_length': result['text_length'] or 0,
+                'error': result['error_message'],
                 'created_at': result['created_at'].isoformat() if result['created_at'] else None,
                 'updated_at': result['updated_at'].isoformat() if result['updated_at'] else None,
-                'upload_at': result['upload_at'].isoformat() if result['upload_at'] else None
+                'upload_at': result['upload_at'].isoformat() if result['upload_at'] else None,
+                # Breakdown per attempt/chunk: stage, halaman, CPU, peak RSS, I/O
+                'profiles': profiles
             }
         }
         
@@ -1418,42 +1710,18 @@ def get_ocr_detail(ocr_id):
 @app.route('/docs/api/tools/ocr/stats', methods=['GET'])
 def get_ocr_stats():
     """
-    Get OCR processing statistics
+    Get OCR processing statistics dari counter ocr_stats (tanpa scan ocr_files).
+    Query: days (default 7, max 90) untuk window throughput
     """
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({'error': 'Database connection failed', 'status': 'failed'}), 500
-            
-        cursor = connection.cursor(dictionary=True)
-        
-        # Get statistics
-        stats_query = """
-            SELECT 
-                COUNT(*) as total_files,
-                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed,
-                SUM(CASE WHEN status = 'processing' THEN 1 ELSE 0 END) as processing,
-                SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed,
-                SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending
-            FROM ocr_files
-        """
-        
-        cursor.execute(stats_query)
-        stats = cursor.fetchone()
-        
-        cursor.close()
-        connection.close()
+        days = max(1, min(int(request.args.get('days', 7)), 90))
+
+        with db_cursor() as cursor:
+            stats = ocr_stats.read_stats(cursor, days=days)
         
         return jsonify({
             'status': 'success',
-            'statistics': {
-                'total_files': stats['total_files'] or 0,
-                'completed': stats['completed'] or 0,
-                'processing': stats['processing'] or 0,
-                'failed': stats['failed'] or 0,
-                'pending': stats['pending'] or 0,
-                'success_rate': round((stats['completed'] / stats['total_files'] * 100), 2) if stats['total_files'] > 0 else 0
-            }
+            'statistics': stats
         }), 200
         
     except Exception as e:
@@ -1462,6 +1730,31 @@ def get_ocr_stats():
             'status': 'failed'
         }), 500
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Metrics Prometheus dari semua worker gunicorn (multiprocess mode) +
+    panjang antrian Celery. Metrics Celery worker ada di METRICS_WORKER_PORT.
+    """
+    rendered = metrics.render()
+    if rendered is None:
+        return jsonify({'error': 'Metrics tidak tersedia (prometheus_client tidak terinstall)', 'status': 'failed'}), 503
+
+    body, content_type = rendered
+    return Response(body, mimetype=None, content_type=content_type)
+
+
+@app.route('/docs/api/tools/db/pool', methods=['GET'])
+def get_db_pool_stats():
+    """
+    Statistik connection pool MySQL milik worker process ini
+    """
+    return jsonify({
+        'status': 'success',
+        'pid': os.getpid(),
+        'pool': db.pool_stats()
+    }), 200
+
 def is_pdf_broken(path):
     """
     Mengembalikan True jika PDF rusak/pecah.
@@ -1495,146 +1788,64 @@ def compress_pdf():
     """
     Endpoint untuk mengkompress file PDF
     Optional form field: password (string) untuk PDF terenkripsi
+    Optional form field: async (true/false) langsung return 202 tanpa menunggu.
+    File di atas COMPRESS_ASYNC_THRESHOLD selalu langsung 202 + status URL,
+    sisanya ditunggu maksimal JOB_SYNC_DEADLINE detik.
     """
-    try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'Tidak ada file yang diupload', 'status': 'failed'}), 400
+    force_async = str(request.form.get('async', '')).lower() in ('1', 'true', 'yes')
 
-        file = request.files['file']
+    def deadline(info):
+        if force_async or info["original_size"] > COMPRESS_ASYNC_THRESHOLD:
+            return 0
+        return JOB_SYNC_DEADLINE
 
-        if file.filename == '':
-            return jsonify({'error': 'Tidak ada file yang dipilih', 'status': 'failed'}), 400
+    return run_tool_endpoint(prepare_compress_job, deadline=deadline)
 
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'File harus PDF', 'status': 'failed'}), 400
 
-        # Simpan file input
-        original_filename = secure_filename(file.filename)
-        file_id = f"cmp_{uuid.uuid4().hex}_{original_filename}"
-        input_path = os.path.join(app.config["UPLOAD_FOLDER"], file_id)
-        file.save(input_path)
-
-        # Output filename
-        compressed_name = f"{uuid.uuid4().hex}_compressed.pdf"
-        output_path = os.path.join(app.config["COMPRESSED_FOLDER"], compressed_name)
-
-        # Cek ukuran file original
-        original_size = os.path.getsize(input_path)
-
-        # Tentukan profile dan settings berdasarkan ukuran file
-        # Untuk file scan (biasanya lebih besar), gunakan settings lebih konservatif
-        if original_size > 5 * 1024 * 1024:  # > 5MB, kemungkinan scan
-            profile = "/ebook"
-            resolution = 150
-            jpeg_quality = 75
-        elif original_size > 2 * 1024 * 1024:  # > 2MB
-            profile = "/ebook"
-            resolution = 120
-            jpeg_quality = 70
-        else:  # File kecil (digital text)
-            profile = "/ebook"
-            resolution = 100
-            jpeg_quality = 65
-
-        # Ghostscript command dengan settings yang lebih aman untuk scan
-        gs_command = [
-            GHOSTSCRIPT_PATH,
-            "-sDEVICE=pdfwrite",
-            "-dCompatibilityLevel=1.4",
-            f"-dPDFSETTINGS={profile}",
-            
-            # Downsample dengan bicubic (lebih baik untuk scan)
-            "-dColorImageDownsampleType=/Bicubic",
-            f"-dColorImageResolution={resolution}",
-            "-dGrayImageDownsampleType=/Bicubic",
-            f"-dGrayImageResolution={resolution}",
-            "-dMonoImageDownsampleType=/Bicubic",
-            f"-dMonoImageResolution={resolution}",
-
-            # JPEG compression dengan quality lebih tinggi
-            "-dAutoFilterColorImages=false",
-            "-dAutoFilterGrayImages=false",
-            "-dColorImageFilter=/DCTEncode",
-            "-dGrayImageFilter=/DCTEncode",
-
-            # JPEG Quality lebih tinggi untuk scan
-            f"-dJPEGQ={jpeg_quality}",
-
-            # Preserve metadata dan struktur
-            "-dPreserveAnnots=true",
-            "-dPreserveEPSInfo=false",
-            "-dPreserveOPIComments=false",
-            "-dPreserveOverprintSettings=false",
-            
-            "-dNOPAUSE",
-            "-dQUIET",
-            "-dBATCH",
-            f"-sOutputFile={output_path}",
-            input_path
-        ]
-
-        # Jalankan kompresi
-        import subprocess
-        result = subprocess.run(gs_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        if result.returncode != 0:
-            return jsonify({
-                "status": "failed",
-                "error": "Gagal melakukan kompres PDF",
-                "detail": result.stderr.decode()
-            }), 500
-
-        # Validasi file hasil kompresi
-        if not os.path.exists(output_path):
-            return jsonify({
-                "status": "failed",
-                "error": "File hasil kompresi tidak ditemukan"
-            }), 500
+@app.route('/docs/api/tools/compress/status/<int:compress_id>', methods=['GET'])
+def compress_status(compress_id):
+    """
+    Check status kompresi asynchronous dari database
+    """
+    try:
+        query = """
+            SELECT c.id, c.document_id, c.status, c.extracted_path, c.extracted_size,
+                   c.created_at, c.updated_at, d.file_name, d.size, d.total_page
+            FROM compressed_files c
+            JOIN documents d ON c.document_id = d.id
+            WHERE c.id = %s
+        """
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute(query, (compress_id,))
+            result = cursor.fetchone()
 
-        compressed_size = os.path.getsize(output_path)
+        if not result:
+            return jsonify({'error': 'Compress record not found', 'status': 'failed'}), 404
 
-        # Cek jika file terlalu kecil (kemungkinan rusak)
-        # File PDF minimal sekitar 1KB, jika dibawah itu pasti rusak
-        if compressed_size < 1024:  # Kurang dari 1KB
-            os.remove(output_path)  # Hapus file rusak
-            return jsonify({
-                "status": "failed",
-                "error": "Kompresi menghasilkan file yang rusak. Coba dengan file PDF lain atau gunakan settingan berbeda."
-            }), 500
+        response = {
+            'status': result['status'],
+            'compress_id': result['id'],
+            'document_id': result['document_id'],
+            'filename': result['file_name'],
+            'total_pages': result['total_page'],
+            'original_size': parse_human_size(result['size']) if result['size'] else None,
+            'created_at': result['created_at'].isoformat() if result['created_at'] else None,
+            'updated_at': result['updated_at'].isoformat() if result['updated_at'] else None
+        }
 
-        # Cek jika kompresi terlalu agresif (> 95% reduction bisa indikasi masalah)
-        reduction_percent = 100 - ((compressed_size / original_size) * 100)
-        
-        if reduction_percent > 95:
-            os.remove(output_path)  # Hapus file yang kemungkinan rusak
-            return jsonify({
-                "status": "failed",
-                "error": "Kompresi terlalu agresif dan kemungkinan merusak file. File original mungkin sudah optimal atau memiliki format khusus."
-            }), 500
+        if result['status'] == 'completed' and result['extracted_path']:
+            compressed_size = parse_human_size(result['extracted_size']) if result['extracted_size'] else None
+            compressed_name = os.path.basename(result['extracted_path'])
 
-        # Jika kompresi malah memperbesar file (bisa terjadi pada file sudah optimal)
-        if compressed_size >= original_size:
-            os.remove(output_path)  # Hapus file hasil
-            return jsonify({
-                "status": "success",
-                "message": "File PDF sudah optimal, tidak perlu dikompres",
-                "original_size": original_size,
-                "compressed_size": original_size,
-                "reduction_percent": 0,
-                "note": "File original dikembalikan karena sudah dalam ukuran optimal"
-            })
+            response['compressed_size'] = compressed_size
+            if compressed_size and response['original_size']:
+                response['reduction_percent'] = round(100 - (compressed_size / response['original_size'] * 100), 2)
+            response['download_url'] = f"{BASE_URL}/download/compressed/{compressed_name}"
 
-        return jsonify({
-            "status": "success",
-            "message": "Berhasil mengkompres PDF",
-            "original_size": original_size,
-            "compressed_size": compressed_size,
-            "reduction_percent": round(reduction_percent, 2),
-            "download_url": f"{BASE_URL}/download/compressed/{compressed_name}"
-        })
+        return jsonify(response), 200
 
     except Exception as e:
-        return jsonify({'status': 'failed', 'error': str(e)}), 500
+        return jsonify({'error': str(e), 'status': 'failed'}), 500
 
 # ==================== INFO ENDPOINTS ====================
 @app.route('/docs/api/tools/ocr/info/<file_id>', methods=['GET'])
@@ -1682,28 +1893,46 @@ def get_compress_info(file_id):
 
 @app.route('/docs/api/tools/compress/list', methods=['GET'])
 def list_compress_files():
-    """Endpoint untuk mendapatkan semua file compressed dari database"""
+    """
+    Endpoint untuk mendapatkan file compressed dari database (keyset pagination).
+    Query: after=<created_at>,<id>, limit, status, date_from, date_to
+    """
     try:
-        connection = get_db_connection()
-        if connection:
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM compressed_files ORDER BY created_at DESC")
+        try:
+            list_args = parse_list_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid query parameter: {e}', 'status': 'failed'}), 400
+
+        where, params = keyset_where("c", list_args)
+
+        query = f"""
+            SELECT c.id, c.document_id, c.status, c.extracted_path, c.extracted_size,
+                   c.created_at, c.updated_at, d.file_name, d.size, d.total_page
+            FROM compressed_files c
+            JOIN documents d ON c.document_id = d.id
+            {where}
+            ORDER BY c.created_at DESC, c.id DESC
+            LIMIT %s
+        """
+
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute(query, params + [list_args['limit'] + 1])
             results = cursor.fetchall()
+
+        results, next_cursor = keyset_page(results, list_args['limit'], 'id')
             
-            # Konversi datetime ke string
-            for result in results:
-                result['upload_time'] = result['upload_time'].isoformat() if result['upload_time'] else None
-                result['created_at'] = result['created_at'].isoformat() if result['created_at'] else None
-                result['updated_at'] = result['updated_at'].isoformat() if result['updated_at'] else None
-            
-            cursor.close()
-            connection.close()
-            
-            return jsonify({
-                'status': 'success',
-                'count': len(results),
-                'data': results
-            }), 200
+        # Konversi datetime ke string
+        for result in results:
+            result['created_at'] = result['created_at'].isoformat() if result['created_at'] else None
+            result['updated_at'] = result['updated_at'].isoformat() if result['updated_at'] else None
+        
+        return jsonify({
+            'status': 'success',
+            'count': len(results),
+            'limit': list_args['limit'],
+            'next_cursor': next_cursor,
+            'data': results
+        }), 200
     except Error as e:
         return jsonify({
             'error': f'Database error: {str(e)}',
@@ -1793,13 +2022,7 @@ curl http://localhost:5000/docs/api/tools/compress/list</code></pre>
 @app.route('/download/<path:folder>/<path:filename>', methods=['GET'])
 #@cross_origin(origins="*")
 def download_file(folder, filename):
-    base_path = {
-        "ocr": app.config['OUTPUT_OCR_FOLDER'],
-        "compressed": app.config['COMPRESSED_FOLDER'],
-        "converted": app.config['CONVERTED_FOLDER'],
-        "splitted": app.config['SPLIT_FOLDER'],
-        "merged": app.config['MERGED_FOLDER'],
-    }.get(folder)
+    base_path = DOWNLOAD_FOLDERS.get(folder)
 
     if not base_path:
         return jsonify({"error": "Invalid folder"}), 400
@@ -1816,498 +2039,758 @@ def download_file(folder, filename):
         mimetype="application/pdf"
     )
 
-# ==================== NEW ENDPOINTS ====================
 
-@app.route('/docs/api/tools/convert-ppt-to-pdf', methods=['POST'])
-def convert_ppt_to_pdf():
+def parse_page_spans(page_ranges):
+    """ "1-3,5" → [(1, 3), (5, 5)] (nomor halaman mulai 1)"""
+    spans = []
+    for part in page_ranges.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition('-')
+        if not start.strip().isdigit() or (end and not end.strip().isdigit()):
+            raise ValueError(f'Format pages tidak valid: {part} (contoh: 1-3,5)')
+        start = int(start)
+        end = int(end) if end else start
+        if start < 1 or end < start:
+            raise ValueError(f'Range halaman tidak valid: {part}')
+        spans.append((start, end))
+    return spans
+
+
+def split_file_pages(filename):
+    """Halaman yang dicakup file hasil split: page_5.pdf → (5, 5), pages_1-3.pdf → (1, 3)"""
+    stem = os.path.splitext(filename)[0]
+    prefix, _, numbers = stem.partition('_')
+    start, _, end = numbers.partition('-')
+    if prefix not in ('page', 'pages') or not start.isdigit() or (end and not end.isdigit()):
+        return None
+    return int(start), int(end or start)
+
+
+def folder_zip_entries(folder_path, arc_prefix=""):
+    return [
+        (f"{arc_prefix}{name}", os.path.join(folder_path, name))
+        for name in sorted(os.listdir(folder_path))
+        if os.path.isfile(os.path.join(folder_path, name))
+    ]
+
+
+def zip_response(entries, download_name):
+    return Response(
+        stream_with_context(zip_stream.iter_zip(entries)),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{download_name}"'}
+    )
+
+
+@app.route('/download/zip/splitted/<split_folder>', methods=['GET'])
+def download_split_zip(split_folder):
     """
-    Endpoint untuk convert PPT/PPTX to PDF
+    Semua hasil split dalam satu ZIP (streaming, tidak dibuat di disk).
+    ?pages=1-3,5: hanya file yang mencakup salah satu halaman tersebut.
     """
-    convert_id = None  # Initialize to avoid NameError
-    try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'Tidak ada file yang diupload', 'status': 'failed'}), 400
+    folder_path = safe_join(app.config['SPLIT_FOLDER'], split_folder)
+    if not folder_path or not os.path.isdir(folder_path):
+        return jsonify({"error": "Folder not found"}), 404
 
-        file = request.files['file']
+    entries = folder_zip_entries(folder_path)
 
-        if file.filename == '':
-            return jsonify({'error': 'Tidak ada file yang dipilih', 'status': 'failed'}), 400
+    if request.args.get('pages'):
+        try:
+            wanted = parse_page_spans(request.args['pages'])
+        except ValueError as e:
+            return jsonify({'error': str(e), 'status': 'failed'}), 400
 
-        # Get file extension
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        
-        # Check file extension - support both .ppt and .pptx
-        if file_extension not in ['.ppt', '.pptx']:
-            return jsonify({'error': 'File harus berformat PPT atau PPTX', 'status': 'failed'}), 400
+        selected = []
+        for arcname, path in entries:
+            page_span = split_file_pages(arcname)
+            if page_span and any(start <= page_span[1] and page_span[0] <= end for start, end in wanted):
+                selected.append((arcname, path))
+        entries = selected
 
-        original_filename = secure_filename(file.filename)
-        file_id = f"ppt_{uuid.uuid4().hex}_{original_filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_id)
-        file.save(file_path)
+    if not entries:
+        return jsonify({"error": "Tidak ada file yang cocok"}), 404
 
-        file_size = os.path.getsize(file_path)
+    return zip_response(entries, f"{split_folder}.zip")
 
-        document_id = create_documents_entry(
-            original_filename,
-            file_path,
-            file_extension,  # Will be .ppt or .pptx
-            file_size,
-            0  # PPT/PPTX doesn't have page count like PDF
-        )
-        convert_id, convert_uuid = create_convert_entry(document_id)
-        
-        # Convert using LibreOffice command (works for both .ppt and .pptx)
-        cmd = [
-            LIBREOFFICE_PATH,
-            '--headless',
-            '--convert-to',
-            'pdf',
-            '--outdir',
-            app.config['CONVERTED_FOLDER'],
-            file_path
-        ]
-        
-        # Add timeout to prevent hanging (120 seconds for large presentations)
-        process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=120)
-        
-        if process.returncode != 0:
-            raise Exception(f"LibreOffice conversion error: {process.stderr.decode()}")
-        
-        # Get output PDF path
-        base_name = os.path.splitext(os.path.basename(file_path))[0]
-        output_pdf = os.path.join(app.config['CONVERTED_FOLDER'], f"{base_name}.pdf")
-        
-        # Check if conversion succeeded
-        if not os.path.exists(output_pdf):
-            raise Exception("Conversion failed: PDF file not created")
-        
-        pdf_filename = os.path.basename(output_pdf)
-        update_convert_status(convert_id, "completed", output_pdf, pdf_filename)
-
-        return jsonify({
-            "status": "success",
-            "message": f"{file_extension.upper()} to PDF conversion completed",
-            "file_id": file_id,
-            "document_id": document_id,
-            "convert_id": convert_id,
-            "original_filename": original_filename,
-            "original_format": file_extension,
-            "converted_filename": pdf_filename,
-            "download_url": f"{BASE_URL}/download/converted/{pdf_filename}"
-        })
-
-    except subprocess.TimeoutExpired:
-        if convert_id:
-            update_convert_status(convert_id, "failed")
-        return jsonify({'error': 'Conversion timeout: File terlalu besar atau kompleks', 'status': 'failed'}), 500
-    except Exception as e:
-        if convert_id:
-            update_convert_status(convert_id, "failed")
-        return jsonify({'error': str(e), 'status': 'failed'}), 500
 
-@app.route('/docs/api/tools/convert-doc-to-pdf', methods=['POST'])
-def convert_doc_to_pdf():
+@app.route('/download/zip', methods=['GET'])
+def download_zip():
     """
-    Endpoint untuk convert DOC/DOCX to PDF
+    Beberapa output sekaligus dalam satu ZIP (streaming).
+    ?files=converted/a.pdf&files=splitted/split_x (atau dipisah koma, boleh download_url);
+    folder split ikut semua isinya.
     """
-    convert_id = None  # Initialize to avoid NameError
+    refs = [ref.strip() for value in request.args.getlist('files') for ref in value.split(',') if ref.strip()]
+    if not refs:
+        return jsonify({'error': 'Parameter files wajib diisi', 'status': 'failed'}), 400
+
+    entries = []
+    seen = set()
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'Tidak ada file yang diupload', 'status': 'failed'}), 400
+        for ref in refs:
+            folder, filename, path = resolve_output_path(ref, DOWNLOAD_FOLDERS)
+            if os.path.isdir(path) and folder == "splitted":
+                found = folder_zip_entries(path, f"{filename}/")
+            elif os.path.isfile(path):
+                found = [(filename, path)]
+            else:
+                return jsonify({"error": f"File not found: {ref}"}), 404
 
-        file = request.files['file']
+            for arcname, file_path in found:
+                if arcname not in seen:
+                    seen.add(arcname)
+                    entries.append((arcname, file_path))
 
-        if file.filename == '':
-            return jsonify({'error': 'Tidak ada file yang dipilih', 'status': 'failed'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e), 'status': 'failed'}), 400
 
-        # Get file extension
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        
-        # Check file extension - support both .doc and .docx
-        if file_extension not in ['.doc', '.docx']:
-            return jsonify({'error': 'File harus berformat DOC atau DOCX', 'status': 'failed'}), 400
+    if len(entries) > ZIP_MAX_FILES:
+        return jsonify({'error': f'Maksimal {ZIP_MAX_FILES} file per ZIP', 'status': 'failed'}), 400
 
-        original_filename = secure_filename(file.filename)
-        file_id = f"doc_{uuid.uuid4().hex}_{original_filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_id)
-        file.save(file_path)
+    return zip_response(entries, "outputs.zip")
 
-        file_size = os.path.getsize(file_path)
 
-        document_id = create_documents_entry(
-            original_filename,
-            file_path,
-            file_extension,  # Will be .doc or .docx
-            file_size,
-            0  # DOC/DOCX doesn't have page count like PDF
-        )
-        convert_id, convert_uuid = create_convert_entry(document_id)
-        
-        # Convert using LibreOffice command (works for both .doc and .docx)
-        cmd = [
-            LIBREOFFICE_PATH,
-            '--headless',
-            '--convert-to',
-            'pdf',
-            '--outdir',
-            app.config['CONVERTED_FOLDER'],
-            file_path
-        ]
-        
-        process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        if process.returncode != 0:
-            raise Exception(f"LibreOffice conversion error: {process.stderr.decode()}")
-        
-        # Get output PDF path
-        base_name = os.path.splitext(os.path.basename(file_path))[0]
-        output_pdf = os.path.join(app.config['CONVERTED_FOLDER'], f"{base_name}.pdf")
-        
-        # Check if conversion succeeded
-        if not os.path.exists(output_pdf):
-            raise Exception("Conversion failed: PDF file not created")
-        
-        pdf_filename = os.path.basename(output_pdf)
-        update_convert_status(convert_id, "completed", output_pdf, pdf_filename)
+# ==================== JOB HELPERS ====================
+# Semua tool (compress, convert, merge, split) diproses oleh Celery task
+# run_job_task. Endpoint hanya menyimpan upload, membuat record dan enqueue,
+# lalu menunggu hasil maksimal JOB_SYNC_DEADLINE detik (selebihnya 202).
 
-        return jsonify({
-            "status": "success",
-            "message": f"{file_extension.upper()} to PDF conversion completed",
-            "file_id": file_id,
-            "document_id": document_id,
-            "convert_id": convert_id,
-            "original_filename": original_filename,
-            "original_format": file_extension,
-            "converted_filename": pdf_filename,
-            "download_url": f"{BASE_URL}/download/converted/{pdf_filename}"
-        })
+@app.before_request
+def apply_upload_limit():
+    """MAX_CONTENT_LENGTH lebih besar hanya untuk endpoint di LARGE_UPLOAD_LIMITS (butuh Flask >= 3.1)"""
+    limit = LARGE_UPLOAD_LIMITS.get(request.endpoint)
+    if request.endpoint == "create_job":
+        limit = LARGE_UPLOAD_JOB_LIMITS.get(request.args.get("tool"))
+    if limit:
+        request.max_content_length = limit
 
-    except Exception as e:
-        if convert_id:
-            update_convert_status(convert_id, "failed")
-        return jsonify({'error': str(e), 'status': 'failed'}), 500
 
-@app.route('/docs/api/tools/convert-image-to-pdf', methods=['POST'])
-def convert_image_to_pdf():
-    """
-    Endpoint untuk convert Image to PDF
-    """
-    convert_id = None  # Initialize to avoid NameError
+@app.errorhandler(413)
+def upload_too_large(e):
+    return jsonify({
+        'error': f'Ukuran upload melebihi batas {convert_size(request.max_content_length)}',
+        'status': 'failed'
+    }), 413
+
+
+def get_single_upload():
+    if 'file' not in request.files:
+        raise ValueError('Tidak ada file yang diupload')
+
+    file = request.files['file']
+
+    if file.filename == '':
+        raise ValueError('Tidak ada file yang dipilih')
+
+    return file
+
+
+def save_upload(file, prefix):
+    original_filename = secure_filename(file.filename)
+    file_id = f"{prefix}_{uuid.uuid4().hex}_{original_filename}"
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_id)
+    with metrics.stage_timer("upload_save"):
+        file.save(file_path, buffer_size=UPLOAD_COPY_BUFFER)
+    return original_filename, file_id, file_path
+
+
+def prepare_compress_job():
+    file = get_single_upload()
+
+    if not allowed_file(file.filename):
+        raise ValueError('File harus PDF')
+
+    # Simpan file input
+    original_filename, file_id, input_path = save_upload(file, "cmp")
+
+    # Output filename
+    compressed_name = f"{uuid.uuid4().hex}_compressed.pdf"
+    output_path = os.path.join(app.config["COMPRESSED_FOLDER"], compressed_name)
+
+    original_size = os.path.getsize(input_path)
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'Tidak ada file yang diupload', 'status': 'failed'}), 400
+        total_pages = len(PyPDF2.PdfReader(input_path).pages)
+    except Exception:
+        total_pages = 0
 
-        file = request.files['file']
+    document_id = create_documents_entry(
+        original_filename,
+        input_path,
+        ".pdf",
+        original_size,
+        total_pages
+    )
+    compress_id = create_compressed_entry(document_id)
 
-        if file.filename == '':
-            return jsonify({'error': 'Tidak ada file yang dipilih', 'status': 'failed'}), 400
+    params = {
+        "compress_id": compress_id,
+        "input_path": input_path,
+        "output_path": output_path
+    }
+    info = {
+        "document_id": document_id,
+        "compress_id": compress_id,
+        "filename": original_filename,
+        "original_size": original_size,
+        "check_status_url": f"{BASE_URL}/docs/api/tools/compress/status/{compress_id}"
+    }
+    return "compress", params, info
 
-        # Get file extension
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        
-        # Check file extension - support common image formats
-        allowed_image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.tif']
-        if file_extension not in allowed_image_extensions:
-            return jsonify({'error': 'File harus berformat gambar (PNG, JPG, JPEG, GIF, BMP, TIFF)', 'status': 'failed'}), 400
 
-        original_filename = secure_filename(file.filename)
-        file_id = f"img_{uuid.uuid4().hex}_{original_filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_id)
-        file.save(file_path)
+def prepare_convert_office_job(tool, prefix, extensions, error_message, timeout=None):
+    file = get_single_upload()
 
-        file_size = os.path.getsize(file_path)
+    # Get file extension
+    file_extension = os.path.splitext(file.filename)[1].lower()
+    if file_extension not in extensions:
+        raise ValueError(error_message)
 
-        document_id = create_documents_entry(
+    original_filename, file_id, file_path = save_upload(file, prefix)
+
+    document_id = create_documents_entry(
+        original_filename,
+        file_path,
+        file_extension,
+        os.path.getsize(file_path),
+        0  # Dokumen office tidak punya page count seperti PDF
+    )
+    convert_id, convert_uuid = create_convert_entry(document_id)
+
+    params = {
+        "convert_id": convert_id,
+        "input_path": file_path,
+        "output_dir": app.config['CONVERTED_FOLDER'],
+        "original_format": file_extension,
+        "timeout": timeout
+    }
+    info = {
+        "file_id": file_id,
+        "document_id": document_id,
+        "convert_id": convert_id,
+        "original_filename": original_filename,
+        "original_format": file_extension
+    }
+    return tool, params, info
+
+
+def prepare_convert_ppt_job():
+    # Timeout 120 detik untuk presentasi besar, instance yang hang di-recycle
+    return prepare_convert_office_job(
+        "convert-ppt", "ppt", ['.ppt', '.pptx'], 'File harus berformat PPT atau PPTX', timeout=120
+    )
+
+
+def prepare_convert_doc_job():
+    return prepare_convert_office_job(
+        "convert-doc", "doc", ['.doc', '.docx'], 'File harus berformat DOC atau DOCX'
+    )
+
+
+def prepare_convert_image_job():
+    """
+    Satu gambar (key "file") atau banyak gambar (key "files[]") → satu PDF,
+    satu halaman per gambar (TIFF multi-halaman → semua halamannya) sesuai urutan upload.
+    """
+    if 'files[]' in request.files:
+        files = [f for f in request.files.getlist('files[]') if f.filename]
+        if not files:
+            raise ValueError('Tidak ada file yang dipilih')
+    else:
+        files = [get_single_upload()]
+
+    if len(files) > CONVERT_IMAGE_MAX_FILES:
+        raise ValueError(f'Maksimal {CONVERT_IMAGE_MAX_FILES} gambar per konversi')
+
+    # Check file extension - support common image formats
+    allowed_image_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.tif']
+    for file in files:
+        if os.path.splitext(file.filename)[1].lower() not in allowed_image_extensions:
+            raise ValueError(f'File {file.filename} harus berformat gambar (PNG, JPG, JPEG, GIF, BMP, TIFF)')
+
+    document_ids = []
+    input_paths = []
+    file_ids = []
+    for file in files:
+        original_filename, file_id, file_path = save_upload(file, "img")
+        input_paths.append(file_path)
+        file_ids.append(file_id)
+
+        document_ids.append(create_documents_entry(
             original_filename,
             file_path,
-            file_extension,  # .png, .jpg, etc
-            file_size,
+            os.path.splitext(file.filename)[1].lower(),  # .png, .jpg, etc
+            os.path.getsize(file_path),
             1  # 1 page for image
-        )
-        convert_id, convert_uuid = create_convert_entry(document_id)
+        ))
 
-        # Generate PDF filename
-        pdf_filename = f"{uuid.uuid4().hex}.pdf"
-        pdf_path = os.path.join(app.config['CONVERTED_FOLDER'], pdf_filename)
+    # convert_files hanya punya satu document_id: gambar pertama
+    convert_id, convert_uuid = create_convert_entry(document_ids[0])
 
-        # Convert image to PDF using PIL and ReportLab
-        img = Image.open(file_path)
-        
-        # Convert to RGB if necessary (for PNG with transparency, etc.)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Save as PDF
-        img.save(pdf_path, 'PDF', resolution=100.0)
+    params = {
+        "convert_id": convert_id,
+        "input_paths": input_paths,
+        "output_dir": app.config['CONVERTED_FOLDER']
+    }
+    info = {
+        "file_id": file_ids[0],
+        "document_id": document_ids[0],
+        "convert_id": convert_id,
+        "original_filename": secure_filename(files[0].filename)
+    }
+    if len(files) > 1:
+        info["file_ids"] = file_ids
+        info["document_ids"] = document_ids
+    return "convert-image", params, info
 
-        update_convert_status(convert_id, "completed", pdf_path, pdf_filename)
 
-        return jsonify({
-            "status": "success",
-            "message": "Image to PDF conversion completed",
-            "file_id": file_id,
-            "document_id": document_id,
-            "convert_id": convert_id,
-            "original_filename": original_filename,
-            "converted_filename": pdf_filename,
-            "download_url": f"{BASE_URL}/download/converted/{pdf_filename}"
-        })
+def resolve_output_path(ref, folders):
+    """
+    "converted/<file>", "/download/converted/<file>" atau download_url lengkap
+    → (folder, filename, path lokal). Path dijamin tetap di dalam folder tersebut.
+    """
+    ref = ref.strip()
+    if '/download/' in ref:
+        ref = ref.split('/download/', 1)[1]
+    folder, _, filename = ref.lstrip('/').partition('/')
+    filename = filename.strip('/')
 
-    except Exception as e:
-        if convert_id:  # ✅ Added error handling
-            update_convert_status(convert_id, "failed")
-        return jsonify({'error': str(e), 'status': 'failed'}), 500
+    base_path = folders.get(folder)
+    file_path = safe_join(base_path, filename) if base_path and filename else None
+    if not file_path:
+        raise ValueError(f'Referensi {ref} tidak valid. Gunakan <folder>/<file> ({", ".join(folders)})')
 
-@app.route('/docs/api/tools/merge-pdf', methods=['POST'])
-def merge_pdf():
+    return folder, filename, file_path
+
+
+def resolve_merge_reference(ref):
     """
-    Endpoint untuk merge multiple PDF files
-    Upload multiple files with key 'files[]'
+    Referensi input merge → (document_id, file_path, file_name, total_page).
+    - "12": document_id di tabel documents
+    - "converted/<file>.pdf", "compressed/...", "splitted/<folder>/<file>.pdf", "merged/...":
+      output tool lain, boleh juga download_path/download_url ("/download/converted/...")
+    document_id dan total_page None jika output belum punya record documents.
     """
-    merge_id = None  # ✅ Initialize to avoid NameError
-    uploaded_files = []  # ✅ Initialize for cleanup
-    
-    try:
-        if 'files[]' not in request.files:
-            return jsonify({'error': 'Tidak ada file yang diupload. Gunakan key "files[]"', 'status': 'failed'}), 400
+    ref = ref.strip()
 
-        files = request.files.getlist('files[]')
+    if ref.isdigit():
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute("SELECT id, file_name, file_path, total_page FROM documents WHERE id = %s", (int(ref),))
+            document = cursor.fetchone()
 
-        if len(files) < 2:
-            return jsonify({'error': 'Minimal 2 file PDF untuk di-merge', 'status': 'failed'}), 400
+        if not document:
+            raise ValueError(f'Document {ref} tidak ditemukan')
+        if not document['file_path'].lower().endswith('.pdf'):
+            raise ValueError(f'Document {ref} bukan PDF')
+        if not os.path.isfile(document['file_path']):
+            raise ValueError(f'File document {ref} sudah tidak tersedia di server')
+        return document['id'], document['file_path'], document['file_name'], document['total_page'] or 0
 
-        # Validate all files are PDFs
-        for file in files:
-            if not allowed_file(file.filename):
-                return jsonify({'error': f'File {file.filename} bukan PDF', 'status': 'failed'}), 400
+    folder, filename, file_path = resolve_output_path(ref, MERGE_REFERENCE_FOLDERS)
+    if not filename.lower().endswith('.pdf'):
+        raise ValueError(f'Referensi {ref} bukan PDF')
+    if not os.path.isfile(file_path):
+        raise ValueError(f'File {ref} tidak ditemukan')
 
-        # Create merge entry first
-        merge_id = create_merge_entry([])  # ✅ Create merge entry with empty document_ids first
-        
-        document_ids = []
-        merger = PyPDF2.PdfMerger()
+    return None, file_path, os.path.basename(filename), None
+
+
+def prepare_merge_job():
+    """
+    Input merge: upload (files[]) dan/atau referensi file di server (sources[]),
+    boleh dicampur. sources[] menentukan urutan: document_id, output tool lain
+    (lihat resolve_merge_reference) atau "upload:N" untuk files[] ke-N (mulai 0).
+    Upload yang tidak disebut di sources[] ditambahkan di akhir sesuai urutan upload.
+    """
+    files = [file for file in request.files.getlist('files[]') if file.filename]
+    sources = [source.strip() for source in request.form.getlist('sources[]') if source.strip()]
 
-        # Save and add each file to merger
-        for file in files:
-            original_filename = secure_filename(file.filename)
-            temp_id = f"temp_{uuid.uuid4().hex}_{original_filename}"
-            temp_path = os.path.join(app.config['UPLOAD_FOLDER'], temp_id)
-            file.save(temp_path)
+    if not files and not sources:
+        raise ValueError('Tidak ada input. Upload dengan key "files[]" atau referensi dengan key "sources[]"')
 
-            file_size = os.path.getsize(temp_path)
-            reader_temp = PyPDF2.PdfReader(temp_path)
-            total_pages = len(reader_temp.pages)
+    # Validate all files are PDFs
+    for file in files:
+        if not allowed_file(file.filename):
+            raise ValueError(f'File {file.filename} bukan PDF')
+
+    # Urutan input: ("upload", index) atau ("ref", referensi)
+    order = []
+    for source in sources:
+        if source.startswith('upload:'):
+            index = source.split(':', 1)[1]
+            if not index.isdigit() or int(index) >= len(files):
+                raise ValueError(f'{source} tidak valid, jumlah files[]: {len(files)}')
+            order.append(("upload", int(index)))
+        else:
+            order.append(("ref", source))
+
+    referenced_uploads = {value for kind, value in order if kind == "upload"}
+    order.extend(("upload", index) for index in range(len(files)) if index not in referenced_uploads)
+
+    if len(order) < 2:
+        raise ValueError('Minimal 2 file PDF untuk di-merge')
+
+    # Resolve referensi dulu (tanpa I/O upload) agar request invalid gagal cepat
+    references = {value: resolve_merge_reference(value) for kind, value in order if kind == "ref"}
+
+    merge_id = create_merge_entry([])
+    upload_paths = {}
+    uploaded_files = []
 
+    try:
+        # Upload hanya disimpan sekali walaupun disebut beberapa kali di sources[]
+        for index, file in enumerate(files):
+            original_filename, temp_id, temp_path = save_upload(file, "temp")
+            uploaded_files.append(temp_path)
+
+            total_pages = pdf_merge.count_pages(temp_path)
             doc_id = create_documents_entry(
                 original_filename,
                 temp_path,
                 ".pdf",
-                file_size,
+                os.path.getsize(temp_path),
                 total_pages
             )
-            document_ids.append(doc_id)
-            uploaded_files.append(temp_path)
-            
-            merger.append(temp_path)
-
-        # Generate merged PDF filename
-        merged_filename = f"merged_{uuid.uuid4().hex}.pdf"
-        merged_path = os.path.join(app.config['MERGED_FOLDER'], merged_filename)
-
-        # Write merged PDF
-        merger.write(merged_path)
-        merger.close()
-        
-        merged_size = os.path.getsize(merged_path)
-        
-        # Update merge status with completed info
-        update_merge_status(merge_id, "completed", merged_path, merged_filename, convert_size(merged_size))
-
-        # Update document_ids in merge table
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("UPDATE merge_files SET document_id=%s WHERE id=%s", (json.dumps(document_ids), merge_id))
-        conn.commit()
-        cursor.close()
-        conn.close()
+            upload_paths[index] = (doc_id, temp_path, total_pages)
+
+        # Output tool lain dicatat ke documents supaya merge_files.document_id lengkap
+        for ref, (doc_id, file_path, file_name, total_pages) in references.items():
+            if doc_id is None:
+                with metrics.stage_timer("pdf_parse"):
+                    total_pages = pdf_merge.count_pages(file_path)
+                doc_id = create_documents_entry(
+                    file_name,
+                    file_path,
+                    ".pdf",
+                    os.path.getsize(file_path),
+                    total_pages
+                )
+                references[ref] = (doc_id, file_path, file_name, total_pages)
 
-        # Clean up temporary files
+    except Exception:
+        tool_handlers.update_merge_status(merge_id, "failed")
         for temp_file in uploaded_files:
             try:
                 os.remove(temp_file)
-            except:
+            except OSError:
                 pass
+        raise
+
+    input_paths = []
+    document_ids = []
+    page_counts = []
+    for kind, value in order:
+        if kind == "upload":
+            doc_id, file_path, total_pages = upload_paths[value]
+        else:
+            doc_id, file_path, _, total_pages = references[value]
+        input_paths.append(file_path)
+        document_ids.append(doc_id)
+        page_counts.append(total_pages)
+
+    params = {
+        "merge_id": merge_id,
+        "input_paths": input_paths,
+        # Hanya upload yang dihapus setelah merge, file referensi tetap
+        "temp_paths": uploaded_files,
+        "document_ids": document_ids,
+        # Dari /Count saat upload, engine merge memakainya untuk progress per halaman
+        "page_counts": page_counts,
+        "output_dir": app.config['MERGED_FOLDER']
+    }
+    info = {
+        "merge_id": merge_id,
+        "document_ids": document_ids,
+        "uploaded_files": len(uploaded_files),
+        "referenced_files": len(order) - sum(1 for kind, _ in order if kind == "upload")
+    }
+    return "merge", params, info
+
+
+def prepare_split_job():
+    file = get_single_upload()
+
+    if not allowed_file(file.filename):
+        raise ValueError('File harus berformat PDF')
+
+    original_filename, file_id, file_path = save_upload(file, "split")
+
+    total_pages = len(PyPDF2.PdfReader(file_path).pages)
+
+    document_id = create_documents_entry(
+        original_filename,
+        file_path,
+        ".pdf",
+        os.path.getsize(file_path),
+        total_pages
+    )
+    split_id, split_uuid = create_split_entry(document_id)
+
+    params = {
+        "split_id": split_id,
+        "input_path": file_path,
+        "page_ranges": request.form.get('page_ranges', None),
+        "output_dir": app.config['SPLIT_FOLDER']
+    }
+    info = {
+        "file_id": file_id,
+        "document_id": document_id,
+        "split_id": split_id,
+        "original_filename": original_filename
+    }
+    return "split", params, info
+
+
+JOB_PREPARERS = {
+    "compress": prepare_compress_job,
+    "convert-doc": prepare_convert_doc_job,
+    "convert-ppt": prepare_convert_ppt_job,
+    "convert-image": prepare_convert_image_job,
+    "merge": prepare_merge_job,
+    "split": prepare_split_job,
+}
+
+
+def submit_job(tool, params):
+    """Simpan job ke tabel jobs lalu enqueue ke Celery (task id = job id)"""
+    from tasks import run_job_task
+
+    job_id = jobs.create_job(tool, params)
+
+    try:
+        run_job_task.apply_async(args=[job_id], task_id=job_id)
+    except Exception as e:
+        jobs.finish_job(job_id, jobs.JOB_FAILED, error=f"Gagal enqueue job: {e}")
+        tool_handlers.mark_record(tool, params, "failed")
+        raise
+
+    return job_id
+
+
+def wait_for_job(job_id, deadline):
+    """Tunggu job selesai maksimal deadline detik, return row jobs terbaru"""
+    if deadline and deadline > 0:
+        from tasks import celery
+
+        try:
+            celery.AsyncResult(job_id).get(timeout=deadline, propagate=False)
+        except CeleryTimeoutError:
+            pass
+
+    return jobs.get_job(job_id)
+
+
+def job_response(job, info):
+    """200 jika job selesai dalam deadline, 202 + status URL jika masih diproses"""
+    job_data = jobs.serialize_job(job, BASE_URL)
+    job_status_url = f"{BASE_URL}/docs/api/tools/jobs/{job['uuid']}"
+
+    if job['status'] == jobs.JOB_COMPLETED:
+        return jsonify({
+            "status": "success",
+            **info,
+            **(job_data['result'] or {}),
+            "job_id": job['uuid']
+        }), 200
+
+    if job['status'] in (jobs.JOB_FAILED, jobs.JOB_CANCELLED):
+        # Input tidak valid (PDF rusak/terenkripsi, page_ranges salah, ...) → 422, sisanya 500
+        error_type = (job_data['result'] or {}).get('error_type')
+        return jsonify({
+            "status": "failed",
+            "error": job_data['error'] or f"Job {job['status']}",
+            "error_type": error_type,
+            "job_id": job['uuid']
+        }), 422 if error_type == tool_handlers.ERROR_TYPE_INPUT else 500
+
+    return jsonify({
+        "status": "processing",
+        "message": "Job sedang diproses secara asynchronous",
+        "check_status_url": job_status_url,
+        **info,
+        "job_id": job['uuid'],
+        "job_status_url": job_status_url,
+        "progress": job['progress']
+    }), 202
+
+
+def run_tool_endpoint(prepare, deadline=None):
+    """
+    Thin wrapper endpoint tool: prepare (upload + record) → enqueue → tunggu.
+    deadline: detik atau callable(info) → detik. Default JOB_SYNC_DEADLINE.
+    """
+    try:
+        tool, params, info = prepare()
+    except ValueError as e:
+        return jsonify({'error': str(e), 'status': 'failed'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e), 'status': 'failed'}), 500
+
+    if callable(deadline):
+        deadline = deadline(info)
+    if deadline is None:
+        deadline = JOB_SYNC_DEADLINE
+
+    try:
+        job_id = submit_job(tool, params)
+        job = wait_for_job(job_id, deadline)
+        return job_response(job, info)
+    except Exception as e:
+        return jsonify({'error': str(e), 'status': 'failed'}), 500
+
+
+@app.route('/docs/api/tools/jobs', methods=['POST'])
+def create_job():
+    """
+    Buat job async untuk salah satu tool.
+    Form fields: tool (compress|convert-doc|convert-ppt|convert-image|merge|split),
+    file / files[] dan opsi tool (mis. page_ranges untuk split, sources[] untuk merge).
+    tool boleh juga lewat query string (?tool=convert-image), wajib untuk upload di atas
+    MAX_CONTENT_LENGTH (lihat LARGE_UPLOAD_JOB_LIMITS).
+    Selalu return 202 + job_id, status dicek lewat GET /docs/api/tools/jobs/<job_id>.
+    """
+    query_tool = request.args.get('tool')
+    tool = request.form.get('tool') or query_tool or ''
+    if query_tool and tool != query_tool:
+        return jsonify({'error': 'Parameter tool di query dan form berbeda', 'status': 'failed'}), 400
+
+    prepare = JOB_PREPARERS.get(tool)
+    if prepare is None:
+        return jsonify({
+            'error': f"Tool tidak valid. Pilihan: {', '.join(JOB_PREPARERS)}",
+            'status': 'failed'
+        }), 400
+
+    return run_tool_endpoint(prepare, deadline=0)
+
+
+@app.route('/docs/api/tools/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """
+    Status, progress dan hasil job.
+    ?wait=N (detik): long-poll sampai ada perubahan progress/status atau N detik lewat.
+    """
+    try:
+        wait = progress_events.parse_wait(request.args.get('wait'))
+    except ValueError:
+        return jsonify({'error': 'Parameter wait harus angka >= 0', 'status': 'failed'}), 400
 
-        return jsonify({
-            "status": "success",
-            "message": "PDF merge completed",
-            "merge_id": merge_id,
-            "merged_filename": merged_filename,
-            "files_merged": len(files),
-            "merged_size": convert_size(merged_size),
-            "download_url": f"{BASE_URL}/download/merged/{merged_filename}"
-        })
+    pubsub = progress_events.subscribe(progress_events.job_channel(job_id)) if wait else None
+    try:
+        job = jobs.get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found', 'status': 'failed'}), 404
+
+        if job['status'] not in jobs.FINISHED_STATUSES and progress_events.wait_for_change(pubsub, wait):
+            job = jobs.get_job(job_id)
+
+        data = jobs.serialize_job(job, BASE_URL)
+        if job['status'] in jobs.FINISHED_STATUSES:
+            with db_cursor(dictionary=True) as cursor:
+                profiles = job_profile.load_for_job(cursor, job_id)
+            data['profile'] = profiles[-1] if profiles else None
+
+        return jsonify(data), 200
 
     except Exception as e:
-        if merge_id:  # ✅ Check if merge_id exists before updating
-            update_merge_status(merge_id, "failed")
-        
-        # Clean up temporary files on error
-        for temp_file in uploaded_files:
-            try:
-                os.remove(temp_file)
-            except:
-                pass
-                
         return jsonify({'error': str(e), 'status': 'failed'}), 500
 
-@app.route('/docs/api/tools/split-pdf', methods=['POST'])
-def split_pdf():
+    finally:
+        progress_events.close(pubsub)
+
+
+@app.route('/docs/api/tools/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
     """
-    Endpoint untuk split PDF file
-    Optional: page_ranges (e.g., "1-3,5,7-9") or split all pages
+    Server-Sent Events progress job: event status (snapshot), started, progress,
+    completed/failed/cancelled. Hasil lengkap diambil lewat GET /docs/api/tools/jobs/<job_id>.
     """
-    split_id = None  # ✅ Initialize to avoid NameError
-    
+    pubsub = progress_events.subscribe(progress_events.job_channel(job_id))
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'Tidak ada file yang diupload', 'status': 'failed'}), 400
-
-        file = request.files['file']
-
-        if file.filename == '':
-            return jsonify({'error': 'Tidak ada file yang dipilih', 'status': 'failed'}), 400
-
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'File harus berformat PDF', 'status': 'failed'}), 400
+        job = jobs.get_job(job_id)
+    except Exception as e:
+        progress_events.close(pubsub)
+        return jsonify({'error': str(e), 'status': 'failed'}), 500
 
-        original_filename = secure_filename(file.filename)
-        file_id = f"split_{uuid.uuid4().hex}_{original_filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_id)
-        file.save(file_path)
-        
-        file_size = os.path.getsize(file_path)
-        
-        # ✅ Read PDF FIRST to get total_pages
-        reader = PyPDF2.PdfReader(file_path)
-        total_pages = len(reader.pages)
-        
-        # ✅ Now create document entry with correct total_pages
-        document_id = create_documents_entry(
-            original_filename,
-            file_path,
-            ".pdf",
-            file_size,
-            total_pages
-        )
+    if not job:
+        progress_events.close(pubsub)
+        return jsonify({'error': 'Job not found', 'status': 'failed'}), 404
 
-        split_id, split_uuid = create_split_entry(document_id)
+    return event_stream_response(progress_events.stream(pubsub, jobs.serialize_job(job, BASE_URL)))
 
-        # Get page ranges from request (optional)
-        page_ranges = request.form.get('page_ranges', None)
 
-        # Create folder for split files
-        split_folder_name = f"split_{uuid.uuid4().hex}"
-        split_folder_path = os.path.join(app.config['SPLIT_FOLDER'], split_folder_name)
-        os.makedirs(split_folder_path, exist_ok=True)
+@app.route('/docs/api/tools/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Batalkan job yang masih queued/processing"""
+    try:
+        job = jobs.get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found', 'status': 'failed'}), 404
 
-        split_files = []
-        total_split_size = 0  # ✅ Track total size of all split files
+        previous_status = jobs.cancel_job(job_id)
+        if previous_status is None:
+            return jsonify({
+                'error': f"Job sudah selesai (status: {job['status']})",
+                'status': 'failed'
+            }), 409
 
-        if page_ranges:
-            # Parse page ranges (e.g., "1-3,5,7-9")
-            ranges = page_ranges.split(',')
-            
-            for range_str in ranges:
-                range_str = range_str.strip()
-                
-                if '-' in range_str:
-                    # Range: 1-3
-                    start, end = map(int, range_str.split('-'))
-                    writer = PyPDF2.PdfWriter()
-                    
-                    for page_num in range(start - 1, end):
-                        if page_num < total_pages:
-                            writer.add_page(reader.pages[page_num])
-                    
-                    output_filename = f"pages_{start}-{end}.pdf"
-                    output_path = os.path.join(split_folder_path, output_filename)
-                    
-                    with open(output_path, 'wb') as output_file:
-                        writer.write(output_file)
-                    
-                    split_file_size = os.path.getsize(output_path)
-                    total_split_size += split_file_size
-                    split_files.append(output_filename)
-                else:
-                    # Single page: 5
-                    page_num = int(range_str) - 1
-                    
-                    if page_num < total_pages:
-                        writer = PyPDF2.PdfWriter()
-                        writer.add_page(reader.pages[page_num])
-                        
-                        output_filename = f"page_{page_num + 1}.pdf"
-                        output_path = os.path.join(split_folder_path, output_filename)
-                        
-                        with open(output_path, 'wb') as output_file:
-                            writer.write(output_file)
-                        
-                        split_file_size = os.path.getsize(output_path)
-                        total_split_size += split_file_size
-                        split_files.append(output_filename)
-        else:
-            # Split all pages individually
-            for page_num in range(total_pages):
-                writer = PyPDF2.PdfWriter()
-                writer.add_page(reader.pages[page_num])
-                
-                output_filename = f"page_{page_num + 1}.pdf"
-                output_path = os.path.join(split_folder_path, output_filename)
-                
-                with open(output_path, 'wb') as output_file:
-                    writer.write(output_file)
-                
-                split_file_size = os.path.getsize(output_path)
-                total_split_size += split_file_size
-                split_files.append(output_filename)
-
-        # ✅ Update ONCE at the end with final status
-        # Store first split file name as representative, or you could store JSON array
-        first_split_file = split_files[0] if split_files else None
-        update_split_status(
-            split_id, 
-            "completed", 
-            split_folder_path, 
-            first_split_file,  # Or json.dumps(split_files) if you want to store all names
-            convert_size(total_split_size)
-        )
+        # Queued: task di-skip worker. Processing: hentikan proses worker yang menjalankan.
+        from tasks import celery
+        celery.control.revoke(job_id, terminate=(previous_status == jobs.JOB_PROCESSING))
+        tool_handlers.mark_record(job['tool'], job['params'], "cancelled")
 
         return jsonify({
-            "status": "success",
-            "message": "PDF split completed",
-            "file_id": file_id,
-            "document_id": document_id,
-            "split_id": split_id,
-            "original_filename": original_filename,
-            "total_pages": total_pages,
-            "split_count": len(split_files),
-            "split_files": split_files,
-            "total_split_size": convert_size(total_split_size),
-            "download_folder": f"/download/splitted/{split_folder_name}"
-        })
+            'status': 'success',
+            'message': 'Job dibatalkan',
+            'job_id': job_id,
+            'previous_status': previous_status
+        }), 200
 
     except Exception as e:
-        if split_id:  # ✅ Check if split_id exists before updating
-            update_split_status(split_id, "failed")
         return jsonify({'error': str(e), 'status': 'failed'}), 500
 
+
+# ==================== NEW ENDPOINTS ====================
+
+@app.route('/docs/api/tools/convert-ppt-to-pdf', methods=['POST'])
+def convert_ppt_to_pdf():
+    """
+    Endpoint untuk convert PPT/PPTX to PDF
+    """
+    return run_tool_endpoint(prepare_convert_ppt_job)
+
+@app.route('/docs/api/tools/convert-doc-to-pdf', methods=['POST'])
+def convert_doc_to_pdf():
+    """
+    Endpoint untuk convert DOC/DOCX to PDF
+    """
+    return run_tool_endpoint(prepare_convert_doc_job)
+
+@app.route('/docs/api/tools/convert-image-to-pdf', methods=['POST'])
+def convert_image_to_pdf():
+    """
+    Endpoint untuk convert Image to PDF
+    """
+    return run_tool_endpoint(prepare_convert_image_job)
+
+@app.route('/docs/api/tools/merge-pdf', methods=['POST'])
+def merge_pdf():
+    """
+    Endpoint untuk merge multiple PDF files
+    Upload multiple files with key 'files[]' dan/atau referensi file di server
+    dengan key 'sources[]' (document_id, "converted/<file>.pdf", "compressed/...", "upload:N")
+    """
+    return run_tool_endpoint(prepare_merge_job)
+
+@app.route('/docs/api/tools/split-pdf', methods=['POST'])
+def split_pdf():
+    """
+    Endpoint untuk split PDF file
+    Optional: page_ranges (e.g., "1-3,5,7-9") or split all pages
+    """
+    return run_tool_endpoint(prepare_split_job)
+
 # ==================== SWAGGER JSON ====================
 @app.route('/static/swagger.json')
 def swagger_json():
@@ -2379,6 +2862,7 @@ def swagger_json():
                     **Method Detection:**
                     - `digital_extraction`: PDF dengan text yang bisa di-copy (fast)
                     - `tesseract_ocr`: PDF hasil scan/protected (slower, uses OCR)
+                    - `hybrid`: PDF campuran, hanya halaman scan yang di-OCR
                     """,
                     "tags": ["Simple OCR (No Database)"],
                     "requestBody": {
@@ -2436,7 +2920,7 @@ def swagger_json():
                                             },
                                             "method": {
                                                 "type": "string",
-                                                "enum": ["digital_extraction", "tesseract_ocr"],
+                                                "enum": ["digital_extraction", "tesseract_ocr", "hybrid"],
                                                 "example": "digital_extraction"
                                             },
                                             "filename": {
@@ -2597,7 +3081,7 @@ def swagger_json():
                                             },
                                             "method": {
                                                 "type": "string",
-                                                "enum": ["digital_extraction", "tesseract_ocr"],
+                                                "enum": ["digital_extraction", "tesseract_ocr", "hybrid"],
                                                 "example": "digital_extraction"
                                             },
                                             "filename": {
@@ -2649,6 +3133,49 @@ def swagger_json():
                     }
                 }
             },
+            "/docs/api/tools/ocr/status/{ocr_id}": {
+                "get": {
+                    "summary": "OCR Status",
+                    "description": "Status OCR, progress halaman (pages_done, percent) dan preview hasil. Dengan ?wait=N response ditahan sampai ada event progress/selesai dari worker (long-poll).",
+                    "tags": ["OCR"],
+                    "parameters": [
+                        {"name": "ocr_id", "in": "path", "required": True, "schema": {"type": "integer"}},
+                        {"name": "wait", "in": "query", "required": False, "schema": {"type": "number", "default": 0, "maximum": 30}, "description": "Long-poll maksimal N detik"}
+                    ],
+                    "responses": {
+                        "200": {"description": "Success"},
+                        "404": {"description": "Not found"}
+                    }
+                }
+            },
+            "/docs/api/tools/ocr/events/{ocr_id}": {
+                "get": {
+                    "summary": "OCR Progress Stream (SSE)",
+                    "description": "Server-Sent Events: status (snapshot awal), started, page (per halaman), completed/failed",
+                    "tags": ["OCR"],
+                    "parameters": [
+                        {"name": "ocr_id", "in": "path", "required": True, "schema": {"type": "integer"}}
+                    ],
+                    "responses": {
+                        "200": {"description": "text/event-stream"},
+                        "404": {"description": "Not found"}
+                    }
+                }
+            },
+            "/docs/api/tools/task-status/{task_id}": {
+                "get": {
+                    "summary": "Celery Task Status",
+                    "description": "Status task dari Celery backend. Dengan ?wait=N menunggu task selesai maksimal N detik.",
+                    "tags": ["OCR"],
+                    "parameters": [
+                        {"name": "task_id", "in": "path", "required": True, "schema": {"type": "string"}},
+                        {"name": "wait", "in": "query", "required": False, "schema": {"type": "number", "default": 0, "maximum": 30}}
+                    ],
+                    "responses": {
+                        "200": {"description": "Success"}
+                    }
+                }
+            },
             "/docs/api/tools/ocr/info/{file_id}": {
                 "get": {
                     "summary": "Get OCR File Info",
@@ -2671,13 +3198,62 @@ def swagger_json():
             "/docs/api/tools/ocr/list": {
                 "get": {
                     "summary": "List All OCR Files",
-                    "description": "Dapatkan semua file OCR dari database",
+                    "description": "Dapatkan semua file OCR dari database, per halaman (keyset pagination via next_cursor)",
                     "tags": ["OCR"],
+                    "parameters": [
+                        {"name": "after", "in": "query", "required": False, "schema": {"type": "string"}, "description": "Cursor dari next_cursor halaman sebelumnya (<created_at>,<id>)"},
+                        {"name": "limit", "in": "query", "required": False, "schema": {"type": "integer", "default": 50, "maximum": 200}},
+                        {"name": "status", "in": "query", "required": False, "schema": {"type": "string", "enum": ["processing", "completed", "failed", "pending"]}},
+                        {"name": "date_from", "in": "query", "required": False, "schema": {"type": "string", "format": "date"}},
+                        {"name": "date_to", "in": "query", "required": False, "schema": {"type": "string", "format": "date"}}
+                    ],
                     "responses": {
                         "200": {"description": "Success"}
                     }
                 }
             },
+            "/docs/api/tools/ocr/search": {
+                "get": {
+                    "summary": "Search OCR Text",
+                    "description": "Full-text search hasil OCR. Return dokumen urut relevansi beserta halaman dan snippet",
+                    "tags": ["OCR"],
+                    "parameters": [
+                        {"name": "q", "in": "query", "required": True, "schema": {"type": "string"}},
+                        {"name": "limit", "in": "query", "required": False, "schema": {"type": "integer", "default": 20, "maximum": 100}},
+                        {"name": "mode", "in": "query", "required": False, "schema": {"type": "string", "enum": ["natural", "boolean"]}}
+                    ],
+                    "responses": {
+                        "200": {"description": "Success"},
+                        "400": {"description": "Parameter q kosong"}
+                    }
+                }
+            },
+            "/docs/api/tools/ocr/text/{ocr_id}": {
+                "get": {
+                    "summary": "Get OCR Full Text",
+                    "description": "Full extracted text hasil OCR. Status endpoint hanya mengembalikan preview",
+                    "tags": ["OCR"],
+                    "parameters": [
+                        {
+                            "name": "ocr_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {"type": "integer"}
+                        },
+                        {
+                            "name": "format",
+                            "in": "query",
+                            "required": False,
+                            "schema": {"type": "string", "enum": ["json", "txt"]}
+                        }
+                    ],
+                    "responses": {
+                        "200": {"description": "Success"},
+                        "404": {"description": "Not found"},
+                        "409": {"description": "OCR belum selesai"}
+                    }
+                }
+            },
             "/docs/api/tools/compress-pdf": {
                 "post": {
                     "summary": "Compress PDF",
@@ -2694,6 +3270,10 @@ def swagger_json():
                                             "type": "string",
                                             "format": "binary",
                                             "description": "File PDF yang akan dikompress"
+                                        },
+                                        "async": {
+                                            "type": "boolean",
+                                            "description": "Optional: paksa proses asynchronous via Celery. File besar selalu diproses async"
                                         }
                                     },
                                     "required": ["file"]
@@ -2702,7 +3282,27 @@ def swagger_json():
                         }
                     },
                     "responses": {
-                        "200": {"description": "File PDF compressed"}
+                        "200": {"description": "File PDF compressed"},
+                        "202": {"description": "Kompresi diproses asynchronous, cek check_status_url"}
+                    }
+                }
+            },
+            "/docs/api/tools/compress/status/{compress_id}": {
+                "get": {
+                    "summary": "Compress Job Status",
+                    "description": "Cek status kompresi asynchronous",
+                    "tags": ["Compress"],
+                    "parameters": [
+                        {
+                            "name": "compress_id",
+                            "in": "path",
+                            "required": True,
+                            "schema": {"type": "integer"}
+                        }
+                    ],
+                    "responses": {
+                        "200": {"description": "Success"},
+                        "404": {"description": "Not found"}
                     }
                 }
             },
@@ -2728,8 +3328,15 @@ def swagger_json():
             "/docs/api/tools/compress/list": {
                 "get": {
                     "summary": "List All Compressed Files",
-                    "description": "Dapatkan semua file compressed dari database",
+                    "description": "Dapatkan semua file compressed dari database, per halaman (keyset pagination via next_cursor)",
                     "tags": ["Compress"],
+                    "parameters": [
+                        {"name": "after", "in": "query", "required": False, "schema": {"type": "string"}, "description": "Cursor dari next_cursor halaman sebelumnya (<created_at>,<id>)"},
+                        {"name": "limit", "in": "query", "required": False, "schema": {"type": "integer", "default": 50, "maximum": 200}},
+                        {"name": "status", "in": "query", "required": False, "schema": {"type": "string", "enum": ["processing", "completed", "failed", "pending"]}},
+                        {"name": "date_from", "in": "query", "required": False, "schema": {"type": "string", "format": "date"}},
+                        {"name": "date_to", "in": "query", "required": False, "schema": {"type": "string", "format": "date"}}
+                    ],
                     "responses": {
                         "200": {"description": "Success"}
                     }
@@ -2760,6 +3367,7 @@ def swagger_json():
                         }
                     },
                     "responses": {
+                        "202": {"description": "Job belum selesai dalam JOB_SYNC_DEADLINE, cek job_status_url"},
                         "200": {
                             "description": "Conversion successful",
                             "content": {
@@ -2803,6 +3411,7 @@ def swagger_json():
                         }
                     },
                     "responses": {
+                        "202": {"description": "Job belum selesai dalam JOB_SYNC_DEADLINE, cek job_status_url"},
                         "200": {
                             "description": "Conversion successful",
                             "content": {
@@ -2825,7 +3434,7 @@ def swagger_json():
             "/docs/api/tools/convert-image-to-pdf": {
                 "post": {
                     "summary": "Convert Image to PDF",
-                    "description": "Upload gambar (PNG, JPG, JPEG, GIF, BMP, TIFF) untuk dikonversi ke PDF",
+                    "description": "Upload satu gambar (file) atau banyak gambar (files[]) untuk dikonversi menjadi satu PDF, satu halaman per gambar (TIFF multi-halaman: satu halaman per frame) sesuai urutan upload. JPEG dan strip TIFF (JPEG, LZW, Deflate, CCITT G4) di-embed tanpa re-encode; format lain ditulis lossless. Raster di atas IMAGE_PDF_MAX_PIXELS diturunkan ke IMAGE_PDF_TARGET_DPI. Batas upload endpoint ini CONVERT_IMAGE_MAX_UPLOAD (default 512MB), endpoint lain 16MB.",
                     "tags": ["Convert"],
                     "requestBody": {
                         "required": True,
@@ -2838,14 +3447,19 @@ def swagger_json():
                                             "type": "string",
                                             "format": "binary",
                                             "description": "File gambar yang akan dikonversi (PNG, JPG, JPEG, GIF, BMP, TIFF)"
+                                        },
+                                        "files[]": {
+                                            "type": "array",
+                                            "items": {"type": "string", "format": "binary"},
+                                            "description": "Banyak gambar → satu PDF multi-halaman (pengganti file, maksimal CONVERT_IMAGE_MAX_FILES)"
                                         }
-                                    },
-                                    "required": ["file"]
+                                    }
                                 }
                             }
                         }
                     },
                     "responses": {
+                        "202": {"description": "Job belum selesai dalam JOB_SYNC_DEADLINE, cek job_status_url"},
                         "200": {
                             "description": "Conversion successful",
                             "content": {
@@ -2892,7 +3506,7 @@ def swagger_json():
             "/docs/api/tools/merge-pdf": {
                 "post": {
                     "summary": "Merge Multiple PDFs",
-                    "description": "Upload multiple PDF files untuk digabungkan menjadi satu file PDF",
+                    "description": "Gabungkan minimal 2 PDF menjadi satu file PDF. Input bisa upload (files[]), file yang sudah ada di server (sources[]), atau campuran keduanya. File referensi tidak diupload ulang dan tidak dihapus setelah merge.",
                     "tags": ["Merge"],
                     "requestBody": {
                         "required": True,
@@ -2907,15 +3521,20 @@ def swagger_json():
                                                 "type": "string",
                                                 "format": "binary"
                                             },
-                                            "description": "Multiple PDF files (minimum 2 files)"
+                                            "description": "PDF files yang diupload"
+                                        },
+                                        "sources[]": {
+                                            "type": "array",
+                                            "items": {"type": "string"},
+                                            "description": "Urutan input: document_id (mis. 12), output tool lain (converted/<file>.pdf, compressed/<file>.pdf, splitted/<folder>/<file>.pdf, merged/<file>.pdf atau download_path-nya), atau upload:N untuk files[] ke-N (mulai 0). Upload yang tidak disebut ditambahkan di akhir."
                                         }
-                                    },
-                                    "required": ["files[]"]
+                                    }
                                 }
                             }
                         }
                     },
                     "responses": {
+                        "202": {"description": "Job belum selesai dalam JOB_SYNC_DEADLINE, cek job_status_url"},
                         "200": {
                             "description": "Merge successful",
                             "content": {
@@ -2988,6 +3607,7 @@ def swagger_json():
                         }
                     },
                     "responses": {
+                        "202": {"description": "Job belum selesai dalam JOB_SYNC_DEADLINE, cek job_status_url"},
                         "200": {
                             "description": "Split successful",
                             "content": {
@@ -3001,7 +3621,8 @@ def swagger_json():
                                             "total_pages": {"type": "integer"},
                                             "split_count": {"type": "integer"},
                                             "split_files": {"type": "array"},
-                                            "download_folder": {"type": "string"}
+                                            "download_folder": {"type": "string"},
+                                            "download_url": {"type": "string", "description": "ZIP semua hasil split (/download/zip/splitted/<folder>)"}
                                         }
                                     }
                                 }
@@ -3010,6 +3631,141 @@ def swagger_json():
                     }
                 }
             },
+            "/download/zip/splitted/{split_folder}": {
+                "get": {
+                    "summary": "Download Split Result as ZIP",
+                    "description": "Semua file hasil split dalam satu ZIP yang di-stream langsung (tidak dibuat di disk)",
+                    "tags": ["Split"],
+                    "parameters": [
+                        {
+                            "name": "split_folder",
+                            "in": "path",
+                            "required": True,
+                            "schema": {"type": "string"},
+                            "description": "Nama folder dari download_folder, mis. split_<uuid>"
+                        },
+                        {
+                            "name": "pages",
+                            "in": "query",
+                            "required": False,
+                            "schema": {"type": "string"},
+                            "description": "Hanya file yang mencakup halaman ini, mis. 1-3,5"
+                        }
+                    ],
+                    "responses": {
+                        "200": {"description": "ZIP", "content": {"application/zip": {}}},
+                        "400": {"description": "Format pages tidak valid"},
+                        "404": {"description": "Folder tidak ada atau tidak ada file yang cocok"}
+                    }
+                }
+            },
+            "/download/zip": {
+                "get": {
+                    "summary": "Download Multiple Outputs as ZIP",
+                    "description": "Beberapa output tool (converted, compressed, merged, ocr, folder split) dalam satu ZIP streaming",
+                    "tags": ["Download"],
+                    "parameters": [
+                        {
+                            "name": "files",
+                            "in": "query",
+                            "required": True,
+                            "style": "form",
+                            "explode": True,
+                            "schema": {"type": "array", "items": {"type": "string"}},
+                            "description": "<folder>/<file> atau download_url, boleh diulang atau dipisah koma. splitted/<folder> = semua isi folder."
+                        }
+                    ],
+                    "responses": {
+                        "200": {"description": "ZIP", "content": {"application/zip": {}}},
+                        "400": {"description": "Parameter tidak valid atau terlalu banyak file"},
+                        "404": {"description": "File tidak ditemukan"}
+                    }
+                }
+            },
+            "/docs/api/tools/jobs": {
+                "post": {
+                    "summary": "Create Job",
+                    "description": "Buat job asynchronous untuk salah satu tool. Selalu return 202 + job_id",
+                    "tags": ["Jobs"],
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "multipart/form-data": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "tool": {
+                                            "type": "string",
+                                            "enum": ["compress", "convert-doc", "convert-ppt", "convert-image", "merge", "split"]
+                                        },
+                                        "file": {
+                                            "type": "string",
+                                            "format": "binary",
+                                            "description": "File input (semua tool kecuali merge)"
+                                        },
+                                        "files[]": {
+                                            "type": "array",
+                                            "items": {"type": "string", "format": "binary"},
+                                            "description": "File PDF untuk merge"
+                                        },
+                                        "page_ranges": {
+                                            "type": "string",
+                                            "description": "Optional untuk split (contoh: '1-3,5,7-9')"
+                                        }
+                                    },
+                                    "required": ["tool"]
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "202": {"description": "Job dibuat"},
+                        "400": {"description": "Tool atau file tidak valid"}
+                    }
+                }
+            },
+            "/docs/api/tools/jobs/{job_id}": {
+                "get": {
+                    "summary": "Job Status",
+                    "description": "Status, progress (0-100), hasil dan error job. Dengan ?wait=N response ditahan sampai progress/status berubah (long-poll). Job yang sudah selesai menyertakan profile: durasi per stage, CPU (termasuk child process), peak RSS dan I/O.",
+                    "tags": ["Jobs"],
+                    "parameters": [
+                        {"name": "job_id", "in": "path", "required": True, "schema": {"type": "string"}},
+                        {"name": "wait", "in": "query", "required": False, "schema": {"type": "number", "default": 0, "maximum": 30}, "description": "Long-poll maksimal N detik"}
+                    ],
+                    "responses": {
+                        "200": {"description": "Success"},
+                        "404": {"description": "Not found"}
+                    }
+                },
+                "delete": {
+                    "summary": "Cancel Job",
+                    "description": "Batalkan job yang masih queued/processing",
+                    "tags": ["Jobs"],
+                    "parameters": [
+                        {"name": "job_id", "in": "path", "required": True, "schema": {"type": "string"}}
+                    ],
+                    "responses": {
+                        "200": {"description": "Job dibatalkan"},
+                        "404": {"description": "Not found"},
+                        "409": {"description": "Job sudah selesai"}
+                    }
+                }
+            },
+            "/docs/api/tools/jobs/{job_id}/events": {
+                "get": {
+                    "summary": "Job Progress Stream (SSE)",
+                    "description": "Server-Sent Events: status (snapshot awal), started, progress, completed/failed/cancelled",
+                    "tags": ["Jobs"],
+                    "parameters": [
+                        {"name": "job_id", "in": "path", "required": True, "schema": {"type": "string"}}
+                    ],
+                    "responses": {
+                        "200": {"description": "text/event-stream"},
+                        "404": {"description": "Not found"}
+                    }
+                }
+            },
             "/docs/api/tools/split/list": {
                 "get": {
                     "summary": "List All Split Files",
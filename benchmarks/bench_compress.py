@@ -0,0 +1,75 @@
+# benchmarks/bench_compress.py
+"""
+Benchmark kompresi Ghostscript: single process vs page-parallel.
+
+Usage:
+    python -m benchmarks.bench_compress file.pdf [file.pdf ...] [--workers N] [--chunk 50]
+
+Laporan per file: wall-clock time dan ukuran output untuk kedua mode.
+"""
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import pdf_compress
+import pdf_merge
+
+
+def bench_mode(input_path, parallel, temp_dir):
+    output_path = os.path.join(temp_dir, f"out_{'parallel' if parallel else 'single'}.pdf")
+
+    start = time.perf_counter()
+    result = pdf_compress.compress_pdf_file(input_path, output_path, parallel=parallel)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "status": result["status"],
+        "seconds": round(elapsed, 3),
+        "output_size": result.get("compressed_size"),
+        "reduction_percent": result.get("reduction_percent"),
+        "error": result.get("error"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.workers:
+        pdf_compress.COMPRESS_WORKERS = args.workers
+    if args.chunk:
+        pdf_compress.COMPRESS_PAGES_PER_CHUNK = args.chunk
+
+    results = []
+    for path in args.pdfs:
+        temp_dir = tempfile.mkdtemp(prefix="bench_compress_")
+        try:
+            single = bench_mode(path, False, temp_dir)
+            parallel = bench_mode(path, True, temp_dir)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        results.append({
+            "file": path,
+            "pages": pdf_merge.count_pages(path),
+            "input_size": os.path.getsize(path),
+            "single": single,
+            "parallel": parallel,
+            "speedup": round(single["seconds"] / parallel["seconds"], 2) if parallel["seconds"] else None,
+        })
+
+    print(json.dumps({
+        "workers": pdf_compress.COMPRESS_WORKERS,
+        "pages_per_chunk": pdf_compress.COMPRESS_PAGES_PER_CHUNK,
+        "results": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
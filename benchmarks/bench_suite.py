@@ -0,0 +1,457 @@
+# benchmarks/bench_suite.py
+"""
+Benchmark end-to-end semua tool di atas corpus sintetis (benchmarks/corpus.py).
+
+Usage:
+    python -m benchmarks.bench_suite [--profile small|full] [--repeat 3]
+                                     [--only ocr,compress] [--http]
+                                     [--output result.json] [--baseline old.json]
+
+Mode default memanggil fungsi pemrosesan di balik setiap endpoint secara
+langsung (tanpa DB/Redis). --http menjalankan endpoint lewat Flask test
+client dengan Celery eager; butuh MySQL dan Redis seperti saat development.
+
+Setiap skenario dijalankan di process terpisah (fork) agar peak RSS tidak
+tercampur. Hasil JSON berisi commit git dan fingerprint corpus sehingga
+bisa dibandingkan antar commit (--baseline).
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import difflib
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime
+
+from benchmarks import corpus
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Knob yang mempengaruhi hasil, dicatat di meta agar perbandingan jujur
+CONFIG_ENV = (
+    "OCR_ENGINE_THREADS", "OCR_ENGINE_POOL_SIZE", "OCR_RASTER_WINDOW", "OCR_PARALLEL_MIN_PAGES",
+    "COMPRESS_PARALLEL_MIN_PAGES", "COMPRESS_PAGES_PER_CHUNK", "COMPRESS_WORKERS",
+    "OFFICE_POOL_SIZE", "DB_POOL_SIZE",
+    "IMAGE_PDF_DPI", "IMAGE_PDF_MAX_PIXELS", "IMAGE_PDF_TARGET_DPI", "IMAGE_PDF_JPEG_QUALITY", "IMAGE_PDF_BAND_BYTES",
+)
+
+
+# ===================== DIRECT (fungsi pemrosesan) =====================
+def bench_text_layer(path, work_dir, entry):
+    import PyPDF2
+    from ocr_pipeline import classify_pages
+
+    reader = PyPDF2.PdfReader(path)
+    pages = classify_pages(reader)
+    return {"pages": len(pages), "text_layer_pages": sum(1 for p in pages if p["method"] == "text_layer")}
+
+
+def bench_encrypted(path, work_dir, entry):
+    import PyPDF2
+    from ocr_pipeline import classify_pages
+
+    reader = PyPDF2.PdfReader(path)
+    if reader.is_encrypted:
+        reader.decrypt(entry.get("password", ""))
+    return {"pages": len(classify_pages(reader))}
+
+
+def normalize_text(text):
+    return " ".join(text.lower().split())
+
+
+def bench_ocr(path, work_dir, entry):
+    """Alur ocr_task_with_db mode serial: klasifikasi → rasterisasi streaming → Tesseract"""
+    import PyPDF2
+    from ocr_pipeline import classify_pages, iter_selected_page_images, OCR_DPI
+    from tasks import ocr_images, POPPLER_PATH
+
+    reader = PyPDF2.PdfReader(path)
+    classified = classify_pages(reader)
+    ocr_pages = [p["page"] for p in classified if p["method"] == "ocr"]
+
+    page_images = iter_selected_page_images(path, ocr_pages, dpi=OCR_DPI, poppler_path=POPPLER_PATH)
+    results = ocr_images(page_images, len(classified))
+
+    report = {"pages": len(classified), "ocr_pages": len(ocr_pages)}
+
+    # Akurasi terhadap ground truth (hanya corpus scan penuh)
+    expected = entry.get("expected_text")
+    if expected and len(expected) == len(results):
+        ratios = [
+            difflib.SequenceMatcher(None, normalize_text(want), normalize_text(page["text"])).ratio()
+            for want, page in zip(expected, sorted(results, key=lambda p: p["page"]))
+        ]
+        report["text_similarity"] = round(sum(ratios) / len(ratios), 4)
+
+    return report
+
+
+def bench_compress(path, work_dir, entry):
+    from pdf_compress import compress_pdf_file
+
+    output_path = os.path.join(work_dir, "compressed.pdf")
+    result = compress_pdf_file(path, output_path)
+    if result["status"] == "failed":
+        raise Exception(result["error"])
+
+    output_bytes = os.path.getsize(output_path) if os.path.exists(output_path) else entry["size"]
+    return {"pages": entry["pages"], "output_bytes": output_bytes, "compress_status": result["status"]}
+
+
+def bench_merge(paths, work_dir, entries):
+    from pdf_merge import merge_pdfs
+
+    output_path = os.path.join(work_dir, "merged.pdf")
+    stats = merge_pdfs(paths, output_path)
+    return {
+        "pages": stats["pages"],
+        "output_bytes": os.path.getsize(output_path),
+        "deduplicated_objects": stats["deduplicated_objects"],
+    }
+
+
+def bench_split(path, work_dir, entry, page_ranges=None):
+    from tool_handlers import split_pdf
+
+    output_dir = os.path.join(work_dir, "split")
+    os.makedirs(output_dir, exist_ok=True)
+    total_pages, split_files, total_size = split_pdf(path, output_dir, page_ranges)
+    return {"pages": total_pages, "output_bytes": total_size, "output_files": len(split_files)}
+
+
+def bench_split_ranges(path, work_dir, entry):
+    pages = entry["pages"]
+    return bench_split(path, work_dir, entry, page_ranges=f"1-{pages // 2},{pages // 2 + 1}-{pages}")
+
+
+def bench_convert_image(paths, work_dir, entries):
+    from image_pdf import images_to_pdf
+
+    paths = paths if isinstance(paths, (list, tuple)) else [paths]
+    output_path = os.path.join(work_dir, "image.pdf")
+    stats = images_to_pdf(paths, output_path)
+    return {"pages": stats["pages"], "output_bytes": os.path.getsize(output_path),
+            "passthrough_pages": stats["passthrough_pages"], "reduced_pages": stats["reduced_pages"]}
+
+
+def bench_convert_office(path, work_dir, entry):
+    import office_pool
+
+    output_path = office_pool.convert_to_pdf(path, work_dir)
+    return {"pages": entry["pages"], "output_bytes": os.path.getsize(output_path)}
+
+
+def _which(name, configured=None):
+    if configured and os.path.exists(configured):
+        return configured
+    return shutil.which(name)
+
+
+def missing_tools(names):
+    """Tool eksternal yang tidak ada (skenario di-skip, bukan gagal)"""
+    from tools_config import GHOSTSCRIPT_PATH, LIBREOFFICE_PATH, TESSERACT_PATH
+
+    configured = {"gs": GHOSTSCRIPT_PATH, "soffice": LIBREOFFICE_PATH, "tesseract": TESSERACT_PATH}
+    return [name for name in names if not _which(name, configured.get(name))]
+
+
+# 50 foto JPEG → satu PDF (convert-image files[])
+PHOTO_BATCH = tuple(corpus.photo_name(i) for i in range(1, corpus.PROFILES["small"]["photos"] + 1))
+
+# (nama, file corpus, fungsi, tool eksternal yang dibutuhkan)
+# Tuple file → satu run memakai semua file sekaligus (merge)
+DIRECT_SCENARIOS = [
+    ("text_layer", ["digital.pdf", "mixed.pdf", "large.pdf"], bench_text_layer, []),
+    ("encrypted", ["encrypted.pdf"], bench_encrypted, []),
+    ("ocr", ["scanned.pdf", "mixed.pdf"], bench_ocr, ["tesseract", "pdftoppm"]),
+    ("compress", ["scanned.pdf", "slides.pdf", "large.pdf"], bench_compress, ["gs"]),
+    ("merge", [("digital.pdf", "scanned.pdf", "slides.pdf", "large.pdf")], bench_merge, []),
+    ("split", ["large.pdf"], bench_split, []),
+    ("split_ranges", ["large.pdf"], bench_split_ranges, []),
+    ("convert_image", ["slide.png", "multipage.tif", "large_raster.tif"], bench_convert_image, []),
+    ("convert_image_batch", [PHOTO_BATCH], bench_convert_image, []),
+    ("convert_office", ["document.docx", "slides.pptx"], bench_convert_office, ["soffice"]),
+]
+
+
+# ===================== HTTP (Flask test client) =====================
+def make_http_bench(endpoint, field="file", form=None, expect=(200, 202)):
+    """Skenario HTTP: POST file corpus ke endpoint, return pages + ukuran response"""
+    def bench(paths, work_dir, entries):
+        client = http_client()
+        paths = paths if isinstance(paths, (list, tuple)) else [paths]
+        entries = entries if isinstance(entries, (list, tuple)) else [entries]
+
+        handles = [open(path, "rb") for path in paths]
+        try:
+            data = dict(form or {})
+            data[field] = [(handle, os.path.basename(path)) for handle, path in zip(handles, paths)]
+            if len(paths) == 1:
+                data[field] = data[field][0]
+            response = client.post(endpoint, data=data, content_type="multipart/form-data")
+        finally:
+            for handle in handles:
+                handle.close()
+
+        if response.status_code not in expect:
+            raise Exception(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:300]}")
+
+        return {
+            "pages": sum(e["pages"] or 0 for e in entries),
+            "http_status": response.status_code,
+            "response_bytes": len(response.get_data()),
+        }
+    return bench
+
+
+_client = None
+
+
+def http_client():
+    """Flask test client dengan Celery eager (task jalan di process benchmark)"""
+    global _client
+    if _client is None:
+        from tasks import celery
+        celery.conf.task_always_eager = True
+        celery.conf.task_store_eager_result = True
+
+        from app import app
+        app.config["TESTING"] = True
+        _client = app.test_client()
+    return _client
+
+
+HTTP_SCENARIOS = [
+    ("http_simple_ocr", ["scanned.pdf"], make_http_bench("/docs/api/tools/simple-ocr"), ["tesseract", "pdftoppm"]),
+    ("http_ocr", ["mixed.pdf"], make_http_bench("/docs/api/tools/ocr"), ["tesseract", "pdftoppm"]),
+    ("http_compress", ["scanned.pdf"], make_http_bench("/docs/api/tools/compress-pdf"), ["gs"]),
+    ("http_merge", [("digital.pdf", "scanned.pdf", "slides.pdf")], make_http_bench("/docs/api/tools/merge-pdf", field="files[]"), []),
+    ("http_split", ["large.pdf"], make_http_bench("/docs/api/tools/split-pdf"), []),
+    ("http_convert_image", ["slide.png"], make_http_bench("/docs/api/tools/convert-image-to-pdf"), []),
+    ("http_convert_image_batch", [PHOTO_BATCH[:10]], make_http_bench("/docs/api/tools/convert-image-to-pdf", field="files[]"), []),
+    ("http_convert_doc", ["document.docx"], make_http_bench("/docs/api/tools/convert-doc-to-pdf"), ["soffice"]),
+    ("http_convert_ppt", ["slides.pptx"], make_http_bench("/docs/api/tools/convert-ppt-to-pdf"), ["soffice"]),
+]
+
+
+# ===================== RUNNER =====================
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def rss_mb(kilobytes_or_bytes):
+    # ru_maxrss: KB di Linux, byte di macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(kilobytes_or_bytes / divisor, 1)
+
+
+def run_scenario(fn, paths, entries, repeat, warmup, conn):
+    """Dijalankan di child process: warm-up, lalu `repeat` run terukur"""
+    try:
+        latencies = []
+        report = {}
+        for i in range(warmup + repeat):
+            work_dir = tempfile.mkdtemp(prefix="bench_suite_")
+            try:
+                start = time.perf_counter()
+                report = fn(paths, work_dir, entries)
+                elapsed = time.perf_counter() - start
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+            if i >= warmup:
+                latencies.append(elapsed)
+
+        conn.send({
+            "status": "ok",
+            "latencies": latencies,
+            "report": report,
+            "peak_rss_mb": rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss),
+            # Subprocess terbesar (gs, soffice, pdftoppm, tesseract)
+            "peak_child_rss_mb": rss_mb(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss),
+        })
+    except Exception as e:
+        conn.send({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def summarize(name, files, outcome, repeat):
+    result = {"scenario": name, "files": files}
+
+    if outcome["status"] != "ok":
+        result.update(outcome)
+        return result
+
+    latencies = outcome["latencies"]
+    report = outcome["report"]
+    total = sum(latencies)
+    pages = report.get("pages") or 0
+
+    result.update({
+        "status": "ok",
+        "runs": len(latencies),
+        "pages": pages,
+        "latency_ms": {
+            **{f"p{pct}": round(percentile(latencies, pct) * 1000, 1) for pct in PERCENTILES},
+            "mean": round(total / len(latencies) * 1000, 1),
+            "min": round(min(latencies) * 1000, 1),
+            "max": round(max(latencies) * 1000, 1),
+        },
+        "pages_per_second": round(pages * len(latencies) / total, 2) if total and pages else None,
+        "peak_rss_mb": outcome["peak_rss_mb"],
+        "peak_child_rss_mb": outcome["peak_child_rss_mb"],
+        "output_bytes": report.get("output_bytes"),
+        "details": {k: v for k, v in report.items() if k not in ("pages", "output_bytes")},
+    })
+    return result
+
+
+def run_all(scenarios, corpus_dir, manifest, repeat, warmup, only=None):
+    entries_by_name = {e["name"]: e for e in manifest["files"]}
+    ctx = multiprocessing.get_context("fork")
+    results = []
+
+    for name, files, fn, tools in scenarios:
+        if only and name not in only:
+            continue
+
+        for file_spec in files:
+            names = list(file_spec) if isinstance(file_spec, tuple) else [file_spec]
+            label = "+".join(names) if len(names) <= 4 else f"{names[0]}..{names[-1]} ({len(names)} files)"
+
+            missing = missing_tools(tools)
+            if missing:
+                print(f"⏭️  {name} [{label}] skipped: missing {', '.join(missing)}")
+                results.append({"scenario": name, "files": names, "status": "skipped",
+                                "reason": f"missing {', '.join(missing)}"})
+                continue
+
+            paths = [os.path.join(corpus_dir, n) for n in names]
+            entries = [entries_by_name[n] for n in names]
+            if not isinstance(file_spec, tuple):
+                paths, entries = paths[0], entries[0]
+
+            print(f"⏱️  {name} [{label}] x{repeat}")
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            process = ctx.Process(target=run_scenario, args=(fn, paths, entries, repeat, warmup, child_conn))
+            process.start()
+            child_conn.close()
+            try:
+                outcome = parent_conn.recv()
+            except EOFError:
+                outcome = {"status": "failed", "error": f"child exited with code {process.exitcode}"}
+            process.join()
+
+            result = summarize(name, names, outcome, repeat)
+            if result["status"] == "ok":
+                print(f"   p50 {result['latency_ms']['p50']} ms, {result['pages_per_second']} pages/s, "
+                      f"peak RSS {result['peak_rss_mb']} MB")
+            else:
+                print(f"   ❌ {result.get('error')}")
+            results.append(result)
+
+    return results
+
+
+def git_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True).stdout.strip())
+        return {"commit": commit or None, "dirty": dirty}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def compare_with_baseline(results, baseline, fingerprint):
+    """Tambahkan perubahan (%) terhadap hasil benchmark commit lain"""
+    if baseline.get("meta", {}).get("corpus", {}).get("fingerprint") != fingerprint:
+        print("⚠️  Baseline memakai corpus berbeda, perbandingan tidak valid")
+
+    previous = {
+        (r["scenario"], tuple(r["files"])): r
+        for r in baseline.get("scenarios", []) if r.get("status") == "ok"
+    }
+
+    def change(new, old):
+        if new is None or not old:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    for result in results:
+        old = previous.get((result["scenario"], tuple(result["files"])))
+        if result.get("status") != "ok" or old is None:
+            continue
+        result["vs_baseline"] = {
+            "p50_change_percent": change(result["latency_ms"]["p50"], old["latency_ms"]["p50"]),
+            "pages_per_second_change_percent": change(result["pages_per_second"], old["pages_per_second"]),
+            "peak_rss_change_percent": change(result["peak_rss_mb"], old["peak_rss_mb"]),
+            "output_bytes_change_percent": change(result["output_bytes"], old["output_bytes"]),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(corpus.PROFILES), default="small")
+    parser.add_argument("--corpus-dir", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", default="", help="Daftar skenario dipisah koma")
+    parser.add_argument("--http", action="store_true", help="Jalankan juga skenario lewat Flask test client")
+    parser.add_argument("--output", default=None, help="Simpan hasil JSON ke file")
+    parser.add_argument("--baseline", default=None, help="Hasil JSON commit lain untuk dibandingkan")
+    args = parser.parse_args()
+
+    corpus_dir, manifest = corpus.ensure_corpus(args.profile, args.corpus_dir)
+    only = {name.strip() for name in args.only.split(",") if name.strip()}
+
+    scenarios = DIRECT_SCENARIOS + (HTTP_SCENARIOS if args.http else [])
+    results = run_all(scenarios, corpus_dir, manifest, max(1, args.repeat), max(0, args.warmup), only)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare_with_baseline(results, json.load(f), manifest["fingerprint"])
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git": git_info(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "corpus": {
+                "profile": manifest["profile"],
+                "version": manifest["corpus_version"],
+                "fingerprint": manifest["fingerprint"],
+            },
+            "config": {name: os.getenv(name) for name in CONFIG_ENV if os.getenv(name) is not None},
+        },
+        "scenarios": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"💾 Results saved to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
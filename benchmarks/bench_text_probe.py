@@ -0,0 +1,95 @@
+# benchmarks/bench_text_probe.py
+"""
+Micro-benchmark deteksi text layer: page_has_text_layer vs page.extract_text().
+
+Usage:
+    python -m benchmarks.bench_text_probe file.pdf [folder ...]
+
+Folder akan di-scan rekursif untuk file .pdf. Laporan berisi waktu per halaman
+dan jumlah halaman dengan hasil berbeda (probe=True tapi extract_text kosong
+masih wajar: halaman tersebut tetap diverifikasi dengan extract_text).
+"""
+import os
+import sys
+import json
+import time
+import PyPDF2
+
+from ocr_pipeline import page_has_text_layer
+
+
+def collect_pdfs(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def bench_file(path):
+    reader = PyPDF2.PdfReader(path)
+    if reader.is_encrypted:
+        reader.decrypt("")
+
+    probe_seconds = 0.0
+    extract_seconds = 0.0
+    mismatches = 0
+    missed = 0
+
+    for page in reader.pages:
+        start = time.perf_counter()
+        has_text = page_has_text_layer(page)
+        probe_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            extracted = bool((page.extract_text() or "").strip())
+        except Exception:
+            extracted = False
+        extract_seconds += time.perf_counter() - start
+
+        if has_text != extracted:
+            mismatches += 1
+        if extracted and not has_text:
+            missed += 1  # probe melewatkan text → halaman akan di-OCR tanpa perlu
+
+    pages = len(reader.pages)
+    return {
+        "file": path,
+        "pages": pages,
+        "probe_ms_per_page": round(probe_seconds * 1000 / max(pages, 1), 3),
+        "extract_ms_per_page": round(extract_seconds * 1000 / max(pages, 1), 3),
+        "speedup": round(extract_seconds / probe_seconds, 1) if probe_seconds else None,
+        "mismatches": mismatches,
+        "missed_text_pages": missed,
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    results = [bench_file(path) for path in collect_pdfs(sys.argv[1:])]
+
+    total_pages = sum(r["pages"] for r in results)
+    probe_total = sum(r["probe_ms_per_page"] * r["pages"] for r in results)
+    extract_total = sum(r["extract_ms_per_page"] * r["pages"] for r in results)
+
+    print(json.dumps({
+        "files": results,
+        "summary": {
+            "files": len(results),
+            "pages": total_pages,
+            "probe_ms_per_page": round(probe_total / max(total_pages, 1), 3),
+            "extract_ms_per_page": round(extract_total / max(total_pages, 1), 3),
+            "missed_text_pages": sum(r["missed_text_pages"] for r in results),
+        }
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+# benchmarks/corpus.py
+"""
+Generator corpus PDF sintetis yang deterministik untuk benchmark.
+
+Usage:
+    python -m benchmarks.corpus [--profile small|full] [--out DIR] [--force]
+
+Semua isi dibuat dari random.Random(seed) dan font default PIL, tanpa
+timestamp, sehingga profile yang sama menghasilkan file yang sama di
+setiap commit/mesin (kecuali PDF terenkripsi: PyPDF2 memakai salt acak,
+isinya tetap sama). manifest.json mencatat sha256 setiap file dan
+ground truth text halaman scan.
+"""
+import os
+import io
+import json
+import random
+import hashlib
+import zipfile
+import argparse
+from datetime import datetime
+import PyPDF2
+from PIL import Image, ImageDraw, ImageFont
+
+# Naikkan jika cara generate berubah, supaya hasil benchmark lama tidak dibandingkan
+CORPUS_VERSION = 2
+CORPUS_SEED = 20261018
+DEFAULT_CORPUS_DIR = os.getenv("BENCH_CORPUS_DIR", "/tmp/tools_bench_corpus")
+ENCRYPTED_PASSWORD = "bench"
+
+PROFILES = {
+    # Cepat (< 1 menit generate), untuk cek sebelum commit
+    "small": {
+        "digital_pages": 10, "scanned_pages": 3, "mixed_pages": 6, "large_pages": 100,
+        "slides": 5, "tiff_pages": 3, "tiff_large_size": (4961, 7016),  # A2 @300 DPI
+        "photos": 50, "photo_size": (1600, 1200),
+    },
+    # Sesuai beban produksi: dokumen 500 halaman, raster besar
+    "full": {
+        "digital_pages": 20, "scanned_pages": 10, "mixed_pages": 20, "large_pages": 500,
+        "slides": 20, "tiff_pages": 20, "tiff_large_size": (9933, 14043),  # A0 @300 DPI
+        "photos": 50, "photo_size": (5472, 3648),  # 20 MP kamera HP
+    },
+}
+
+A4_POINTS = (595, 842)
+A4_300DPI = (2480, 3508)
+SLIDE_SIZE = (1920, 1080)
+ZIP_DATE = (2026, 1, 1, 0, 0, 0)
+FIXED_DATE = datetime(*ZIP_DATE).timetuple()  # PIL pdf_repr menerima struct_time
+
+WORDS = (
+    "surat dinas nomor perihal lampiran kepada yth bapak ibu kepala bagian "
+    "dengan hormat sehubungan pelaksanaan kegiatan tahun anggaran mohon "
+    "bantuan untuk dapat menghadiri rapat koordinasi yang akan dilaksanakan "
+    "pada hari tanggal waktu tempat demikian atas perhatian kerjasama "
+    "diucapkan terima kasih laporan keuangan dokumen arsip pegawai daftar"
+).split()
+
+
+def make_rng(name):
+    """RNG per file: isi satu file tidak bergantung urutan generate file lain"""
+    digest = hashlib.sha256(f"{CORPUS_SEED}:{CORPUS_VERSION}:{name}".encode()).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def make_lines(rng, count, words_per_line=(6, 11)):
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(*words_per_line))).capitalize()
+        for _ in range(count)
+    ]
+
+
+def load_font(size):
+    """Font default PIL (scalable di Pillow >= 10.1), fallback bitmap"""
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+# ===================== PDF TEXT (born-digital) =====================
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_text_pdf(path, pages_lines, page_size=A4_POINTS):
+    """
+    PDF born-digital minimal (Helvetica, satu content stream per halaman).
+    Ditulis manual agar byte-for-byte deterministik (tanpa /ID dan tanggal).
+    """
+    width, height = page_size
+    objects = {}
+    page_ids = []
+    next_id = 4  # 1 catalog, 2 pages, 3 font
+
+    for lines in pages_lines:
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        page_ids.append(page_id)
+
+        ops = ["BT", "/F1 11 Tf", "14 TL", f"50 {height - 60} Td"]
+        for line in lines:
+            ops.append(f"({_pdf_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+    ).encode()
+    objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = out.tell()
+        out.write(b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n")
+
+    xref_at = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (next_id))
+    for obj_id in range(1, next_id):
+        out.write(b"%010d 00000 n \n" % offsets[obj_id])
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_id, xref_at))
+
+    with open(path, "wb") as f:
+        f.write(out.getvalue())
+
+
+# ===================== RASTER =====================
+def render_scan_page(lines, size=A4_300DPI, rng=None):
+    """Halaman scan 300 DPI: text hitam di atas kertas, sedikit miring"""
+    img = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(img)
+    font = load_font(42)
+    for i, line in enumerate(lines):
+        draw.text((200, 220 + i * 70), line, fill=0, font=font)
+
+    if rng is not None:
+        img = img.rotate(rng.uniform(-0.6, 0.6), resample=Image.BILINEAR, fillcolor=255)
+    return img
+
+
+def render_slide(rng, index, size=SLIDE_SIZE):
+    """Slide penuh gambar: gradient + bentuk + tile noise, dengan judul"""
+    width, height = size
+    img = Image.merge("RGB", [
+        Image.linear_gradient("L").resize(size),
+        Image.linear_gradient("L").rotate(90).resize(size),
+        Image.new("L", size, rng.randint(40, 200)),
+    ])
+    draw = ImageDraw.Draw(img)
+    for _ in range(25):
+        x, y = rng.randint(0, width), rng.randint(0, height)
+        r = rng.randint(20, 260)
+        color = tuple(rng.randint(0, 255) for _ in range(3))
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=color)
+
+    # Noise tile (deterministik dari rng) agar JPEG tidak terlalu kecil
+    tile = Image.frombytes("RGB", (240, 135), rng.randbytes(240 * 135 * 3)).resize(size, Image.NEAREST)
+    img = Image.blend(img, tile, 0.25)
+
+    draw = ImageDraw.Draw(img)
+    draw.text((80, 60), f"Slide {index + 1}: {' '.join(make_lines(rng, 1)[0].split()[:5])}", fill="white", font=load_font(64))
+    return img
+
+
+def render_photo(rng, size):
+    """Foto sintetis: seperti slide tanpa judul, ukuran kamera"""
+    width, height = size
+    img = Image.merge("RGB", [
+        Image.linear_gradient("L").resize(size),
+        Image.linear_gradient("L").rotate(90).resize(size),
+        Image.new("L", size, rng.randint(40, 200)),
+    ])
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randint(0, width), rng.randint(0, height)
+        r = rng.randint(width // 40, width // 6)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randint(0, 255) for _ in range(3)))
+
+    tile = Image.frombytes("RGB", (320, 240), rng.randbytes(320 * 240 * 3)).resize(size, Image.BILINEAR)
+    return Image.blend(img, tile, 0.2)
+
+
+def save_images_pdf(path, images, resolution):
+    # Tanggal tetap: default PIL menulis waktu sekarang ke info dict
+    images[0].save(path, "PDF", save_all=True, append_images=images[1:], resolution=resolution,
+                   creationDate=FIXED_DATE, modDate=FIXED_DATE)
+
+
+# ===================== OOXML =====================
+def _write_zip(path, files):
+    """Zip dengan timestamp tetap → deterministik"""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in files:
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, data)
+
+
+def _xml_escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def write_docx(path, paragraphs):
+    body = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{_xml_escape(p)}</w:t></w:r></w:p>' for p in paragraphs
+    )
+    _write_zip(path, [
+        ("[Content_Types].xml",
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+         '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+         '<Default Extension="xml" ContentType="application/xml"/>'
+         '<Override PartName="/word/document.xml" '
+         'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+         '</Types>'),
+        ("_rels/.rels",
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+         '<Relationship Id="rId1" '
+         'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+         'Target="word/document.xml"/></Relationships>'),
+        ("word/document.xml",
+         '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+         '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+         f'<w:body>{body}</w:body></w:document>'),
+    ])
+
+
+def write_pptx(path, slides):
+    """PPTX minimal: satu master/layout, setiap slide berisi judul + gambar PNG"""
+    ns = ('xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+          'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+          'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"')
+    rel_ns = 'xmlns="http://schemas.openxmlformats.org/package/2006/relationships"'
+    rel_base = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    empty_tree = ('<p:cSld><p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/>'
+                  '</p:nvGrpSpPr><p:grpSpPr/></p:spTree></p:cSld>')
+    cx, cy = 12192000, 6858000  # 16:9 dalam EMU
+
+    files = [
+        ("_rels/.rels",
+         f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships {rel_ns}>'
+         f'<Relationship Id="rId1" Type="{rel_base}/officeDocument" Target="ppt/presentation.xml"/>'
+         '</Relationships>'),
+        ("ppt/slideMasters/slideMaster1.xml",
+         f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><p:sldMaster {ns}>{empty_tree}'
+         '<p:clrMap bg1="lt1" tx1="dk1" bg2="lt2" tx2="dk2" accent1="accent1" accent2="accent2" '
+         'accent3="accent3" accent4="accent4" accent5="accent5" accent6="accent6" hlink="hlink" folHlink="folHlink"/>'
+         '<p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst></p:sldMaster>'),
+        ("ppt/slideMasters/_rels/slideMaster1.xml.rels",
+         f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships {rel_ns}>'
+         f'<Relationship Id="rId1" Type="{rel_base}/slideLayout" Target="../slideLayouts/slideLayout1.xml"/>'
+         '</Relationships>'),
+        ("ppt/slideLayouts/slideLayout1.xml",
+         f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><p:sldLayout {ns}>{empty_tree}</p:sldLayout>'),
+        ("ppt/slideLayouts/_rels/slideLayout1.xml.rels",
+         f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships {rel_ns}>'
+         f'<Relationship Id="rId1" Type="{rel_base}/slideMaster" Target="../slideMasters/slideMaster1.xml"/>'
+         '</Relationships>'),
+    ]
+
+    slide_ids = []
+    pres_rels = [f'<Relationship Id="rId1" Type="{rel_base}/slideMaster" Target="slideMasters/slideMaster1.xml"/>']
+    overrides = [
+        '<Override PartName="/ppt/presentation.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml"/>',
+        '<Override PartName="/ppt/slideMasters/slideMaster1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.presentationml.slideMaster+xml"/>',
+        '<Override PartName="/ppt/slideLayouts/slideLayout1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.presentationml.slideLayout+xml"/>',
+    ]
+
+    for i, (title, image) in enumerate(slides, start=1):
+        png = io.BytesIO()
+        image.save(png, "PNG")
+        files.append((f"ppt/media/image{i}.png", png.getvalue()))
+        files.append((f"ppt/slides/slide{i}.xml",
+                      f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><p:sld {ns}><p:cSld><p:spTree>'
+                      '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+                      '<p:pic><p:nvPicPr><p:cNvPr id="2" name="Picture"/><p:cNvPicPr/><p:nvPr/></p:nvPicPr>'
+                      '<p:blipFill><a:blip r:embed="rId2"/><a:stretch><a:fillRect/></a:stretch></p:blipFill>'
+                      f'<p:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+                      '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>'
+                      '<p:sp><p:nvSpPr><p:cNvPr id="3" name="Title"/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+                      '<p:spPr><a:xfrm><a:off x="457200" y="274638"/><a:ext cx="8229600" cy="1143000"/></a:xfrm></p:spPr>'
+                      f'<p:txBody><a:bodyPr/><a:p><a:r><a:t>{_xml_escape(title)}</a:t></a:r></a:p></p:txBody></p:sp>'
+                      '</p:spTree></p:cSld></p:sld>'))
+        files.append((f"ppt/slides/_rels/slide{i}.xml.rels",
+                      f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships {rel_ns}>'
+                      f'<Relationship Id="rId1" Type="{rel_base}/slideLayout" Target="../slideLayouts/slideLayout1.xml"/>'
+                      f'<Relationship Id="rId2" Type="{rel_base}/image" Target="../media/image{i}.png"/>'
+                      '</Relationships>'))
+        slide_ids.append(f'<p:sldId id="{255 + i}" r:id="rId{i + 1}"/>')
+        pres_rels.append(f'<Relationship Id="rId{i + 1}" Type="{rel_base}/slide" Target="slides/slide{i}.xml"/>')
+        overrides.append(f'<Override PartName="/ppt/slides/slide{i}.xml" '
+                         'ContentType="application/vnd.openxmlformats-officedocument.presentationml.slide+xml"/>')
+
+    files.append(("ppt/presentation.xml",
+                  f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><p:presentation {ns}>'
+                  '<p:sldMasterIdLst><p:sldMasterId id="2147483648" r:id="rId1"/></p:sldMasterIdLst>'
+                  f'<p:sldIdLst>{"".join(slide_ids)}</p:sldIdLst>'
+                  f'<p:sldSz cx="{cx}" cy="{cy}"/><p:notesSz cx="6858000" cy="9144000"/></p:presentation>'))
+    files.append(("ppt/_rels/presentation.xml.rels",
+                  f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships {rel_ns}>'
+                  f'{"".join(pres_rels)}</Relationships>'))
+    files.insert(0, ("[Content_Types].xml",
+                     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                     '<Default Extension="xml" ContentType="application/xml"/>'
+                     '<Default Extension="png" ContentType="image/png"/>'
+                     f'{"".join(overrides)}</Types>'))
+    _write_zip(path, files)
+
+
+# ===================== CORPUS =====================
+def photo_name(index):
+    return f"photo_{index:02d}.jpg"
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def generate(out_dir, profile="small"):
+    """Generate semua file corpus ke out_dir, return manifest (dict)"""
+    spec = PROFILES[profile]
+    os.makedirs(out_dir, exist_ok=True)
+    entries = []
+
+    def add(name, kind, pages, **extra):
+        path = os.path.join(out_dir, name)
+        entries.append({
+            "name": name, "kind": kind, "pages": pages,
+            "size": os.path.getsize(path), "sha256": sha256_file(path), **extra
+        })
+        print(f"📄 {name} ({kind}, {pages} pages, {os.path.getsize(path)} bytes)")
+
+    # Born-digital
+    rng = make_rng("digital")
+    write_text_pdf(os.path.join(out_dir, "digital.pdf"), [make_lines(rng, 45) for _ in range(spec["digital_pages"])])
+    add("digital.pdf", "digital", spec["digital_pages"])
+
+    # Scan 300 DPI dengan ground truth
+    rng = make_rng("scanned")
+    scanned_text = [make_lines(rng, 30) for _ in range(spec["scanned_pages"])]
+    save_images_pdf(os.path.join(out_dir, "scanned.pdf"),
+                    [render_scan_page(lines, rng=rng) for lines in scanned_text], 300.0)
+    add("scanned.pdf", "scanned", spec["scanned_pages"],
+        expected_text=["\n".join(lines) for lines in scanned_text])
+
+    # Campuran: halaman genap digital, ganjil scan
+    rng = make_rng("mixed")
+    mixed_digital = os.path.join(out_dir, "_mixed_digital.pdf")
+    mixed_scanned = os.path.join(out_dir, "_mixed_scanned.pdf")
+    half = spec["mixed_pages"] // 2
+    write_text_pdf(mixed_digital, [make_lines(rng, 45) for _ in range(half)])
+    mixed_text = [make_lines(rng, 30) for _ in range(spec["mixed_pages"] - half)]
+    save_images_pdf(mixed_scanned, [render_scan_page(lines, rng=rng) for lines in mixed_text], 300.0)
+
+    digital_reader = PyPDF2.PdfReader(mixed_digital)
+    scanned_reader = PyPDF2.PdfReader(mixed_scanned)
+    writer = PyPDF2.PdfWriter()
+    for i in range(spec["mixed_pages"]):
+        source = scanned_reader if i % 2 == 0 else digital_reader
+        writer.add_page(source.pages[i // 2])
+    with open(os.path.join(out_dir, "mixed.pdf"), "wb") as f:
+        writer.write(f)
+    os.remove(mixed_digital)
+    os.remove(mixed_scanned)
+    add("mixed.pdf", "mixed", spec["mixed_pages"], ocr_pages=len(mixed_text))
+
+    # Terenkripsi (password user = ENCRYPTED_PASSWORD)
+    writer = PyPDF2.PdfWriter()
+    for page in PyPDF2.PdfReader(os.path.join(out_dir, "digital.pdf")).pages:
+        writer.add_page(page)
+    writer.encrypt(ENCRYPTED_PASSWORD)
+    with open(os.path.join(out_dir, "encrypted.pdf"), "wb") as f:
+        writer.write(f)
+    add("encrypted.pdf", "encrypted", spec["digital_pages"], password=ENCRYPTED_PASSWORD, deterministic=False)
+
+    # Dokumen besar
+    rng = make_rng("large")
+    write_text_pdf(os.path.join(out_dir, "large.pdf"), [make_lines(rng, 45) for _ in range(spec["large_pages"])])
+    add("large.pdf", "large", spec["large_pages"])
+
+    # Slide penuh gambar (PDF + PPTX + satu PNG untuk convert-image)
+    rng = make_rng("slides")
+    slides = [render_slide(rng, i) for i in range(spec["slides"])]
+    save_images_pdf(os.path.join(out_dir, "slides.pdf"), slides, 150.0)
+    add("slides.pdf", "slides", spec["slides"])
+
+    write_pptx(os.path.join(out_dir, "slides.pptx"), [(f"Slide {i + 1}", img) for i, img in enumerate(slides)])
+    add("slides.pptx", "pptx", spec["slides"])
+
+    slides[0].save(os.path.join(out_dir, "slide.png"), "PNG")
+    add("slide.png", "image", 1)
+
+    # DOCX
+    rng = make_rng("docx")
+    write_docx(os.path.join(out_dir, "document.docx"), make_lines(rng, 40 * spec["digital_pages"]))
+    add("document.docx", "docx", None)
+
+    # TIFF multi-halaman dan satu raster besar
+    rng = make_rng("tiff")
+    tiff_pages = [render_scan_page(make_lines(rng, 30), rng=rng) for _ in range(spec["tiff_pages"])]
+    tiff_pages[0].save(os.path.join(out_dir, "multipage.tif"), "TIFF", save_all=True,
+                       append_images=tiff_pages[1:], compression="tiff_lzw", dpi=(300, 300))
+    add("multipage.tif", "tiff", spec["tiff_pages"])
+
+    large_raster = render_scan_page(make_lines(rng, 120), size=spec["tiff_large_size"], rng=rng)
+    large_raster.save(os.path.join(out_dir, "large_raster.tif"), "TIFF", compression="tiff_lzw", dpi=(300, 300))
+    add("large_raster.tif", "tiff_large", 1, dimensions=list(spec["tiff_large_size"]))
+
+    # Batch foto JPEG untuk convert-image files[]; setiap foto ke-5 portrait via EXIF orientation
+    rng = make_rng("photos")
+    for i in range(1, spec["photos"] + 1):
+        exif = Image.Exif()
+        if i % 5 == 0:
+            exif[0x0112] = 6
+        name = photo_name(i)
+        render_photo(rng, spec["photo_size"]).save(os.path.join(out_dir, name), "JPEG", quality=88, exif=exif)
+        add(name, "photo", 1, dimensions=list(spec["photo_size"]))
+
+    manifest = {
+        "corpus_version": CORPUS_VERSION,
+        "seed": CORPUS_SEED,
+        "profile": profile,
+        "files": entries,
+    }
+    # Fingerprint hanya dari file deterministik
+    manifest["fingerprint"] = hashlib.sha256(
+        "".join(e["sha256"] for e in entries if e.get("deterministic", True)).encode()
+    ).hexdigest()[:16]
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def ensure_corpus(profile="small", base_dir=None, force=False):
+    """Generate corpus jika belum ada (atau versi berbeda), return (dir, manifest)"""
+    out_dir = os.path.join(base_dir or DEFAULT_CORPUS_DIR, f"v{CORPUS_VERSION}-{profile}")
+    manifest_path = os.path.join(out_dir, "manifest.json")
+
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("corpus_version") == CORPUS_VERSION:
+            return out_dir, manifest
+
+    return out_dir, generate(out_dir, profile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--out", default=None, help=f"Base folder (default {DEFAULT_CORPUS_DIR})")
+    parser.add_argument("--force", action="store_true", help="Generate ulang walau sudah ada")
+    args = parser.parse_args()
+
+    out_dir, manifest = ensure_corpus(args.profile, args.out, args.force)
+    print(json.dumps({"dir": out_dir, "fingerprint": manifest["fingerprint"], "files": len(manifest["files"])}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
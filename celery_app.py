@@ -5,7 +5,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-def make_celery():
+def get_redis_url():
     # Get Redis password from environment
     redis_password = os.getenv('REDIS_PASSWORD', '')
     redis_host = os.getenv('REDIS_HOST', 'localhost')
@@ -14,11 +14,13 @@ def make_celery():
     
     # Build Redis URL with password
     if redis_password:
-        broker_url = f'redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}'
-        backend_url = f'redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}'
-    else:
-        broker_url = f'redis://{redis_host}:{redis_port}/{redis_db}'
-        backend_url = f'redis://{redis_host}:{redis_port}/{redis_db}'
+        return f'redis://:{redis_password}@{redis_host}:{redis_port}/{redis_db}'
+    return f'redis://{redis_host}:{redis_port}/{redis_db}'
+
+
+def make_celery():
+    broker_url = get_redis_url()
+    backend_url = get_redis_url()
     
     celery = Celery(
         'dokumi_ocr',
@@ -33,6 +35,13 @@ def make_celery():
         timezone='Asia/Jakarta',
         enable_utc=True,
         broker_connection_retry_on_startup=True,
+        # Jalankan dengan: celery -A tasks beat
+        beat_schedule={
+            'reconcile-ocr-stats': {
+                'task': 'tasks.reconcile_ocr_stats_task',
+                'schedule': float(os.getenv('OCR_STATS_RECONCILE_SECONDS', 900)),
+            },
+        },
     )
     
     return celery
\ No newline at end of file
@@ -0,0 +1,155 @@
+# db.py
+import os
+import time
+import threading
+from contextlib import contextmanager
+from mysql.connector import Error
+from mysql.connector.pooling import MySQLConnectionPool
+from mysql.connector.errors import PoolError
+from dotenv import load_dotenv
+import metrics
+
+load_dotenv()
+
+# Connection pool MySQL per process, dipakai bersama oleh app.py dan tasks.py.
+# Celery prefork child memproses satu task sekaligus. Gunicorn gthread worker
+# menjalankan GUNICORN_THREADS request paralel per process, tetapi koneksi hanya
+# dipinjam selama query (SSE/long-poll menunggu di Redis, bukan di MySQL),
+# jadi pool tetap kecil; naikkan DB_POOL_SIZE jika waits/timeouts di /db/pool tinggi.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 4))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))  # detik menunggu koneksi bebas
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+_stats_lock = threading.Lock()
+_stats = {
+    "checkouts": 0,
+    "waits": 0,
+    "wait_seconds": 0.0,
+    "timeouts": 0,
+}
+
+
+def _db_config():
+    return {
+        "host": os.getenv('DB_HOST', '127.0.0.1'),
+        "user": os.getenv('DB_USER', 'root'),
+        "password": os.getenv('DB_PASS', ''),
+        "database": os.getenv('DB_NAME', 'dokumi'),
+        "port": int(os.getenv('DB_PORT', 3306)),
+        "charset": 'utf8mb4',
+        "use_unicode": True,
+    }
+
+
+def get_pool():
+    """Pool milik process ini (dibuat ulang setelah fork)"""
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = MySQLConnectionPool(
+                pool_name=f"dokumi_{os.getpid()}",
+                pool_size=DB_POOL_SIZE,
+                pool_reset_session=True,
+                **_db_config()
+            )
+            _pool_pid = os.getpid()
+            print(f"🔌 MySQL pool created (size={DB_POOL_SIZE}, pid={os.getpid()})")
+
+        return _pool
+
+
+def acquire_connection(timeout=None):
+    """
+    Ambil koneksi dari pool, tunggu sampai timeout jika pool sedang penuh.
+    Pool melakukan health check (ping + reconnect) sebelum koneksi diberikan.
+    conn.close() mengembalikan koneksi ke pool.
+    """
+    timeout = DB_POOL_TIMEOUT if timeout is None else timeout
+    pool = get_pool()
+    started = time.time()
+    waited = False
+
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except PoolError:
+            if not waited:
+                waited = True
+                with _stats_lock:
+                    _stats["waits"] += 1
+
+            if time.time() - started > timeout:
+                with _stats_lock:
+                    _stats["timeouts"] += 1
+                raise
+
+            time.sleep(0.05)
+
+    with _stats_lock:
+        _stats["checkouts"] += 1
+        if waited:
+            _stats["wait_seconds"] += time.time() - started
+
+    return conn
+
+
+def get_db_connection():
+    """
+    Kompatibel dengan helper lama: return koneksi dari pool atau None jika gagal.
+    Pemanggil wajib conn.close() (mengembalikan ke pool).
+    """
+    try:
+        return acquire_connection()
+    except Error as e:
+        print(f"❌ Database connection error: {e}")
+        return None
+
+
+@contextmanager
+def db_connection():
+    """Context manager: koneksi selalu dikembalikan ke pool"""
+    conn = acquire_connection()
+    try:
+        yield conn
+    finally:
+        try:
+            conn.close()
+        except Error:
+            pass
+
+
+@contextmanager
+def db_cursor(dictionary=False):
+    """
+    Context manager cursor: commit jika sukses, rollback jika error,
+    cursor ditutup dan koneksi dikembalikan ke pool.
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor(dictionary=dictionary)
+        started = time.perf_counter()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Error:
+                pass
+            raise
+        finally:
+            cursor.close()
+            metrics.observe_db(time.perf_counter() - started)
+
+
+def pool_stats():
+    """Statistik pool untuk monitoring"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["pool_size"] = DB_POOL_SIZE
+    stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+    return stats
@@ -1,4 +1,5 @@
 # gunicorn_config.py
+import os
 import multiprocessing
 from dotenv import load_dotenv
 load_dotenv()
@@ -9,8 +10,13 @@ bind = os.getenv("GUNICORN_BIND", "127.0.0.1:5001")
 backlog = 2048
 
 # Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "sync"
+# gthread: setiap process melayani beberapa request sekaligus (satu per thread).
+# Wajib untuk endpoint yang menahan koneksi lama: SSE (/ocr/events, /jobs/<id>/events,
+# sampai PROGRESS_STREAM_MAX detik) dan long-poll ?wait= (sampai PROGRESS_WAIT_MAX).
+# Dengan sync worker setiap koneksi itu memakan satu process penuh.
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 16))
 worker_connections = 1000
 timeout = 300  # 5 menit untuk operasi berat (OCR, compress)
 keepalive = 2
@@ -37,4 +43,9 @@ tmp_upload_dir = "/tmp"
 
 # SSL (jika diperlukan langsung di Gunicorn, tapi Anda sudah pakai Apache)
 # keyfile = None
-# certfile = None
\ No newline at end of file
+# certfile = None
+
+# Hapus file metrics Prometheus milik worker yang sudah exit (multiprocess mode)
+def child_exit(server, worker):
+    import metrics
+    metrics.mark_process_dead(worker.pid)
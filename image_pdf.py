@@ -0,0 +1,670 @@
+# image_pdf.py
+import io
+import os
+import math
+import zlib
+import struct
+from PIL import Image, ImageOps, ImageSequence, TiffImagePlugin, TiffTags
+from dotenv import load_dotenv
+import metrics
+
+load_dotenv()
+
+# Engine image → PDF tanpa PIL PdfImagePlugin.
+#
+# - JPEG di-embed apa adanya sebagai /DCTDecode: tidak decode, tidak
+#   re-encode, kualitas sama persis dengan file asli.
+# - PNG 8-bit gray/RGB tanpa transparansi: data IDAT di-embed langsung
+#   sebagai /FlateDecode dengan PNG predictor (juga tanpa decode).
+# - TIFF (termasuk multi-halaman hasil scanner) diproses frame per frame,
+#   satu image stream per frame: frame satu strip dengan kompresi yang punya
+#   padanan filter PDF (JPEG, LZW, Deflate, CCITT G4) di-embed tanpa decode;
+#   frame multi-strip disambung (tanpa kompresi/Deflate: di-inflate lalu
+#   di-Flate ulang, G4: di-encode ulang satu strip) atau di-decode per band.
+# - Format lain (PNG alpha/palette, GIF, BMP, ...) baru di-decode, lalu
+#   ditulis lossless (Flate) per band baris.
+# - Raster sangat besar (> IMAGE_PDF_MAX_PIXELS) di-decode dengan resolusi
+#   diturunkan ke IMAGE_PDF_TARGET_DPI (JPEG: Image.draft, TIFF: per band
+#   + Image.reduce), ukuran halaman tetap sama.
+#
+# PDF ditulis streaming: satu image → satu halaman langsung ke file, sehingga
+# memory dibatasi oleh satu image (atau satu band untuk TIFF), bukan jumlah image.
+
+# Ukuran halaman = pixel * 72 / DPI (sama dengan resolution=100 versi PIL sebelumnya)
+IMAGE_PDF_DPI = float(os.getenv("IMAGE_PDF_DPI", 100))
+IMAGE_PDF_FLATE_LEVEL = int(os.getenv("IMAGE_PDF_FLATE_LEVEL", 6))
+
+# Frame di atas jumlah pixel ini diturunkan resolusinya (0 = tidak pernah).
+# Default ~ A2 @300 DPI; A0 @300 DPI (140 MP) diturunkan.
+IMAGE_PDF_MAX_PIXELS = int(os.getenv("IMAGE_PDF_MAX_PIXELS", 40_000_000))
+IMAGE_PDF_TARGET_DPI = float(os.getenv("IMAGE_PDF_TARGET_DPI", 150))
+IMAGE_PDF_JPEG_QUALITY = int(os.getenv("IMAGE_PDF_JPEG_QUALITY", 85))
+# Target ukuran satu band hasil decode TIFF (byte)
+IMAGE_PDF_BAND_BYTES = int(os.getenv("IMAGE_PDF_BAND_BYTES", 16 * 1024 * 1024))
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# EXIF orientation → /Rotate halaman. Orientation mirror (2, 4, 5, 7) harus di-decode.
+EXIF_ORIENTATION = 0x0112
+EXIF_ORIENTATION_ROTATE = {1: 0, 3: 180, 6: 90, 8: 270}
+
+COLORSPACES = {"1": "/DeviceGray", "L": "/DeviceGray", "RGB": "/DeviceRGB", "CMYK": "/DeviceCMYK"}
+
+# TIFF tags
+TIFF_IMAGE_LENGTH = 257
+TIFF_BITS_PER_SAMPLE = 258
+TIFF_COMPRESSION = 259
+TIFF_PHOTOMETRIC = 262
+TIFF_FILL_ORDER = 266
+TIFF_STRIP_OFFSETS = 273
+TIFF_SAMPLES_PER_PIXEL = 277
+TIFF_ROWS_PER_STRIP = 278
+TIFF_STRIP_BYTE_COUNTS = 279
+TIFF_PLANAR_CONFIG = 284
+TIFF_T6_OPTIONS = 293
+TIFF_PREDICTOR = 317
+TIFF_TILE_WIDTH = 322
+TIFF_JPEG_TABLES = 347
+
+TIFF_COMPRESSION_NONE = 1
+TIFF_COMPRESSION_CCITT_G4 = 4
+TIFF_COMPRESSION_LZW = 5
+TIFF_COMPRESSION_JPEG = 7  # "new style" JPEG; old style (6) di-decode
+TIFF_COMPRESSION_DEFLATE = (8, 32946)
+
+
+def _num(value):
+    return f"{value:.4f}".rstrip("0").rstrip(".")
+
+
+def _file_chunks(path, offset=0, length=None):
+    """Baca file (atau sebagian) per chunk tanpa memuat semuanya ke memory"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        remaining = length
+        while remaining is None or remaining > 0:
+            chunk = f.read(COPY_CHUNK_SIZE if remaining is None else min(COPY_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+
+def _deflate_chunks(chunks):
+    compressor = zlib.compressobj(IMAGE_PDF_FLATE_LEVEL)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ===================== PDF WRITER =====================
+class PdfImageWriter:
+    """
+    Writer PDF minimal: setiap halaman berisi satu image full page.
+    Object 1 = Catalog, 2 = Pages (ditulis saat close karena /Kids baru lengkap di akhir).
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.offsets = {}
+        self.next_id = 3
+        self.page_ids = []
+        self.passthrough_pages = 0
+        self.reduced_pages = 0
+        fp.write(b"%PDF-1.5\n%\xe2\xe3\xcf\xd3\n")
+
+    def _alloc(self):
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id, body):
+        self.offsets[obj_id] = self.fp.tell()
+        self.fp.write(f"{obj_id} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+
+    def _write_stream(self, obj_id, entries, chunks):
+        """Stream dengan /Length indirect, jadi data bisa ditulis tanpa tahu ukurannya dulu"""
+        length_id = self._alloc()
+        self.offsets[obj_id] = self.fp.tell()
+        self.fp.write(f"{obj_id} 0 obj\n<< {entries} /Length {length_id} 0 R >>\nstream\n".encode("latin-1"))
+
+        length = 0
+        for chunk in chunks:
+            self.fp.write(chunk)
+            length += len(chunk)
+
+        self.fp.write(b"\nendstream\nendobj\n")
+        self._write_object(length_id, str(length))
+
+    def add_image_page(self, spec, dpi=None):
+        """
+        spec: width, height, colorspace, bpc, filter, decode_parms, decode, rotate, passthrough,
+        source_size (pixel asli untuk ukuran halaman jika resolusi diturunkan) dan
+        chunks (satu image) atau strips [(rows, chunks[, decode_parms]), ...] dari atas ke bawah,
+        setiap strip menjadi XObject sendiri yang digambar berdempetan (hanya band JPEG hasil
+        reduce, lihat _decoded_spec).
+        """
+        source_width, source_height = spec.get("source_size") or (spec["width"], spec["height"])
+        width_pt = source_width * 72.0 / (dpi or IMAGE_PDF_DPI)
+        height_pt = source_height * 72.0 / (dpi or IMAGE_PDF_DPI)
+        row_pt = height_pt / spec["height"]
+
+        strips = spec.get("strips") or [(spec["height"], spec["chunks"])]
+        xobjects = []
+        draws = []
+        top = 0
+        for index, (rows, chunks, *strip_parms) in enumerate(strips):
+            image_id = self._alloc()
+            entries = (
+                f"/Type /XObject /Subtype /Image /Width {spec['width']} /Height {rows} "
+                f"/ColorSpace {spec['colorspace']} /BitsPerComponent {spec['bpc']} /Filter {spec['filter']}"
+            )
+            decode_parms = strip_parms[0] if strip_parms else spec.get("decode_parms")
+            if decode_parms:
+                entries += f" /DecodeParms {decode_parms}"
+            if spec.get("decode"):
+                entries += f" /Decode {spec['decode']}"
+            self._write_stream(image_id, entries, chunks)
+
+            bottom_pt = (spec["height"] - top - rows) * row_pt
+            xobjects.append(f"/Im{index} {image_id} 0 R")
+            draws.append(f"q {_num(width_pt)} 0 0 {_num(rows * row_pt)} 0 {_num(bottom_pt)} cm /Im{index} Do Q")
+            top += rows
+
+        content_id = self._alloc()
+        self._write_stream(content_id, "", ["\n".join(draws).encode("latin-1")])
+
+        page_id = self._alloc()
+        page = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_num(width_pt)} {_num(height_pt)}] "
+            f"/Resources << /XObject << {' '.join(xobjects)} >> >> /Contents {content_id} 0 R"
+        )
+        if spec.get("rotate"):
+            page += f" /Rotate {spec['rotate']}"
+        self._write_object(page_id, page + " >>")
+
+        self.page_ids.append(page_id)
+        if spec["passthrough"]:
+            self.passthrough_pages += 1
+        if spec.get("source_size"):
+            self.reduced_pages += 1
+
+    def close(self):
+        if not self.page_ids:
+            raise ValueError("Tidak ada halaman untuk ditulis")
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        self._write_object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self.fp.tell()
+        size = self.next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, size)]
+        lines.append(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self.fp.write("".join(lines).encode("latin-1"))
+
+
+# ===================== PASSTHROUGH =====================
+def _jpeg_spec(path, img):
+    """JPEG file → /DCTDecode passthrough, None jika harus di-decode"""
+    if img.mode not in ("L", "RGB", "CMYK"):
+        return None
+
+    orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+    if orientation not in EXIF_ORIENTATION_ROTATE:
+        return None
+
+    return {
+        "width": img.width,
+        "height": img.height,
+        "colorspace": COLORSPACES[img.mode],
+        "bpc": 8,
+        "filter": "/DCTDecode",
+        # CMYK dari Photoshop (marker Adobe) disimpan inverted
+        "decode": "[1 0 1 0 1 0 1 0]" if img.mode == "CMYK" and "adobe" in img.info else None,
+        "rotate": EXIF_ORIENTATION_ROTATE[orientation],
+        "chunks": _file_chunks(path),
+        "passthrough": True,
+    }
+
+
+def _png_spec(path):
+    """
+    PNG 8-bit gray/RGB non-interlaced tanpa transparansi → IDAT langsung sebagai
+    /FlateDecode + PNG predictor (format filter baris PNG sama dengan PDF).
+    """
+    with open(path, "rb") as f:
+        if f.read(8) != b"\x89PNG\r\n\x1a\n":
+            return None
+
+        header = None
+        idat = []
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return None
+            length, chunk_type = struct.unpack(">I4s", chunk_header)
+
+            if chunk_type == b"IHDR":
+                header = struct.unpack(">IIBBBBB", f.read(13))
+                f.seek(4, os.SEEK_CUR)
+            elif chunk_type == b"IDAT":
+                idat.append((f.tell(), length))
+                f.seek(length + 4, os.SEEK_CUR)
+            elif chunk_type == b"tRNS":
+                return None
+            elif chunk_type == b"IEND":
+                break
+            else:
+                f.seek(length + 4, os.SEEK_CUR)
+
+    if header is None or not idat:
+        return None
+
+    width, height, depth, color_type, _compression, _filter, interlace = header
+    if depth != 8 or interlace != 0 or color_type not in (0, 2):
+        return None
+
+    colors = 1 if color_type == 0 else 3
+    return {
+        "width": width,
+        "height": height,
+        "colorspace": "/DeviceGray" if colors == 1 else "/DeviceRGB",
+        "bpc": 8,
+        "filter": "/FlateDecode",
+        "decode_parms": f"<< /Predictor 15 /Colors {colors} /BitsPerComponent 8 /Columns {width} >>",
+        "rotate": 0,
+        "chunks": (data for offset, length in idat for data in _file_chunks(path, offset, length)),
+        "passthrough": True,
+    }
+
+
+def _tiff_strips(frame):
+    """(offsets, byte_counts, rows_per_strip) untuk TIFF berbasis strip, None jika tiled/planar"""
+    tags = frame.tag_v2
+    if TIFF_TILE_WIDTH in tags or tags.get(TIFF_PLANAR_CONFIG, 1) != 1:
+        return None
+
+    offsets = tags.get(TIFF_STRIP_OFFSETS)
+    counts = tags.get(TIFF_STRIP_BYTE_COUNTS)
+    rows_per_strip = min(tags.get(TIFF_ROWS_PER_STRIP, frame.height), frame.height)
+    if not offsets or not counts or len(offsets) != len(counts):
+        return None
+    if len(offsets) != -(-frame.height // rows_per_strip):
+        return None
+    return offsets, counts, rows_per_strip
+
+
+def _join_jpeg_tables(tables, strip_chunks):
+    yield tables
+    yield from strip_chunks
+
+
+def _tiff_raw_chunks(path, offsets, counts, compression):
+    """Data pixel mentah semua strip berurutan; strip Deflate di-inflate per chunk"""
+    for offset, count in zip(offsets, counts):
+        if compression == TIFF_COMPRESSION_NONE:
+            yield from _file_chunks(path, offset, count)
+            continue
+
+        inflater = zlib.decompressobj()
+        for chunk in _file_chunks(path, offset, count):
+            yield inflater.decompress(chunk)
+        yield inflater.flush()
+
+
+def _g4_single_strip(path, frame):
+    """
+    Frame G4 multi-strip → (data G4 satu strip, BlackIs1), None jika gagal.
+    Strip G4 tidak bisa disambung (baris referensi di-reset setiap strip), jadi
+    frame di-decode utuh lalu di-encode ulang lossless oleh libtiff.
+    """
+    img = next(_tiff_band_images(path, frame, len(_tiff_strips(frame)[0])))
+    if img.mode != "1":
+        return None
+
+    out = io.BytesIO()
+    try:
+        img.save(out, "TIFF", compression="group4", tiffinfo={TIFF_ROWS_PER_STRIP: img.height})
+    except (OSError, ValueError):
+        return None
+
+    tags = Image.open(out).tag_v2
+    offsets, counts = tags.get(TIFF_STRIP_OFFSETS), tags.get(TIFF_STRIP_BYTE_COUNTS)
+    if not offsets or len(offsets) != 1 or tags.get(TIFF_FILL_ORDER, 1) != 1:
+        return None
+    data = out.getvalue()[offsets[0]:offsets[0] + counts[0]]
+    return data, tags.get(TIFF_PHOTOMETRIC) == 1
+
+
+def _tiff_strip_spec(path, frame):
+    """
+    Frame TIFF berbasis strip → satu image stream tanpa decode pixel oleh PIL:
+    - satu strip: JPEG (+ JPEGTables) → DCTDecode, LZW → LZWDecode,
+      Deflate → FlateDecode, CCITT G4 → CCITTFaxDecode, apa adanya,
+    - tanpa kompresi / Deflate multi-strip: di-inflate berurutan → satu stream Flate,
+    - G4 multi-strip: di-encode ulang menjadi satu stream CCITT (/Rows = tinggi frame).
+    None jika harus di-decode per band (termasuk JPEG dan LZW multi-strip).
+    """
+    layout = _tiff_strips(frame)
+    if layout is None:
+        return None
+    offsets, counts, _rows_per_strip = layout
+    single = len(offsets) == 1
+
+    tags = frame.tag_v2
+    compression = tags.get(TIFF_COMPRESSION, TIFF_COMPRESSION_NONE)
+    photometric = tags.get(TIFF_PHOTOMETRIC)
+    samples = tags.get(TIFF_SAMPLES_PER_PIXEL, 1)
+    bits = tags.get(TIFF_BITS_PER_SAMPLE, (1,))
+    bits = bits if isinstance(bits, tuple) else (bits,)
+    predictor = tags.get(TIFF_PREDICTOR, 1)
+
+    if len(set(bits)) != 1 or bits[0] not in (1, 8) or tags.get(TIFF_FILL_ORDER, 1) != 1:
+        return None
+    bpc = bits[0]
+
+    if samples == 1 and photometric in (0, 1):
+        colorspace = "/DeviceGray"
+    elif samples == 3 and photometric in (2, 6) and bpc == 8:
+        colorspace = "/DeviceRGB"
+    else:
+        return None
+
+    # WhiteIsZero: nilai sample kebalikan DeviceGray
+    decode = "[1 0]" if photometric == 0 else None
+    decode_parms = None
+    passthrough = True
+
+    if compression == TIFF_COMPRESSION_JPEG:
+        # Strip JPEG masing-masing file JPEG utuh, tidak bisa disambung jadi satu stream
+        if bpc != 8 or not single:
+            return None
+        filter_name = "/DCTDecode"
+        if photometric == 2:
+            # Data JPEG RGB tanpa konversi YCbCr
+            decode_parms = "<< /ColorTransform 0 >>"
+        tables = tags.get(TIFF_JPEG_TABLES)
+        if tables:
+            tables = bytes(tables)
+            if not (tables.startswith(b"\xff\xd8") and tables.endswith(b"\xff\xd9")):
+                return None
+            # Tabel (DQT/DHT) disimpan terpisah: SOI+tabel (tanpa EOI) + strip (tanpa SOI)
+            chunks = _join_jpeg_tables(tables[:-2], _file_chunks(path, offsets[0] + 2, counts[0] - 2))
+        else:
+            chunks = _file_chunks(path, offsets[0], counts[0])
+    elif photometric == 6:
+        # YCbCr non-JPEG (subsampled) tidak ada padanannya di PDF
+        return None
+    elif compression == TIFF_COMPRESSION_CCITT_G4:
+        if bpc != 1 or tags.get(TIFF_T6_OPTIONS, 0) != 0:
+            return None
+        filter_name = "/CCITTFaxDecode"
+        # Run "putih" CCITT = sample 0; BlackIsZero (1) di-invert lewat /BlackIs1
+        decode = None
+        if single:
+            chunks = _file_chunks(path, offsets[0], counts[0])
+            black_is_1 = photometric == 1
+        else:
+            encoded = _g4_single_strip(path, frame)
+            if encoded is None:
+                return None
+            data, black_is_1 = encoded
+            chunks = [data]
+            passthrough = False
+        decode_parms = (
+            f"<< /K -1 /Columns {frame.width} /Rows {frame.height}{' /BlackIs1 true' if black_is_1 else ''} >>"
+        )
+    elif compression in (TIFF_COMPRESSION_NONE, TIFF_COMPRESSION_LZW) + TIFF_COMPRESSION_DEFLATE:
+        if predictor not in (1, 2) or (predictor == 2 and bpc != 8):
+            return None
+        if compression == TIFF_COMPRESSION_LZW and not single:
+            # Tidak ada decoder LZW streaming di stdlib: decode per band lewat libtiff
+            return None
+
+        filter_name = "/LZWDecode" if compression == TIFF_COMPRESSION_LZW else "/FlateDecode"
+        if predictor == 2:
+            # Predictor per baris, tetap berlaku setelah strip disambung
+            decode_parms = f"<< /Predictor 2 /Colors {samples} /BitsPerComponent {bpc} /Columns {frame.width} >>"
+        if single and compression != TIFF_COMPRESSION_NONE:
+            chunks = _file_chunks(path, offsets[0], counts[0])
+        else:
+            chunks = _deflate_chunks(_tiff_raw_chunks(path, offsets, counts, compression))
+    else:
+        return None
+
+    return {
+        "width": frame.width,
+        "height": frame.height,
+        "colorspace": colorspace,
+        "bpc": bpc,
+        "filter": filter_name,
+        "decode_parms": decode_parms,
+        "decode": decode,
+        "rotate": 0,
+        "chunks": chunks,
+        "passthrough": passthrough,
+    }
+
+
+# ===================== DECODE =====================
+def reduce_factor(img):
+    """
+    Faktor penurunan resolusi (integer) untuk raster sangat besar, 1 jika tidak perlu.
+    Pakai DPI sumber jika ada, selain itu cukup sampai di bawah IMAGE_PDF_MAX_PIXELS.
+    """
+    pixels = img.width * img.height
+    if not IMAGE_PDF_MAX_PIXELS or pixels <= IMAGE_PDF_MAX_PIXELS:
+        return 1
+
+    dpi = img.info.get("dpi")
+    source_dpi = float(dpi[0]) if dpi and dpi[0] else 0
+    if IMAGE_PDF_TARGET_DPI and source_dpi > IMAGE_PDF_TARGET_DPI:
+        return max(1, int(source_dpi // IMAGE_PDF_TARGET_DPI))
+    return max(1, math.ceil(math.sqrt(pixels / IMAGE_PDF_MAX_PIXELS)))
+
+
+def _flatten(img):
+    """Mode PDF-friendly: alpha/palette di-composite ke background putih (seperti versi PIL sebelumnya)"""
+    if img.mode in ('RGBA', 'LA', 'P', 'PA'):
+        if img.mode in ('P', 'PA'):
+            img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    if img.mode in COLORSPACES:
+        return img
+    if img.mode.startswith('I') or img.mode == 'F':
+        return img.convert('L')
+    return img.convert('RGB')
+
+
+def _prepare(img, factor):
+    img = _flatten(img)
+    if factor > 1:
+        if img.mode == "1":
+            img = img.convert("L")
+        img = img.reduce(factor)
+    return img
+
+
+def _raw_rows(img):
+    """Pixel mentah per band baris, tanpa menyalin seluruh raw image sekaligus"""
+    row_bytes = len(img.crop((0, 0, img.width, 1)).tobytes())
+    band = max(1, COPY_CHUNK_SIZE // max(row_bytes, 1))
+    for top in range(0, img.height, band):
+        yield img.crop((0, top, img.width, min(top + band, img.height))).tobytes()
+
+
+def _jpeg_chunks(img):
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=IMAGE_PDF_JPEG_QUALITY)
+    return [out.getvalue()]
+
+
+def _decoded_spec(bands, size, mode, source_size=None, bilevel=False):
+    """
+    Spec dari image hasil decode. bands: iterator image (atas ke bawah), size/mode
+    hasil akhir. Semua band ditulis sebagai satu stream Flate lossless. Jika resolusi
+    diturunkan (source_size di-set) hasilnya ditulis JPEG per band (kecuali sumber
+    bilevel/scan text), satu XObject per band agar memory tetap satu band.
+    """
+    lossy = source_size is not None and not bilevel and mode in ("L", "RGB", "CMYK")
+
+    spec = {
+        "width": size[0],
+        "height": size[1],
+        "source_size": source_size,
+        "colorspace": COLORSPACES[mode],
+        "bpc": 1 if mode == "1" else 8,
+        "filter": "/DCTDecode" if lossy else "/FlateDecode",
+        # CMYK JPEG dari PIL ditulis dengan marker Adobe (inverted)
+        "decode": "[1 0 1 0 1 0 1 0]" if lossy and mode == "CMYK" else None,
+        "rotate": 0,
+        "passthrough": False,
+    }
+    if lossy:
+        spec["strips"] = ((band.height, _jpeg_chunks(band)) for band in bands)
+    else:
+        spec["chunks"] = _deflate_chunks(data for band in bands for data in _raw_rows(band))
+    return spec
+
+
+def _whole_image_spec(img, factor=1):
+    """
+    Decode satu frame utuh (format tanpa strip). JPEG besar di-decode langsung
+    dalam skala kecil via Image.draft, format lain full decode lalu reduce.
+    """
+    orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+    source_size = img.size[::-1] if orientation in (5, 6, 7, 8) else img.size
+    bilevel = img.mode == "1"
+
+    if factor > 1 and img.format == "JPEG":
+        requested = (img.width // factor, img.height // factor)
+        img.draft(img.mode, requested)
+        # draft hanya skala 1/2, 1/4, 1/8 (hasil >= requested): sisanya lewat reduce
+        factor = max(1, img.width // max(requested[0], 1))
+    if orientation != 1:
+        img = ImageOps.exif_transpose(img)
+
+    img = _prepare(img, factor)
+    reduced = img.size != source_size
+    return _decoded_spec(iter([img]), img.size, img.mode,
+                         source_size=source_size if reduced else None, bilevel=bilevel)
+
+
+def _tiff_band_images(path, frame, strips_per_band):
+    """
+    Decode frame TIFF per kelompok strip: setiap band dibungkus menjadi TIFF kecil
+    di memory (tag frame asli + strip band itu) lalu di-decode PIL/libtiff.
+    Peak memory = satu band, bukan satu frame.
+    """
+    offsets, counts, rows_per_strip = _tiff_strips(frame)
+    tags = frame.tag_v2
+
+    with open(path, "rb") as f:
+        for first in range(0, len(offsets), strips_per_band):
+            last = min(first + strips_per_band, len(offsets))
+            rows = min(frame.height, last * rows_per_strip) - first * rows_per_strip
+
+            data = bytearray()
+            band_offsets = []
+            for index in range(first, last):
+                f.seek(offsets[index])
+                band_offsets.append(len(data))
+                data += f.read(counts[index])
+
+            ifd = TiffImagePlugin.ImageFileDirectory_v2(prefix=b"II")
+            for tag, value in tags.items():
+                if tag not in (TIFF_STRIP_OFFSETS, TIFF_STRIP_BYTE_COUNTS):
+                    ifd[tag] = value
+                    ifd.tagtype[tag] = tags.tagtype[tag]
+            ifd[TIFF_IMAGE_LENGTH] = rows
+            ifd[TIFF_STRIP_OFFSETS] = tuple(band_offsets)
+            ifd[TIFF_STRIP_BYTE_COUNTS] = tuple(counts[first:last])
+            ifd.tagtype[TIFF_STRIP_OFFSETS] = ifd.tagtype[TIFF_STRIP_BYTE_COUNTS] = TiffTags.LONG
+
+            # Header → IFD → data strip (tobytes menggeser offset strip ke setelah IFD)
+            band = Image.open(io.BytesIO(b"II*\x00" + struct.pack("<I", 8) + ifd.tobytes(8) + bytes(data)))
+            band.load()
+            yield band
+
+
+def _tiff_banded_spec(path, frame, factor):
+    """Frame TIFF yang harus di-decode (atau diturunkan resolusinya) per band, None jika tiled"""
+    layout = _tiff_strips(frame)
+    if layout is None:
+        return None
+    rows_per_strip = layout[2]
+
+    # Band ~IMAGE_PDF_BAND_BYTES hasil decode, tinggi kelipatan factor (kecuali band terakhir)
+    bytes_per_row = frame.width * max(len(frame.getbands()), 1)
+    strips_per_band = max(1, IMAGE_PDF_BAND_BYTES // max(bytes_per_row * rows_per_strip, 1))
+    step = factor // math.gcd(rows_per_strip, factor)
+    strips_per_band = max(step, strips_per_band // step * step)
+
+    bands = (_prepare(band, factor) for band in _tiff_band_images(path, frame, strips_per_band))
+    first = next(bands)
+
+    def all_bands():
+        yield first
+        yield from bands
+
+    size = (-(-frame.width // factor), -(-frame.height // factor))
+    return _decoded_spec(all_bands(), size, first.mode,
+                         source_size=frame.size if factor > 1 else None, bilevel=frame.mode == "1")
+
+
+def iter_image_pages(path):
+    """
+    Yield spec halaman untuk satu file image. TIFF multi-halaman → satu spec per frame,
+    dibaca dan ditulis frame per frame. Format lain hanya frame pertama (sama seperti
+    sebelumnya untuk GIF animasi). Spec harus ditulis sebelum next() karena frame TIFF
+    berbagi file handle.
+    """
+    with Image.open(path) as img:
+        if img.format == "TIFF":
+            for frame in ImageSequence.Iterator(img):
+                factor = reduce_factor(frame)
+                yield ((_tiff_strip_spec(path, frame) if factor == 1 else None)
+                       or _tiff_banded_spec(path, frame, factor)
+                       or _whole_image_spec(frame, factor))
+            return
+
+        factor = reduce_factor(img)
+        spec = None
+        if factor == 1 and img.format == "JPEG":
+            spec = _jpeg_spec(path, img)
+        elif factor == 1 and img.format == "PNG":
+            spec = _png_spec(path)
+        yield spec or _whole_image_spec(img, factor)
+
+
+def images_to_pdf(input_paths, output_path, progress=None, dpi=None):
+    """
+    Gabungkan image (urut sesuai input_paths) menjadi satu PDF multi-halaman.
+    Return {"pages": n, "passthrough_pages": k, "reduced_pages": r}
+    """
+    tmp_path = f"{output_path}.part"
+    try:
+        with open(tmp_path, "wb") as fp:
+            writer = PdfImageWriter(fp)
+            for i, path in enumerate(input_paths, start=1):
+                for spec in iter_image_pages(path):
+                    writer.add_image_page(spec, dpi)
+                if progress:
+                    progress(int(i / len(input_paths) * 90))
+            writer.close()
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    pages = len(writer.page_ids)
+    metrics.count_pages("image_passthrough", writer.passthrough_pages)
+    metrics.count_pages("image_decoded", pages - writer.passthrough_pages)
+    return {"pages": pages, "passthrough_pages": writer.passthrough_pages, "reduced_pages": writer.reduced_pages}
@@ -0,0 +1,241 @@
+# job_profile.py
+import os
+import json
+import time
+import socket
+import resource
+import threading
+from datetime import datetime
+
+# Profil per eksekusi task: durasi per stage & per halaman, CPU (termasuk
+# child process pdftoppm/tesseract/gs/soffice), peak RSS dan I/O.
+# Disimpan ke tabel processing_profiles dan ditampilkan di endpoint detail.
+#
+# Stage diisi otomatis dari metrics.observe_stage / observe_db, sehingga
+# titik instrumentasi Prometheus dan profil job selalu sama.
+#
+# Satu profil aktif per process (Celery prefork menjalankan satu task per
+# child). Thread pembantu (mis. chunk Ghostscript paralel) ikut tercatat.
+
+_current = None
+_lock = threading.Lock()
+
+
+def _rss_mb(value):
+    # ru_maxrss: KB di Linux, byte di macOS
+    return round(value / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+
+
+def _read_proc_io():
+    """Counter I/O process dari /proc/self/io (Linux), {} jika tidak tersedia"""
+    try:
+        with open("/proc/self/io") as f:
+            return {key: int(value) for key, value in (line.split(": ") for line in f)}
+    except (OSError, ValueError):
+        return {}
+
+
+def _reset_peak_rss():
+    """
+    Reset high-water mark RSS (VmHWM) agar peak RSS per job, bukan sejak process start.
+    Linux saja; return False jika tidak didukung.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _read_peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        pass
+    return _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def start(tool, **context):
+    """Mulai profil baru (menggantikan profil lama yang tidak di-finish)"""
+    global _current
+
+    profile = {
+        "tool": tool,
+        "context": {"pid": os.getpid(), "hostname": socket.gethostname(), **context},
+        "started_at": datetime.now(),
+        "_started": time.perf_counter(),
+        "_self": resource.getrusage(resource.RUSAGE_SELF),
+        "_children": resource.getrusage(resource.RUSAGE_CHILDREN),
+        "_io": _read_proc_io(),
+        "_peak_scope": "job" if _reset_peak_rss() else "process",
+        "stages": {},
+        "pages": [],
+    }
+
+    with _lock:
+        _current = profile
+    return profile
+
+
+def current():
+    return _current
+
+
+def record_stage(stage, seconds):
+    """Akumulasi durasi stage ke profil aktif (no-op jika tidak ada)"""
+    profile = _current
+    if profile is None:
+        return
+
+    with _lock:
+        entry = profile["stages"].setdefault(stage, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+        entry["count"] += 1
+        entry["seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+
+def record_page(page, **timings):
+    """Detail per halaman, mis. record_page(3, rasterize_seconds=0.4, ocr_seconds=2.1)"""
+    profile = _current
+    if profile is None:
+        return
+
+    with _lock:
+        profile["pages"].append({
+            "page": page,
+            **{k: round(v, 4) if isinstance(v, float) else v for k, v in timings.items()}
+        })
+
+
+def set_context(**context):
+    profile = _current
+    if profile is not None:
+        profile["context"].update(context)
+
+
+def finish(profile=None, status=None):
+    """Tutup profil, return dict siap disimpan (JSON serializable)"""
+    global _current
+
+    profile = profile or _current
+    if profile is None:
+        return None
+
+    with _lock:
+        if _current is profile:
+            _current = None
+
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    io_end = _read_proc_io()
+    io_start = profile["_io"]
+
+    resources = {
+        "peak_rss_mb": _read_peak_rss_mb(),
+        "peak_rss_scope": profile["_peak_scope"],
+        "cpu_user_seconds": round(self_usage.ru_utime - profile["_self"].ru_utime, 3),
+        "cpu_system_seconds": round(self_usage.ru_stime - profile["_self"].ru_stime, 3),
+        # Hanya child yang sudah selesai (subprocess.run); instance soffice warm tidak terhitung
+        "children_cpu_user_seconds": round(children_usage.ru_utime - profile["_children"].ru_utime, 3),
+        "children_cpu_system_seconds": round(children_usage.ru_stime - profile["_children"].ru_stime, 3),
+        "children_peak_rss_mb": _rss_mb(children_usage.ru_maxrss),
+    }
+    for key in ("rchar", "wchar", "read_bytes", "write_bytes"):
+        if key in io_end and key in io_start:
+            resources[key] = io_end[key] - io_start[key]
+
+    stages = {
+        name: {
+            "count": entry["count"],
+            "seconds": round(entry["seconds"], 4),
+            "max_seconds": round(entry["max_seconds"], 4),
+        }
+        for name, entry in sorted(profile["stages"].items(), key=lambda item: -item[1]["seconds"])
+    }
+
+    return {
+        "tool": profile["tool"],
+        "status": status,
+        "started_at": profile["started_at"].isoformat(),
+        "total_seconds": round(time.perf_counter() - profile["_started"], 3),
+        "context": profile["context"],
+        "stages": stages,
+        "pages": sorted(profile["pages"], key=lambda p: p["page"]),
+        "resources": resources,
+    }
+
+
+def save(summary, ocr_id=None, job_id=None):
+    """Simpan hasil finish() ke processing_profiles. Error tidak menggagalkan task."""
+    if not summary:
+        return False
+
+    # Import lokal: db → metrics → job_profile
+    from db import db_cursor
+
+    context = summary.get("context", {})
+    try:
+        with db_cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO processing_profiles
+                    (tool, ocr_id, job_id, status, pages, input_bytes, total_seconds, profile, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                summary["tool"], ocr_id, job_id, summary.get("status"),
+                context.get("pages"), context.get("input_bytes"),
+                summary["total_seconds"], json.dumps(summary, default=str), datetime.now()
+            ))
+        return True
+
+    except Exception as e:
+        print(f"⚠️  Profile save error: {e}")
+        return False
+
+
+def finish_and_save(profile, status=None, ocr_id=None, job_id=None):
+    summary = finish(profile, status)
+    if summary:
+        top = ", ".join(f"{name}={entry['seconds']}s" for name, entry in list(summary["stages"].items())[:3])
+        print(f"⏱️  {summary['tool']} profile: {summary['total_seconds']}s, top stages: {top}")
+    save(summary, ocr_id=ocr_id, job_id=job_id)
+    return summary
+
+
+def _load(cursor, column, value):
+    cursor.execute(f"""
+        SELECT profile FROM processing_profiles
+        WHERE {column} = %s
+        ORDER BY id
+    """, (value,))
+    profiles = []
+    for row in cursor.fetchall():
+        raw = row["profile"] if isinstance(row, dict) else row[0]
+        try:
+            profiles.append(json.loads(raw) if isinstance(raw, (str, bytes)) else raw)
+        except (TypeError, ValueError):
+            continue
+    return profiles
+
+
+def load_for_ocr(cursor, ocr_id):
+    """Semua profil OCR (attempt/retry, chunk paralel, finalize) urut waktu"""
+    return _load(cursor, "ocr_id", ocr_id)
+
+
+def load_for_job(cursor, job_id):
+    return _load(cursor, "job_id", job_id)
+
+
+def input_size(*paths):
+    """Total ukuran file input yang ada (byte)"""
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except (OSError, TypeError):
+            pass
+    return total
@@ -0,0 +1,180 @@
+# jobs.py
+import json
+import time
+import uuid
+from datetime import datetime
+from db import db_cursor
+import progress_events
+
+# Tabel status tunggal untuk semua job async (compress, convert, merge, split).
+# job_id (uuid) juga dipakai sebagai Celery task id, sehingga job bisa
+# di-revoke langsung dari DELETE /jobs/<job_id>.
+
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# Setiap perubahan status/progress juga di-publish ke channel progress:job:<job_id>
+# (lihat progress_events) untuk client long-poll / SSE.
+
+# Progress hanya ditulis ke DB jika naik >= 5% atau sudah lewat 1 detik
+PROGRESS_MIN_STEP = 5
+PROGRESS_MIN_INTERVAL = 1.0
+
+
+def _load_json(value):
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def create_job(tool, params):
+    """Insert job baru (status queued), return job_id"""
+    job_id = uuid.uuid4().hex
+    now = datetime.now()
+
+    with db_cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO jobs (uuid, tool, status, progress, params, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (job_id, tool, JOB_QUEUED, 0, json.dumps(params), now, now))
+
+    return job_id
+
+
+def get_job(job_id):
+    with db_cursor(dictionary=True) as cursor:
+        cursor.execute("""
+            SELECT uuid, tool, status, progress, params, result, error,
+                   created_at, started_at, finished_at, updated_at
+            FROM jobs
+            WHERE uuid = %s
+        """, (job_id,))
+        job = cursor.fetchone()
+
+    if job:
+        job["params"] = _load_json(job["params"]) or {}
+        job["result"] = _load_json(job["result"])
+
+    return job
+
+
+def start_job(job_id):
+    """queued → processing. Return False jika job sudah dibatalkan/diproses."""
+    now = datetime.now()
+    with db_cursor() as cursor:
+        cursor.execute("""
+            UPDATE jobs
+            SET status=%s, started_at=%s, updated_at=%s
+            WHERE uuid=%s AND status=%s
+        """, (JOB_PROCESSING, now, now, job_id, JOB_QUEUED))
+        started = cursor.rowcount == 1
+
+    if started:
+        progress_events.publish(progress_events.job_channel(job_id), "started", job_id=job_id, status=JOB_PROCESSING)
+    return started
+
+
+def finish_job(job_id, status, result=None, error=None):
+    """Set status akhir. Job yang sudah cancelled tidak ditimpa."""
+    now = datetime.now()
+    with db_cursor() as cursor:
+        cursor.execute("""
+            UPDATE jobs
+            SET status=%s, progress=%s, result=%s, error=%s, finished_at=%s, updated_at=%s
+            WHERE uuid=%s AND status <> %s
+        """, (
+            status,
+            100 if status == JOB_COMPLETED else 0,
+            json.dumps(result) if result is not None else None,
+            error,
+            now, now,
+            job_id, JOB_CANCELLED
+        ))
+        finished = cursor.rowcount == 1
+
+    if finished:
+        progress_events.publish(
+            progress_events.job_channel(job_id), status,
+            job_id=job_id, status=status, error=error
+        )
+    return finished
+
+
+def cancel_job(job_id):
+    """
+    Batalkan job yang belum selesai.
+    Return status sebelum dibatalkan, atau None jika job sudah selesai/tidak ada.
+    """
+    job = get_job(job_id)
+    if not job or job["status"] in FINISHED_STATUSES:
+        return None
+
+    now = datetime.now()
+    with db_cursor() as cursor:
+        cursor.execute("""
+            UPDATE jobs
+            SET status=%s, finished_at=%s, updated_at=%s
+            WHERE uuid=%s AND status IN (%s, %s)
+        """, (JOB_CANCELLED, now, now, job_id, JOB_QUEUED, JOB_PROCESSING))
+        if cursor.rowcount != 1:
+            return None
+
+    progress_events.publish(progress_events.job_channel(job_id), JOB_CANCELLED, job_id=job_id, status=JOB_CANCELLED)
+    return job["status"]
+
+
+def progress_reporter(job_id):
+    """Callback progress(percent) untuk handler, dengan throttling write ke DB"""
+    state = {"percent": 0, "written_at": 0.0}
+
+    def report(percent):
+        percent = max(0, min(int(percent), 99))
+        now = time.time()
+        if percent - state["percent"] < PROGRESS_MIN_STEP and now - state["written_at"] < PROGRESS_MIN_INTERVAL:
+            return
+        if percent <= state["percent"]:
+            return
+
+        state["percent"] = percent
+        state["written_at"] = now
+        try:
+            with db_cursor() as cursor:
+                cursor.execute(
+                    "UPDATE jobs SET progress=%s, updated_at=%s WHERE uuid=%s AND status=%s",
+                    (percent, datetime.now(), job_id, JOB_PROCESSING)
+                )
+        except Exception as e:
+            print(f"⚠️  Job progress update error: {e}")
+
+        progress_events.publish(progress_events.job_channel(job_id), "progress", job_id=job_id, progress=percent)
+
+    return report
+
+
+def serialize_job(job, base_url=""):
+    """Format job untuk response API"""
+    result = job.get("result")
+    if result and result.get("download_path"):
+        result = dict(result)
+        result["download_url"] = f"{base_url or ''}{result.pop('download_path')}"
+
+    return {
+        "job_id": job["uuid"],
+        "tool": job["tool"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "result": result,
+        "error": job.get("error"),
+        "created_at": job["created_at"].isoformat() if job.get("created_at") else None,
+        "started_at": job["started_at"].isoformat() if job.get("started_at") else None,
+        "finished_at": job["finished_at"].isoformat() if job.get("finished_at") else None,
+        "updated_at": job["updated_at"].isoformat() if job.get("updated_at") else None,
+    }
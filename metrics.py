@@ -0,0 +1,220 @@
+# metrics.py
+import os
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+import job_profile
+
+load_dotenv()
+
+# Metrics Prometheus untuk Flask app (GET /metrics) dan Celery worker
+# (HTTP server terpisah di METRICS_WORKER_PORT, lihat tasks.py).
+#
+# Gunicorn dan Celery prefork menjalankan banyak process, jadi metrics
+# dikumpulkan lewat multiprocess mode prometheus_client: set
+# PROMETHEUS_MULTIPROC_DIR (folder kosong, berbeda untuk app dan worker)
+# sebelum process start.
+#
+# Optional: jika prometheus_client tidak terinstall, semua helper no-op
+# dan /metrics mengembalikan 503.
+try:
+    import prometheus_client
+    from prometheus_client import (
+        CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    )
+    from prometheus_client import multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:
+    prometheus_client = None
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_WORKER_PORT = int(os.getenv("METRICS_WORKER_PORT", 9808))
+METRICS_QUEUES = [q.strip() for q in os.getenv("METRICS_QUEUES", "celery").split(",") if q.strip()]
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or os.getenv("prometheus_multiproc_dir")
+
+# Stage berat (detik): dari ratusan ms (parse) sampai menit (Ghostscript/LibreOffice)
+STAGE_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+# Nama stage yang dipakai di label histogram tools_stage_duration_seconds
+STAGES = (
+    "upload_save",     # request.files → disk
+    "pdf_parse",       # PyPDF2.PdfReader + decrypt
+    "text_layer",      # klasifikasi/extract text layer per dokumen
+    "rasterize_page",  # pdf2image convert_from_path, per halaman
+    "ocr_page",        # Tesseract, per halaman
+    "ghostscript",     # kompresi (single atau per chunk)
+    "libreoffice",     # konversi DOC/PPT → PDF
+    "image_convert",   # PIL image → PDF
+    "merge_write",     # salin halaman + tulis hasil merge (pdf_merge)
+    "compress_stitch", # gabungkan chunk hasil kompresi parallel
+    "split_write",     # PdfWriter per bagian split
+    "text_write",      # simpan hasil OCR ke file .txt
+    "callback",        # callback ke SIRAMA
+)
+
+if prometheus_client is not None:
+    STAGE_SECONDS = Histogram(
+        "tools_stage_duration_seconds", "Durasi per stage pemrosesan",
+        ["stage"], buckets=STAGE_BUCKETS
+    )
+    DB_SECONDS = Histogram(
+        "tools_db_roundtrip_seconds", "Durasi satu blok db_cursor (query + commit)",
+        buckets=DB_BUCKETS
+    )
+    PAGES_PROCESSED = Counter(
+        "tools_pages_processed_total", "Halaman yang diproses", ["method"]
+    )
+    OCR_CACHE_REQUESTS = Counter(
+        "tools_ocr_cache_requests_total", "Lookup cache OCR", ["result"]
+    )
+    FAILURES = Counter(
+        "tools_failures_total", "Pekerjaan yang gagal", ["tool"]
+    )
+    RETRIES = Counter(
+        "tools_task_retries_total", "Celery task yang di-retry", ["task"]
+    )
+    SUBPROCESSES_IN_FLIGHT = Gauge(
+        "tools_subprocesses_in_flight", "Subprocess eksternal yang sedang berjalan",
+        ["kind"], multiprocess_mode="livesum"
+    )
+
+
+def enabled():
+    return METRICS_ENABLED and prometheus_client is not None
+
+
+def observe_stage(stage, seconds):
+    # Juga masuk ke profil job yang sedang berjalan (lihat job_profile)
+    job_profile.record_stage(stage, seconds)
+    if enabled():
+        STAGE_SECONDS.labels(stage=stage).observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage):
+    """with stage_timer("ghostscript"): ... → observe durasi blok (juga jika error)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def observe_db(seconds):
+    job_profile.record_stage("db", seconds)
+    if enabled():
+        DB_SECONDS.observe(seconds)
+
+
+def count_pages(method, count=1):
+    if enabled() and count:
+        PAGES_PROCESSED.labels(method=method).inc(count)
+
+
+def count_cache(hit):
+    if enabled():
+        OCR_CACHE_REQUESTS.labels(result="hit" if hit else "miss").inc()
+
+
+def count_failure(tool):
+    if enabled():
+        FAILURES.labels(tool=tool).inc()
+
+
+def count_retry(task):
+    if enabled():
+        RETRIES.labels(task=task).inc()
+
+
+@contextmanager
+def subprocess_in_flight(kind):
+    """Gauge subprocess (gs, soffice, pdftoppm, tesseract) selama blok berjalan"""
+    if not enabled():
+        yield
+        return
+
+    gauge = SUBPROCESSES_IN_FLIGHT.labels(kind=kind)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+# ===================== EXPORT =====================
+if prometheus_client is not None:
+    class QueueDepthCollector:
+        """Panjang antrian Celery di broker Redis, dibaca saat scrape"""
+
+        def describe(self):
+            # Hindari LLEN ke Redis saat register
+            return []
+
+        def collect(self):
+            gauge = GaugeMetricFamily(
+                "tools_queue_depth", "Task yang menunggu di antrian Celery", labels=["queue"]
+            )
+            try:
+                from progress_events import get_redis
+                client = get_redis()
+                for queue in METRICS_QUEUES:
+                    gauge.add_metric([queue], client.llen(queue))
+            except Exception as e:
+                print(f"⚠️  Queue depth metric error: {e}")
+            yield gauge
+
+
+_queue_collector_registered = False
+
+
+def build_registry(include_queue_depth=True):
+    """Registry untuk satu scrape: gabungan semua process jika multiprocess mode aktif"""
+    global _queue_collector_registered
+
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        if include_queue_depth:
+            registry.register(QueueDepthCollector())
+        return registry
+
+    # Single process (mis. flask run): registry default process ini
+    if include_queue_depth and not _queue_collector_registered:
+        prometheus_client.REGISTRY.register(QueueDepthCollector())
+        _queue_collector_registered = True
+    return prometheus_client.REGISTRY
+
+
+def render(include_queue_depth=True):
+    """Return (body, content_type) untuk response /metrics, atau None jika tidak tersedia"""
+    if not enabled():
+        return None
+    return generate_latest(build_registry(include_queue_depth)), CONTENT_TYPE_LATEST
+
+
+def start_worker_server(port=None):
+    """HTTP /metrics untuk Celery worker (dipanggil sekali di process utama worker)"""
+    if not enabled():
+        return False
+
+    port = port or METRICS_WORKER_PORT
+    if not MULTIPROC_DIR:
+        print("⚠️  PROMETHEUS_MULTIPROC_DIR tidak di-set, metrics dari child process worker tidak terlihat")
+
+    try:
+        prometheus_client.start_http_server(port, registry=build_registry(include_queue_depth=False))
+        print(f"📈 Worker metrics server on :{port}/metrics")
+        return True
+    except OSError as e:
+        print(f"⚠️  Worker metrics server error: {e}")
+        return False
+
+
+def mark_process_dead(pid):
+    """Bersihkan file metrics process yang sudah exit (gunicorn child_exit / worker shutdown)"""
+    if enabled() and MULTIPROC_DIR:
+        try:
+            multiprocess.mark_process_dead(pid)
+        except Exception:
+            pass
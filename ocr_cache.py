@@ -0,0 +1,152 @@
+# ocr_cache.py
+import os
+import json
+import time
+import hashlib
+import redis
+from dotenv import load_dotenv
+from celery_app import get_redis_url
+from ocr_pipeline import OCR_LANG, OCR_DPI, OCR_MIN_TEXT_CHARS
+import ocr_engine
+import metrics
+
+load_dotenv()
+
+# Cache hasil OCR berdasarkan SHA-256 isi PDF + parameter OCR.
+# Disimpan di Redis yang sama dengan Celery, jadi dipakai bersama
+# oleh Flask app dan Celery worker.
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+OCR_CACHE_TTL = int(os.getenv("OCR_CACHE_TTL", 7 * 24 * 3600))  # detik
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", 5000))
+OCR_CACHE_MAX_TEXT_BYTES = int(os.getenv("OCR_CACHE_MAX_TEXT_BYTES", 5 * 1024 * 1024))
+
+CACHE_PREFIX = "ocr_cache:"
+CACHE_LRU_KEY = "ocr_cache:lru"  # sorted set: key → last access timestamp
+
+_redis_client = None
+
+
+def get_redis():
+    """Redis client (lazy, satu per proses)"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(get_redis_url(), socket_timeout=2)
+    return _redis_client
+
+
+def get_engine_version():
+    """
+    Engine + versi Tesseract yang menjalankan OCR (lihat ocr_engine), bagian dari
+    cache key agar upgrade/ganti engine tidak memakai hasil lama
+    """
+    return ocr_engine.engine_version()
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """SHA-256 isi file, dibaca per chunk"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Format entry per path pemroses: "ocr" (task /ocr, build_full_text + metadata_file)
+# dan "simple" (/simple-ocr, marker "===== PAGE n =====") tidak boleh saling membaca
+CACHE_VARIANTS = ("ocr", "simple")
+
+
+def make_cache_key(file_digest, lang=OCR_LANG, dpi=OCR_DPI, variant="ocr"):
+    """Cache key dari hash file + path pemroses, bahasa, DPI, versi engine dan threshold text layer"""
+    if variant not in CACHE_VARIANTS:
+        raise ValueError(f"Cache variant tidak dikenal: {variant}")
+    params = f"{variant}|{lang}|{dpi}|{get_engine_version()}|{OCR_MIN_TEXT_CHARS}"
+    params_digest = hashlib.sha256(params.encode("utf-8")).hexdigest()[:16]
+    return f"{CACHE_PREFIX}{file_digest}:{params_digest}"
+
+
+def cache_key_for_file(file_path, lang=OCR_LANG, dpi=OCR_DPI, variant="ocr"):
+    if not OCR_CACHE_ENABLED:
+        return None
+    try:
+        return make_cache_key(file_sha256(file_path), lang=lang, dpi=dpi, variant=variant)
+    except Exception as e:
+        print(f"⚠️  OCR cache key error: {e}")
+        return None
+
+
+def get_cached_ocr(cache_key):
+    """
+    Ambil hasil OCR dari cache.
+    Return dict entry, atau None jika miss / cache tidak tersedia.
+    """
+    if not OCR_CACHE_ENABLED or not cache_key:
+        return None
+
+    try:
+        client = get_redis()
+        raw = client.get(cache_key)
+        if raw is None:
+            client.zrem(CACHE_LRU_KEY, cache_key)
+            metrics.count_cache(False)
+            return None
+
+        # Refresh posisi LRU dan TTL
+        pipe = client.pipeline()
+        pipe.zadd(CACHE_LRU_KEY, {cache_key: time.time()})
+        pipe.expire(cache_key, OCR_CACHE_TTL)
+        pipe.execute()
+
+        print(f"⚡ OCR cache hit: {cache_key}")
+        metrics.count_cache(True)
+        return json.loads(raw)
+
+    except Exception as e:
+        print(f"⚠️  OCR cache get error: {e}")
+        return None
+
+
+def set_cached_ocr(cache_key, entry):
+    """
+    Simpan hasil OCR ke cache.
+    entry: dict dengan minimal key extracted_text.
+    """
+    if not OCR_CACHE_ENABLED or not cache_key:
+        return False
+
+    payload = json.dumps(entry)
+    if len(payload.encode("utf-8")) > OCR_CACHE_MAX_TEXT_BYTES:
+        print("ℹ️  OCR result too large for cache, skip")
+        return False
+
+    try:
+        client = get_redis()
+        pipe = client.pipeline()
+        pipe.set(cache_key, payload, ex=OCR_CACHE_TTL)
+        pipe.zadd(CACHE_LRU_KEY, {cache_key: time.time()})
+        pipe.execute()
+
+        evict_lru(client)
+        return True
+
+    except Exception as e:
+        print(f"⚠️  OCR cache set error: {e}")
+        return False
+
+
+def evict_lru(client=None):
+    """Hapus entry paling lama diakses jika jumlah entry melebihi OCR_CACHE_MAX_ENTRIES"""
+    client = client or get_redis()
+
+    overflow = client.zcard(CACHE_LRU_KEY) - OCR_CACHE_MAX_ENTRIES
+    if overflow <= 0:
+        return 0
+
+    oldest = client.zrange(CACHE_LRU_KEY, 0, overflow - 1)
+    if oldest:
+        pipe = client.pipeline()
+        pipe.delete(*oldest)
+        pipe.zrem(CACHE_LRU_KEY, *oldest)
+        pipe.execute()
+
+    return len(oldest)
@@ -0,0 +1,139 @@
+# ocr_engine.py
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Batasi thread OpenMP Tesseract per instance. Dengan banyak worker process,
+# default Tesseract (semua core per instance) menyebabkan oversubscription.
+# Harus di-set sebelum libtesseract di-load.
+OCR_ENGINE_THREADS = int(os.getenv("OCR_ENGINE_THREADS", 1))
+os.environ.setdefault("OMP_THREAD_LIMIT", str(OCR_ENGINE_THREADS))
+
+import pytesseract
+from ocr_pipeline import OCR_LANG
+import metrics
+
+# Engine resident via C API (tesserocr, ada di requirements.txt; build butuh
+# libtesseract-dev + libleptonica-dev). Jika tidak terinstall, OCR jalan dalam
+# mode DEGRADED: pytesseract spawn satu process tesseract + temp file per halaman
+# dan me-load ulang traineddata setiap kali (jauh lebih lambat untuk dokumen besar).
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+    print("⚠️  tesserocr tidak terinstall: OCR fallback ke pytesseract (1 process tesseract per halaman)")
+
+# Jumlah instance Tesseract per process (per bahasa)
+OCR_ENGINE_POOL_SIZE = int(os.getenv("OCR_ENGINE_POOL_SIZE", 1))
+# Recycle instance setelah N halaman untuk menghindari memory growth
+OCR_ENGINE_MAX_PAGES = int(os.getenv("OCR_ENGINE_MAX_PAGES", 500))
+TESSDATA_PATH = os.getenv("TESSDATA_PREFIX", None)
+
+_pools = {}           # lang → queue of [api, pages_processed]
+_pool_pid = None      # pool tidak boleh dipakai lintas fork (Celery prefork / gunicorn)
+_pool_lock = threading.Lock()
+
+
+def engine_name():
+    return "tesserocr" if tesserocr is not None else "pytesseract"
+
+
+_engine_version = None
+
+
+def engine_version():
+    """Nama + versi Tesseract yang benar-benar dipakai (libtesseract via tesserocr atau binary)"""
+    global _engine_version
+    if _engine_version is None:
+        try:
+            if tesserocr is not None:
+                version = tesserocr.tesseract_version().splitlines()[0]
+            else:
+                version = str(pytesseract.get_tesseract_version())
+        except Exception:
+            version = "unknown"
+        _engine_version = f"{engine_name()} {version}"
+    return _engine_version
+
+
+def _create_api(lang):
+    kwargs = {"lang": lang}
+    if TESSDATA_PATH:
+        kwargs["path"] = TESSDATA_PATH
+    print(f"🧠 Loading Tesseract engine (lang={lang}, pid={os.getpid()})")
+    return tesserocr.PyTessBaseAPI(**kwargs)
+
+
+def _get_pool(lang):
+    global _pool_pid
+
+    with _pool_lock:
+        # Setelah fork, instance milik parent tidak valid di child
+        if _pool_pid != os.getpid():
+            _pools.clear()
+            _pool_pid = os.getpid()
+
+        pool = _pools.get(lang)
+        if pool is None:
+            pool = queue.LifoQueue(maxsize=OCR_ENGINE_POOL_SIZE)
+            for _ in range(OCR_ENGINE_POOL_SIZE):
+                pool.put([None, 0])  # instance dibuat saat pertama dipakai
+            _pools[lang] = pool
+
+        return pool
+
+
+@contextmanager
+def acquire_engine(lang=OCR_LANG):
+    """
+    Pinjam instance Tesseract dari pool process ini.
+    Block jika semua instance sedang dipakai thread lain.
+    """
+    pool = _get_pool(lang)
+    slot = pool.get()
+
+    try:
+        if slot[0] is None or slot[1] >= OCR_ENGINE_MAX_PAGES:
+            if slot[0] is not None:
+                slot[0].End()
+            slot[0] = _create_api(lang)
+            slot[1] = 0
+
+        yield slot[0]
+        slot[1] += 1
+
+    except Exception:
+        # Instance dalam kondisi tidak jelas, buat ulang di pemakaian berikutnya
+        try:
+            if slot[0] is not None:
+                slot[0].End()
+        except Exception:
+            pass
+        slot[0] = None
+        raise
+
+    finally:
+        pool.put(slot)
+
+
+def image_to_string(img, lang=OCR_LANG):
+    """
+    Pengganti pytesseract.image_to_string.
+    Dengan tesserocr: image dikirim langsung dari memory ke instance
+    yang sudah me-load traineddata, tanpa spawn process/temp file.
+    """
+    with metrics.stage_timer("ocr_page"):
+        if tesserocr is None:
+            with metrics.subprocess_in_flight("tesseract"):
+                return pytesseract.image_to_string(img, lang=lang)
+
+        with acquire_engine(lang) as api:
+            api.SetImage(img)
+            try:
+                return api.GetUTF8Text()
+            finally:
+                api.Clear()
@@ -0,0 +1,225 @@
+# ocr_pipeline.py
+import os
+import re
+import shutil
+import tempfile
+import time
+from pdf2image import convert_from_path
+from PIL import Image
+from dotenv import load_dotenv
+import metrics
+
+load_dotenv()
+
+# OCR settings (dipakai bersama oleh app.py dan tasks.py)
+OCR_LANG = "eng+ind"
+OCR_DPI = 300
+
+# Jumlah halaman yang dirender sekaligus. Peak memory dibatasi oleh window ini,
+# bukan oleh jumlah halaman dokumen.
+OCR_RASTER_WINDOW = int(os.getenv("OCR_RASTER_WINDOW", 2))
+
+# Minimal jumlah karakter text layer agar halaman dianggap "digital".
+# Halaman scan kadang hanya punya sisa text kecil (nomor halaman, stempel).
+OCR_MIN_TEXT_CHARS = int(os.getenv("OCR_MIN_TEXT_CHARS", 20))
+
+
+def iter_page_images(file_path, first_page=1, last_page=None, dpi=300, pdf_password=None,
+                     poppler_path=None, window=None):
+    """
+    Generator rasterisasi PDF halaman per halaman.
+
+    Render maksimal `window` halaman sekaligus via pdftoppm ke folder temporary,
+    yield (page_num, image) satu per satu, lalu tutup dan hapus image tersebut
+    sebelum window berikutnya dirender.
+
+    last_page wajib diisi (jumlah halaman sudah diketahui dari PyPDF2).
+    """
+    if last_page is None:
+        raise ValueError("last_page harus diisi")
+
+    window = max(1, int(window or OCR_RASTER_WINDOW))
+
+    for start in range(first_page, last_page + 1, window):
+        end = min(start + window - 1, last_page)
+        temp_dir = tempfile.mkdtemp(prefix="ocr_raster_")
+
+        try:
+            # paths_only → pdf2image tidak me-load image ke RAM
+            started = time.perf_counter()
+            with metrics.subprocess_in_flight("pdftoppm"):
+                image_paths = convert_from_path(
+                    file_path,
+                    dpi=dpi,
+                    fmt="png",
+                    first_page=start,
+                    last_page=end,
+                    output_folder=temp_dir,
+                    paths_only=True,
+                    userpw=pdf_password if pdf_password else None,
+                    poppler_path=poppler_path if poppler_path else None
+                )
+
+            # Satu run pdftoppm untuk seluruh window: catat rata-rata per halaman
+            elapsed = time.perf_counter() - started
+            for _ in image_paths:
+                metrics.observe_stage("rasterize_page", elapsed / len(image_paths))
+
+            # pdftoppm memberi nama file berurutan sesuai nomor halaman
+            for page_num, image_path in enumerate(sorted(image_paths), start=start):
+                img = Image.open(image_path)
+                try:
+                    img.load()
+                    yield page_num, img
+                finally:
+                    img.close()
+                    try:
+                        os.remove(image_path)
+                    except OSError:
+                        pass
+
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def iter_selected_page_images(file_path, page_numbers, **kwargs):
+    """
+    Seperti iter_page_images, tapi hanya untuk halaman tertentu.
+    Halaman yang berurutan dirender dalam satu run pdftoppm.
+    """
+    page_numbers = sorted(set(page_numbers))
+    if not page_numbers:
+        return
+
+    run_start = prev = page_numbers[0]
+    for page_num in page_numbers[1:] + [None]:
+        if page_num is not None and page_num == prev + 1:
+            prev = page_num
+            continue
+
+        yield from iter_page_images(file_path, first_page=run_start, last_page=prev, **kwargs)
+
+        if page_num is not None:
+            run_start = prev = page_num
+
+
+# Operator PDF yang menampilkan text: Tj, TJ, ' dan " (setelah string/array)
+TEXT_SHOW_OPERATOR_RE = re.compile(rb"[)\]>]\s*(?:Tj|TJ|'|\")")
+
+
+def _stream_data(contents):
+    """Gabungkan data (sudah di-decode) dari /Contents yang bisa berupa stream atau array"""
+    if contents is None:
+        return b""
+
+    contents = contents.get_object()
+    if isinstance(contents, list):
+        return b"\n".join(part.get_object().get_data() for part in contents)
+    return contents.get_data()
+
+
+def _resources_have_fonts(resources, depth=0):
+    """True jika resources (atau Form XObject di dalamnya) mendefinisikan font"""
+    if resources is None or depth > 3:
+        return False
+
+    resources = resources.get_object()
+    fonts = resources.get("/Font")
+    if fonts is not None and len(fonts.get_object()) > 0:
+        return True
+
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return False
+
+    for xobj in xobjects.get_object().values():
+        xobj = xobj.get_object()
+        if xobj.get("/Subtype") == "/Form" and _resources_have_fonts(xobj.get("/Resources"), depth + 1):
+            return True
+
+    return False
+
+
+def _forms_have_text(resources, depth=0):
+    """Cek operator text di Form XObject (text layer kadang ada di dalam form)"""
+    if resources is None or depth > 3:
+        return False
+
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return False
+
+    for xobj in xobjects.get_object().values():
+        xobj = xobj.get_object()
+        if xobj.get("/Subtype") != "/Form":
+            continue
+        if TEXT_SHOW_OPERATOR_RE.search(xobj.get_data()):
+            return True
+        if _forms_have_text(xobj.get("/Resources"), depth + 1):
+            return True
+
+    return False
+
+
+def page_has_text_layer(page):
+    """
+    Probe cepat apakah halaman membawa text, tanpa menjalankan extract_text.
+
+    1. Tanpa font di /Resources → tidak mungkin ada text (halaman scan).
+    2. Cari operator text-showing (Tj/TJ/'/") di content stream halaman
+       dan Form XObject-nya.
+
+    Jika probe gagal membaca struktur PDF, anggap halaman punya text agar
+    diverifikasi dengan extract_text.
+    """
+    try:
+        resources = page.get("/Resources")
+        if not _resources_have_fonts(resources):
+            return False
+
+        if TEXT_SHOW_OPERATOR_RE.search(_stream_data(page.get("/Contents"))):
+            return True
+
+        return _forms_have_text(resources)
+
+    except Exception:
+        return True
+
+
+def classify_pages(reader, min_chars=None):
+    """
+    Klasifikasi per halaman: pakai text layer PyPDF2 jika ada,
+    selain itu halaman perlu di-OCR.
+
+    extract_text hanya dijalankan untuk halaman yang lolos page_has_text_layer.
+
+    Return list dict: {"page", "method": "text_layer" | "ocr", "text"}
+    """
+    min_chars = OCR_MIN_TEXT_CHARS if min_chars is None else min_chars
+    pages = []
+
+    for page_num, page in enumerate(reader.pages, start=1):
+        if not page_has_text_layer(page):
+            pages.append({"page": page_num, "method": "ocr", "text": ""})
+            continue
+
+        try:
+            text = (page.extract_text() or "").strip()
+        except Exception:
+            text = ""
+
+        if len(text) >= min_chars:
+            pages.append({"page": page_num, "method": "text_layer", "text": text})
+        else:
+            pages.append({"page": page_num, "method": "ocr", "text": ""})
+
+    return pages
+
+
+def extraction_method(pages_text_layer, pages_ocr):
+    """Nama metode ekstraksi dokumen berdasarkan jumlah halaman per metode"""
+    if not pages_ocr:
+        return "digital_extraction"
+    if not pages_text_layer:
+        return "tesseract_ocr"
+    return "hybrid"
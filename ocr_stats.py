@@ -0,0 +1,201 @@
+# ocr_stats.py
+from datetime import datetime, timedelta
+
+# Counter statistik OCR yang di-maintain incremental, supaya /ocr/stats
+# tidak perlu scan seluruh ocr_files.
+#
+# ocr_stats       : jumlah file per status saat ini (gauge)
+# ocr_stats_daily : per tanggal & status: jumlah job yang masuk ke status itu
+#                   (sekali per dokumen, retry tidak dihitung ulang),
+#                   dan untuk 'completed' total halaman + detik pemrosesan
+#
+# Semua fungsi menerima cursor dari db_cursor() milik pemanggil, sehingga
+# counter ikut commit/rollback bersama update ocr_files.
+
+STATUSES = ("pending", "processing", "completed", "failed")
+
+
+def _bump_gauges(cursor, deltas, now):
+    # Urutkan berdasarkan status agar urutan row lock selalu sama (hindari deadlock)
+    for status, delta in sorted(deltas.items()):
+        cursor.execute("""
+            INSERT INTO ocr_stats (status, file_count, updated_at)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE file_count = file_count + VALUES(file_count), updated_at = VALUES(updated_at)
+        """, (status, delta, now))
+
+
+def _bump_daily(cursor, status, now, pages=0, processing_seconds=0.0):
+    cursor.execute("""
+        INSERT INTO ocr_stats_daily (stat_date, status, job_count, pages, processing_seconds)
+        VALUES (%s, %s, 1, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            job_count = job_count + 1,
+            pages = pages + VALUES(pages),
+            processing_seconds = processing_seconds + VALUES(processing_seconds)
+    """, (now.date(), status, pages, processing_seconds))
+
+
+def _unbump_daily(cursor, status, when):
+    cursor.execute("""
+        UPDATE ocr_stats_daily SET job_count = job_count - 1
+        WHERE stat_date = %s AND status = %s AND job_count > 0
+    """, (when.date(), status))
+
+
+def record_created(cursor, status, now=None):
+    """Panggil setelah INSERT ocr_files baru"""
+    now = now or datetime.now()
+    _bump_gauges(cursor, {status: 1}, now)
+    _bump_daily(cursor, status, now)
+
+
+def record_transition(cursor, ocr_id, new_status, now=None):
+    """
+    Panggil SEBELUM UPDATE ocr_files.status (membaca status lama dengan row lock).
+    Tidak melakukan apa-apa jika status tidak berubah (mis. retry yang set 'processing' lagi).
+
+    Daily job_count dihitung sekali per dokumen: 'processing' hanya saat pertama
+    mulai (dari pending), dan jika dokumen yang sudah 'failed' diproses ulang
+    (retry/resubmit) hitungan failed sebelumnya (di tanggal gagalnya) dibatalkan,
+    sehingga hanya kegagalan terakhir yang tercatat.
+    """
+    now = now or datetime.now()
+
+    cursor.execute("""
+        SELECT o.status, o.created_at, o.updated_at, d.total_page
+        FROM ocr_files o
+        JOIN documents d ON o.document_id = d.id
+        WHERE o.id = %s
+        FOR UPDATE
+    """, (ocr_id,))
+    row = cursor.fetchone()
+    if not row:
+        return
+
+    if isinstance(row, dict):
+        old_status, created_at, updated_at, total_page = (
+            row["status"], row["created_at"], row["updated_at"], row["total_page"]
+        )
+    else:
+        old_status, created_at, updated_at, total_page = row
+
+    if old_status == new_status:
+        return
+
+    deltas = {new_status: 1}
+    if old_status:
+        deltas[old_status] = -1
+    _bump_gauges(cursor, deltas, now)
+
+    if old_status == "failed":
+        _unbump_daily(cursor, old_status, updated_at or now)
+
+    if new_status == "completed":
+        processing_seconds = (now - created_at).total_seconds() if created_at else 0.0
+        _bump_daily(cursor, new_status, now, pages=total_page or 0, processing_seconds=processing_seconds)
+    elif new_status != "processing" or old_status in (None, "pending"):
+        _bump_daily(cursor, new_status, now)
+
+
+def reconcile(cursor, days=7):
+    """
+    Samakan counter dengan isi ocr_files (koreksi drift, mis. update manual atau
+    transition yang terlewat/dobel):
+    - gauge ocr_stats: dihitung ulang seluruhnya,
+    - ocr_stats_daily: row `days` hari terakhir dibangun ulang, dengan aturan
+      yang sama seperti isi awal di migration create_ocr_stats_tables.
+    Dijalankan periodik oleh Celery beat, bukan di request path.
+    """
+    now = datetime.now()
+    cursor.execute("SELECT status, COUNT(*) FROM ocr_files GROUP BY status")
+    actual = {status: count for status, count in cursor.fetchall() if status}
+
+    for status in sorted(set(STATUSES) | set(actual)):
+        cursor.execute("""
+            INSERT INTO ocr_stats (status, file_count, updated_at)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE file_count = VALUES(file_count), updated_at = VALUES(updated_at)
+        """, (status, actual.get(status, 0), now))
+
+    _rebuild_daily(cursor, (now - timedelta(days=days - 1)).date())
+    return actual
+
+
+def _rebuild_daily(cursor, since):
+    # DELETE dulu lalu INSERT ... SELECT dalam transaksi yang sama: transition yang
+    # berjalan bersamaan menunggu lock row/gap ocr_stats_daily sampai commit
+    cursor.execute("DELETE FROM ocr_stats_daily WHERE stat_date >= %s", (since,))
+
+    # 'processing': setiap dokumen dihitung sekali, di tanggal dibuat
+    cursor.execute("""
+        INSERT INTO ocr_stats_daily (stat_date, status, job_count, pages, processing_seconds)
+        SELECT DATE(o.created_at), 'processing', COUNT(*), 0, 0
+        FROM ocr_files o
+        WHERE o.created_at >= %s
+        GROUP BY DATE(o.created_at)
+    """, (since,))
+
+    # 'completed'/'failed': status akhir dokumen, di tanggal updated_at
+    cursor.execute("""
+        INSERT INTO ocr_stats_daily (stat_date, status, job_count, pages, processing_seconds)
+        SELECT DATE(o.updated_at), o.status, COUNT(*),
+               SUM(CASE WHEN o.status = 'completed' THEN COALESCE(d.total_page, 0) ELSE 0 END),
+               SUM(CASE WHEN o.status = 'completed' THEN TIMESTAMPDIFF(SECOND, o.created_at, o.updated_at) ELSE 0 END)
+        FROM ocr_files o
+        JOIN documents d ON o.document_id = d.id
+        WHERE o.status IN ('completed', 'failed') AND o.updated_at >= %s
+        GROUP BY DATE(o.updated_at), o.status
+    """, (since,))
+
+
+def read_stats(cursor, days=7):
+    """
+    Statistik dari counter: baca <= len(STATUSES) + days * len(STATUSES) row,
+    tidak tergantung jumlah file.
+    """
+    cursor.execute("SELECT status, file_count FROM ocr_stats")
+    counts = {status: int(count) for status, count in cursor.fetchall()}
+
+    now = datetime.now()
+    since = (now - timedelta(days=days - 1)).date()
+    cursor.execute("""
+        SELECT stat_date, status, job_count, pages, processing_seconds
+        FROM ocr_stats_daily
+        WHERE stat_date >= %s
+        ORDER BY stat_date
+    """, (since,))
+    daily_rows = cursor.fetchall()
+
+    daily = {}
+    for stat_date, status, job_count, pages, processing_seconds in daily_rows:
+        day = daily.setdefault(stat_date.isoformat(), {"date": stat_date.isoformat()})
+        day[status] = int(job_count)
+        if status == "completed":
+            day["pages"] = int(pages)
+            day["processing_seconds"] = round(float(processing_seconds), 1)
+
+    completed_jobs = sum(day.get("completed", 0) for day in daily.values())
+    pages = sum(day.get("pages", 0) for day in daily.values())
+    processing_seconds = sum(day.get("processing_seconds", 0.0) for day in daily.values())
+
+    today = daily.get(now.date().isoformat(), {})
+    hours_today = max((now - datetime.combine(now.date(), datetime.min.time())).total_seconds() / 3600, 1 / 60)
+
+    total_files = sum(counts.values())
+
+    return {
+        "total_files": total_files,
+        **{status: counts.get(status, 0) for status in STATUSES},
+        "success_rate": round(counts.get("completed", 0) / total_files * 100, 2) if total_files > 0 else 0,
+        "throughput": {
+            "window_days": days,
+            "completed_jobs": completed_jobs,
+            "pages": pages,
+            "pages_per_hour": round(pages / (days * 24), 2),
+            "pages_per_hour_today": round(today.get("pages", 0) / hours_today, 2),
+            "avg_processing_seconds": round(processing_seconds / completed_jobs, 1) if completed_jobs else 0,
+            "avg_seconds_per_page": round(processing_seconds / pages, 2) if pages else 0,
+        },
+        "daily": list(daily.values()),
+    }
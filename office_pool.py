@@ -0,0 +1,246 @@
+# office_pool.py
+import os
+import time
+import queue
+import socket
+import atexit
+import shutil
+import tempfile
+import threading
+import subprocess
+from dotenv import load_dotenv
+from tools_config import LIBREOFFICE_PATH
+import metrics
+
+load_dotenv()
+
+# Pool LibreOffice headless yang tetap hidup (warm) per process.
+# Setiap instance punya user profile sendiri (-env:UserInstallation),
+# sehingga konversi bersamaan tidak saling mengunci profile default.
+#
+# Butuh binding UNO (package python3-uno). Jika tidak tersedia,
+# fallback ke soffice --convert-to (cold start) dengan profile per slot.
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:
+    uno = None
+
+OFFICE_POOL_SIZE = int(os.getenv("OFFICE_POOL_SIZE", 1))
+OFFICE_MAX_CONVERSIONS = int(os.getenv("OFFICE_MAX_CONVERSIONS", 200))  # recycle setelah N konversi
+OFFICE_START_TIMEOUT = int(os.getenv("OFFICE_START_TIMEOUT", 30))
+OFFICE_CONVERT_TIMEOUT = int(os.getenv("OFFICE_CONVERT_TIMEOUT", 120))
+
+PDF_FILTERS = {
+    ".doc": "writer_pdf_Export",
+    ".docx": "writer_pdf_Export",
+    ".odt": "writer_pdf_Export",
+    ".rtf": "writer_pdf_Export",
+    ".ppt": "impress_pdf_Export",
+    ".pptx": "impress_pdf_Export",
+    ".odp": "impress_pdf_Export",
+    ".xls": "calc_pdf_Export",
+    ".xlsx": "calc_pdf_Export",
+    ".ods": "calc_pdf_Export",
+}
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_all_slots = []
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _new_slot():
+    """Slot kosong: instance dijalankan saat pertama dipakai"""
+    slot = {
+        "process": None,
+        "port": None,
+        "profile_dir": tempfile.mkdtemp(prefix="lo_profile_"),
+        "desktop": None,
+        "conversions": 0,
+    }
+    _all_slots.append(slot)
+    return slot
+
+
+def _profile_url(slot):
+    return "file://" + os.path.abspath(slot["profile_dir"])
+
+
+def _start_instance(slot):
+    """Jalankan soffice headless yang listen di socket lokal lalu connect via UNO"""
+    slot["port"] = _free_port()
+    cmd = [
+        LIBREOFFICE_PATH,
+        "--headless",
+        "--invisible",
+        "--nologo",
+        "--norestore",
+        "--nodefault",
+        "--nolockcheck",
+        f"-env:UserInstallation={_profile_url(slot)}",
+        f"--accept=socket,host=127.0.0.1,port={slot['port']};urp;StarOffice.ComponentContext",
+    ]
+
+    print(f"📄 Starting LibreOffice instance (port={slot['port']}, pid={os.getpid()})")
+    slot["process"] = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    slot["conversions"] = 0
+
+    local_ctx = uno.getComponentContext()
+    resolver = local_ctx.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_ctx
+    )
+
+    deadline = time.time() + OFFICE_START_TIMEOUT
+    while True:
+        try:
+            ctx = resolver.resolve(
+                f"uno:socket,host=127.0.0.1,port={slot['port']};urp;StarOffice.ComponentContext"
+            )
+            slot["desktop"] = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+            return
+        except Exception:
+            if time.time() > deadline or slot["process"].poll() is not None:
+                _stop_instance(slot)
+                raise Exception("LibreOffice instance gagal start")
+            time.sleep(0.25)
+
+
+def _stop_instance(slot):
+    process = slot.get("process")
+    slot["process"] = None
+    slot["desktop"] = None
+
+    if process is not None and process.poll() is None:
+        process.kill()
+        try:
+            process.wait(timeout=5)
+        except Exception:
+            pass
+
+
+def _shutdown():
+    for slot in _all_slots:
+        _stop_instance(slot)
+        shutil.rmtree(slot["profile_dir"], ignore_errors=True)
+
+
+atexit.register(_shutdown)
+
+
+def _get_pool():
+    global _pool, _pool_pid
+
+    with _pool_lock:
+        # Setelah fork (gunicorn/Celery), instance milik parent tidak dipakai di child
+        if _pool_pid != os.getpid():
+            _all_slots.clear()
+            _pool = queue.Queue()
+            for _ in range(OFFICE_POOL_SIZE):
+                _pool.put(_new_slot())
+            _pool_pid = os.getpid()
+
+        return _pool
+
+
+def _prop(name, value):
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def _convert_uno(slot, input_path, output_path, timeout):
+    """Konversi lewat instance warm, kill instance jika hang melewati timeout"""
+    if slot["process"] is None or slot["process"].poll() is not None or slot["conversions"] >= OFFICE_MAX_CONVERSIONS:
+        _stop_instance(slot)
+        _start_instance(slot)
+
+    hung = threading.Event()
+
+    def on_timeout():
+        hung.set()
+        _stop_instance(slot)
+
+    timer = threading.Timer(timeout, on_timeout)
+    timer.start()
+
+    try:
+        extension = os.path.splitext(input_path)[1].lower()
+        doc = slot["desktop"].loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(input_path)), "_blank", 0,
+            (_prop("Hidden", True), _prop("ReadOnly", True))
+        )
+        try:
+            doc.storeToURL(
+                uno.systemPathToFileUrl(os.path.abspath(output_path)),
+                (_prop("FilterName", PDF_FILTERS.get(extension, "writer_pdf_Export")),)
+            )
+        finally:
+            doc.close(True)
+
+        slot["conversions"] += 1
+
+    except Exception:
+        # Instance mungkin rusak/hang: recycle pada konversi berikutnya
+        _stop_instance(slot)
+        if hung.is_set():
+            raise subprocess.TimeoutExpired(LIBREOFFICE_PATH, timeout)
+        raise
+
+    finally:
+        timer.cancel()
+
+
+def _convert_cold(slot, input_path, output_dir, timeout):
+    """Fallback tanpa UNO: soffice --convert-to dengan profile milik slot"""
+    cmd = [
+        LIBREOFFICE_PATH,
+        f"-env:UserInstallation={_profile_url(slot)}",
+        '--headless',
+        '--convert-to',
+        'pdf',
+        '--outdir',
+        output_dir,
+        input_path
+    ]
+
+    process = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+
+    if process.returncode != 0:
+        raise Exception(f"LibreOffice conversion error: {process.stderr.decode()}")
+
+
+def convert_to_pdf(input_path, output_dir, timeout=None):
+    """
+    Convert dokumen office ke PDF memakai instance LibreOffice dari pool.
+    Output: <output_dir>/<nama file input>.pdf (sama dengan soffice --convert-to).
+    Raise subprocess.TimeoutExpired jika konversi melewati timeout.
+    """
+    timeout = timeout or OFFICE_CONVERT_TIMEOUT
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    output_path = os.path.join(output_dir, f"{base_name}.pdf")
+
+    pool = _get_pool()
+    slot = pool.get()
+
+    try:
+        with metrics.stage_timer("libreoffice"), metrics.subprocess_in_flight("libreoffice"):
+            if uno is not None:
+                _convert_uno(slot, input_path, output_path, timeout)
+            else:
+                _convert_cold(slot, input_path, output_dir, timeout)
+    finally:
+        pool.put(slot)
+
+    # Check if conversion succeeded
+    if not os.path.exists(output_path):
+        raise Exception("Conversion failed: PDF file not created")
+
+    return output_path
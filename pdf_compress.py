@@ -0,0 +1,217 @@
+# pdf_compress.py
+import os
+import shutil
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from tools_config import GHOSTSCRIPT_PATH
+import metrics
+import pdf_merge
+
+load_dotenv()
+
+# Page-parallel compression: PDF dengan halaman >= threshold dipecah per chunk,
+# setiap chunk dikompres oleh process Ghostscript terpisah secara bersamaan.
+# COMPRESS_WORKERS = jumlah process gs per job. Default kecil karena beberapa job
+# bisa berjalan bersamaan (Celery prefork / gunicorn threads); naikkan hanya
+# jika CPU cores >= concurrency worker × COMPRESS_WORKERS.
+COMPRESS_PARALLEL_MIN_PAGES = int(os.getenv("COMPRESS_PARALLEL_MIN_PAGES", 100))
+COMPRESS_PAGES_PER_CHUNK = int(os.getenv("COMPRESS_PAGES_PER_CHUNK", 50))
+COMPRESS_WORKERS = int(os.getenv("COMPRESS_WORKERS", 2))
+
+
+def compression_settings(original_size):
+    """
+    Tentukan profile dan settings berdasarkan ukuran file.
+    Untuk file scan (biasanya lebih besar), gunakan settings lebih konservatif.
+    Return (profile, resolution, jpeg_quality)
+    """
+    if original_size > 5 * 1024 * 1024:  # > 5MB, kemungkinan scan
+        return "/ebook", 150, 75
+    elif original_size > 2 * 1024 * 1024:  # > 2MB
+        return "/ebook", 120, 70
+    else:  # File kecil (digital text)
+        return "/ebook", 100, 65
+
+
+def build_gs_command(input_path, output_path, profile, resolution, jpeg_quality,
+                     first_page=None, last_page=None):
+    """
+    Ghostscript command dengan settings yang lebih aman untuk scan.
+    first_page/last_page opsional untuk mengkompres sebagian halaman saja.
+    """
+    page_range = []
+    if first_page is not None:
+        page_range.append(f"-dFirstPage={first_page}")
+    if last_page is not None:
+        page_range.append(f"-dLastPage={last_page}")
+
+    return [
+        GHOSTSCRIPT_PATH,
+        "-sDEVICE=pdfwrite",
+        "-dCompatibilityLevel=1.4",
+        f"-dPDFSETTINGS={profile}",
+
+        # Downsample dengan bicubic (lebih baik untuk scan)
+        "-dColorImageDownsampleType=/Bicubic",
+        f"-dColorImageResolution={resolution}",
+        "-dGrayImageDownsampleType=/Bicubic",
+        f"-dGrayImageResolution={resolution}",
+        "-dMonoImageDownsampleType=/Bicubic",
+        f"-dMonoImageResolution={resolution}",
+
+        # JPEG compression dengan quality lebih tinggi
+        "-dAutoFilterColorImages=false",
+        "-dAutoFilterGrayImages=false",
+        "-dColorImageFilter=/DCTEncode",
+        "-dGrayImageFilter=/DCTEncode",
+
+        # JPEG Quality lebih tinggi untuk scan
+        f"-dJPEGQ={jpeg_quality}",
+
+        # Preserve metadata dan struktur
+        "-dPreserveAnnots=true",
+        "-dPreserveEPSInfo=false",
+        "-dPreserveOPIComments=false",
+        "-dPreserveOverprintSettings=false",
+
+        "-dNOPAUSE",
+        "-dQUIET",
+        "-dBATCH",
+        *page_range,
+        f"-sOutputFile={output_path}",
+        input_path
+    ]
+
+
+def run_gs(gs_command):
+    """Jalankan satu process Ghostscript (tercatat di metrics)"""
+    with metrics.stage_timer("ghostscript"), metrics.subprocess_in_flight("ghostscript"):
+        return subprocess.run(gs_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def compress_parallel(input_path, output_path, profile, resolution, jpeg_quality, total_pages,
+                      pages_per_chunk=None, workers=None):
+    """
+    Kompres per chunk halaman secara bersamaan lalu gabungkan kembali.
+    Setiap chunk memakai settings Ghostscript yang sama dengan mode single.
+    Return subprocess result dari chunk yang gagal, atau None jika semua berhasil.
+    """
+    pages_per_chunk = max(1, pages_per_chunk or COMPRESS_PAGES_PER_CHUNK)
+    workers = max(1, workers or COMPRESS_WORKERS)
+    temp_dir = tempfile.mkdtemp(prefix="gs_chunks_")
+
+    try:
+        chunks = []
+        for first in range(1, total_pages + 1, pages_per_chunk):
+            last = min(first + pages_per_chunk - 1, total_pages)
+            chunk_path = os.path.join(temp_dir, f"chunk_{first:06d}.pdf")
+            chunks.append((chunk_path, build_gs_command(
+                input_path, chunk_path, profile, resolution, jpeg_quality,
+                first_page=first, last_page=last
+            )))
+
+        print(f"🗜️  Parallel compress: {total_pages} pages → {len(chunks)} chunks, {workers} workers")
+
+        # Pekerjaan berat ada di process gs; thread hanya menunggu subprocess
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda chunk: run_gs(chunk[1]), chunks))
+
+        for result in results:
+            if result.returncode != 0:
+                return result
+
+        # Gabungkan chunk sesuai urutan halaman (font yang sama di setiap chunk ditulis sekali)
+        pdf_merge.merge_pdfs([chunk_path for chunk_path, _ in chunks], output_path, stage="compress_stitch", page_method=None)
+
+        return None
+
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def compress_pdf_file(input_path, output_path, parallel=None):
+    """
+    Kompres PDF dengan Ghostscript dan validasi hasilnya.
+    Dipakai oleh endpoint compress-pdf (sync) dan Celery task (async).
+
+    parallel=None → otomatis page-parallel jika jumlah halaman
+    >= COMPRESS_PARALLEL_MIN_PAGES. True/False untuk memaksa mode.
+
+    Return dict dengan status:
+    - success : file hasil ada di output_path
+    - optimal : kompresi tidak memperkecil file, output dihapus
+    - failed  : error + detail (opsional), output dihapus
+    """
+    original_size = os.path.getsize(input_path)
+    profile, resolution, jpeg_quality = compression_settings(original_size)
+
+    # PDF yang tidak terbaca/terenkripsi → 0 halaman, dikompres dengan mode single
+    try:
+        total_pages = pdf_merge.count_pages(input_path)
+    except Exception:
+        total_pages = 0
+    if parallel is None:
+        parallel = total_pages >= COMPRESS_PARALLEL_MIN_PAGES
+
+    # Jalankan kompresi
+    if parallel and total_pages > 1:
+        result = compress_parallel(input_path, output_path, profile, resolution, jpeg_quality, total_pages)
+    else:
+        gs_command = build_gs_command(input_path, output_path, profile, resolution, jpeg_quality)
+        result = run_gs(gs_command)
+        if result.returncode == 0:
+            result = None
+
+    if result is not None:
+        return {
+            "status": "failed",
+            "error": "Gagal melakukan kompres PDF",
+            "detail": result.stderr.decode()
+        }
+
+    # Validasi file hasil kompresi
+    if not os.path.exists(output_path):
+        return {
+            "status": "failed",
+            "error": "File hasil kompresi tidak ditemukan"
+        }
+
+    compressed_size = os.path.getsize(output_path)
+
+    # Cek jika file terlalu kecil (kemungkinan rusak)
+    # File PDF minimal sekitar 1KB, jika dibawah itu pasti rusak
+    if compressed_size < 1024:  # Kurang dari 1KB
+        os.remove(output_path)  # Hapus file rusak
+        return {
+            "status": "failed",
+            "error": "Kompresi menghasilkan file yang rusak. Coba dengan file PDF lain atau gunakan settingan berbeda."
+        }
+
+    # Cek jika kompresi terlalu agresif (> 95% reduction bisa indikasi masalah)
+    reduction_percent = 100 - ((compressed_size / original_size) * 100)
+
+    if reduction_percent > 95:
+        os.remove(output_path)  # Hapus file yang kemungkinan rusak
+        return {
+            "status": "failed",
+            "error": "Kompresi terlalu agresif dan kemungkinan merusak file. File original mungkin sudah optimal atau memiliki format khusus."
+        }
+
+    # Jika kompresi malah memperbesar file (bisa terjadi pada file sudah optimal)
+    if compressed_size >= original_size:
+        os.remove(output_path)  # Hapus file hasil
+        return {
+            "status": "optimal",
+            "original_size": original_size,
+            "compressed_size": original_size,
+            "reduction_percent": 0
+        }
+
+    return {
+        "status": "success",
+        "original_size": original_size,
+        "compressed_size": compressed_size,
+        "reduction_percent": round(reduction_percent, 2)
+    }
@@ -0,0 +1,434 @@
+# pdf_merge.py
+import io
+import os
+import hashlib
+import PyPDF2
+from PyPDF2.generic import (
+    ArrayObject, ByteStringObject, DictionaryObject, IndirectObject, NameObject, NullObject, StreamObject
+)
+import metrics
+
+# Engine merge PDF tanpa PdfMerger.
+#
+# PdfMerger menyimpan object graph semua input sampai merger.write(), sehingga
+# memory naik sebanding jumlah input. Di sini setiap input:
+# - di-parse sekali (PdfReader), halaman beserta object yang direferensikan
+#   (content, font, image, annotation) disalin dan ditulis langsung ke file
+#   dengan nomor object baru,
+# - lalu reader ditutup sebelum input berikutnya dibuka.
+# Yang tersisa di memory hanya offset xref, id halaman dan hash object shared.
+#
+# Object yang isinya identik (stream: image, font file, ICC profile, content;
+# dict /Font, /FontDescriptor, /ExtGState, ...) hanya ditulis sekali walaupun
+# berasal dari input berbeda, mis. logo kop surat dan font yang sama di setiap
+# surat. Outline (bookmark) dan named destination ikut disalin.
+
+# Dict dengan /Type ini aman dipakai bersama banyak halaman/dokumen (tidak punya identitas
+# seperti /Page atau /Annot). Stream dan array selalu boleh di-share.
+SHAREABLE_TYPES = {"/Font", "/FontDescriptor", "/ExtGState", "/Encoding", "/Pattern", "/XObject", "/Metadata"}
+
+# Object tree dokumen sumber yang tidak ikut disalin (diganti null)
+SKIPPED_TYPES = {"/Pages", "/Catalog", "/Outlines"}
+# /Page termasuk: halaman yang ada di page tree sudah di-map sebelum disalin, sisanya (yatim)
+# akan ikut menarik /Parent dan seluruh page tree sumber
+SKIPPED_REF_TYPES = SKIPPED_TYPES | {"/Page"}
+
+# Key halaman yang tidak disalin: /Parent diganti Pages baru, /B (article bead) menunjuk thread di Catalog
+SKIPPED_PAGE_KEYS = {"/Parent", "/B"}
+
+OUTLINE_LINK_KEYS = {"/Parent", "/Prev", "/Next", "/First", "/Last", "/Count"}
+
+
+def count_pages(path):
+    """
+    Jumlah halaman dari /Count root page tree: cukup baca xref + 2 object,
+    tanpa menelusuri seluruh page tree (dipakai saat upload, sebelum merge).
+    """
+    reader = PyPDF2.PdfReader(path)
+    if reader.is_encrypted and not reader.decrypt(""):
+        raise ValueError(f"PDF terenkripsi: {os.path.basename(path)}")
+
+    try:
+        count = reader.trailer["/Root"]["/Pages"]["/Count"]
+        if isinstance(count, int) and count > 0:
+            return int(count)
+    except Exception:
+        pass
+    return len(reader.pages)
+
+
+class PdfMergeWriter:
+    """
+    Writer PDF streaming untuk merge.
+    Object 1 = Catalog, 2 = Pages (ditulis saat close karena /Kids baru lengkap di akhir).
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.offsets = {}
+        self.next_id = 3
+        self.page_ids = []
+        # sha1(body) → id object shared yang sudah ditulis
+        self.shared = {}
+        self.deduplicated_objects = 0
+        self.deduplicated_bytes = 0
+
+        self.outline_id = None
+        self.outline_top = []
+        self.named_dests = {}
+
+        # Per input (di-reset di add_document)
+        self.id_map = {}
+        self.in_progress = set()
+
+        fp.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def _alloc(self):
+        obj_id = self.next_id
+        self.next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id, body):
+        self.offsets[obj_id] = self.fp.tell()
+        self.fp.write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    # ===================== SERIALIZE =====================
+    def _serialize(self, obj):
+        """Object PyPDF2 → bytes, referensi indirect diganti nomor object baru"""
+        if isinstance(obj, IndirectObject):
+            return self._ref(obj)
+        if isinstance(obj, DictionaryObject):
+            return self._dict_body(obj)
+        if isinstance(obj, ArrayObject):
+            return b"[" + b" ".join(self._serialize(item) for item in obj) + b"]"
+
+        buf = io.BytesIO()
+        obj.write_to_stream(buf, None)
+        return buf.getvalue()
+
+    def _dict_entries(self, obj, skip=()):
+        return b" ".join(
+            _name(key) + b" " + self._serialize(value) for key, value in obj.items() if key not in skip
+        )
+
+    def _dict_body(self, obj, skip=(), extra=b""):
+        return b"<< " + b" ".join(part for part in (self._dict_entries(obj, skip), extra) if part) + b" >>"
+
+    def _body(self, obj):
+        if isinstance(obj, StreamObject):
+            # /Length bisa indirect di sumber, selalu ditulis ulang langsung
+            data = obj._data
+            return (self._dict_body(obj, skip=("/Length",), extra=b"/Length %d" % len(data))
+                    + b"\nstream\n" + data + b"\nendstream")
+        return self._serialize(obj)
+
+    def _ref(self, ref):
+        key = (ref.idnum, ref.generation)
+        if key in self.id_map:
+            return b"%d 0 R" % self.id_map[key]
+
+        obj = ref.get_object()
+        if obj is None or isinstance(obj, NullObject):
+            return b"null"
+        if isinstance(obj, DictionaryObject) and _get(obj, "/Type") in SKIPPED_REF_TYPES:
+            return b"null"
+
+        return b"%d 0 R" % self._copy(key, obj)
+
+    def _copy(self, key, obj):
+        if key in self.in_progress:
+            # Referensi melingkar ke object shared yang sedang diserialisasi: pakai id tetap
+            obj_id = self._alloc()
+            self.id_map[key] = obj_id
+            return obj_id
+
+        if not _shareable(obj):
+            # Id dialokasikan sebelum isi diserialisasi, jadi referensi melingkar aman
+            obj_id = self._alloc()
+            self.id_map[key] = obj_id
+            self._write_object(obj_id, self._body(obj))
+            return obj_id
+
+        self.in_progress.add(key)
+        try:
+            body = self._body(obj)
+        finally:
+            self.in_progress.discard(key)
+
+        if key in self.id_map:
+            obj_id = self.id_map[key]
+            self._write_object(obj_id, body)
+            return obj_id
+
+        digest = hashlib.sha1(body).digest()
+        obj_id = self.shared.get(digest)
+        if obj_id is not None:
+            self.deduplicated_objects += 1
+            self.deduplicated_bytes += len(body)
+        else:
+            obj_id = self._alloc()
+            self._write_object(obj_id, body)
+            self.shared[digest] = obj_id
+
+        self.id_map[key] = obj_id
+        return obj_id
+
+    # ===================== DOCUMENT =====================
+    def add_document(self, reader, progress=None):
+        """Salin semua halaman, outline dan named destination satu reader. Return jumlah halaman."""
+        self.id_map = {}
+        self.in_progress = set()
+
+        pages = reader.pages
+        # Semua halaman dapat id dulu: annotation/destination boleh menunjuk halaman mana pun
+        page_ids = []
+        for page in pages:
+            page_id = self._alloc()
+            if page.indirect_ref is not None:
+                self.id_map[(page.indirect_ref.idnum, page.indirect_ref.generation)] = page_id
+            page_ids.append(page_id)
+
+        for index, (page, page_id) in enumerate(zip(pages, page_ids)):
+            self._write_object(page_id, self._dict_body(page, skip=SKIPPED_PAGE_KEYS, extra=b"/Parent 2 0 R"))
+            if progress:
+                progress(index + 1)
+
+        root = reader.trailer["/Root"]
+        self._copy_outline(root)
+        self._copy_named_dests(root)
+
+        self.page_ids.extend(page_ids)
+        self.id_map = {}
+        return len(page_ids)
+
+    def _copy_outline(self, root):
+        outlines = _get(root, "/Outlines")
+        if not isinstance(outlines, DictionaryObject) or "/First" not in outlines:
+            return
+
+        nodes = _outline_nodes(outlines.raw_get("/First"), set())
+        if not nodes:
+            return
+
+        # Dialokasikan hanya jika ada item: id tanpa object akan merusak xref
+        if self.outline_id is None:
+            self.outline_id = self._alloc()
+        self._assign_outline_ids(nodes)
+        # Item level atas baru ditulis saat close: /Prev//Next menyambung ke input lain
+        for node in nodes:
+            entries = self._dict_entries(node["item"], skip=OUTLINE_LINK_KEYS) + _outline_links(node)
+            self.outline_top.append((node["id"], entries, _visible_count(node)))
+        for node in nodes:
+            self._write_outline_children(node)
+
+    def _assign_outline_ids(self, nodes):
+        for node in nodes:
+            node["id"] = self._alloc()
+            self._assign_outline_ids(node["children"])
+
+    def _write_outline_children(self, parent):
+        children = parent["children"]
+        for index, node in enumerate(children):
+            links = _outline_links(node) + b" /Parent %d 0 R" % parent["id"]
+            if index > 0:
+                links += b" /Prev %d 0 R" % children[index - 1]["id"]
+            if index + 1 < len(children):
+                links += b" /Next %d 0 R" % children[index + 1]["id"]
+            self._write_object(node["id"], self._dict_body(node["item"], skip=OUTLINE_LINK_KEYS, extra=links.strip()))
+            self._write_outline_children(node)
+
+    def _copy_named_dests(self, root):
+        """Named destination (Catalog /Dests dan name tree /Names /Dests); nama yang sudah ada dipertahankan"""
+        dests = _get(root, "/Dests")
+        if isinstance(dests, DictionaryObject):
+            for name, value in dests.items():
+                self._add_named_dest(name[1:].encode("utf-8"), value)
+
+        names = _get(root, "/Names")
+        if isinstance(names, DictionaryObject) and isinstance(_get(names, "/Dests"), DictionaryObject):
+            for name, value in _name_tree_items(names["/Dests"], set()):
+                self._add_named_dest(name, value)
+
+    def _add_named_dest(self, name, value):
+        if name not in self.named_dests:
+            self.named_dests[name] = self._serialize(value)
+
+    def close(self):
+        if not self.page_ids:
+            raise ValueError("Tidak ada halaman untuk ditulis")
+
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self.page_ids)
+        self._write_object(2, b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(self.page_ids))
+
+        catalog = b"<< /Type /Catalog /Pages 2 0 R"
+        if self.outline_top:
+            self._write_outline_root()
+            catalog += b" /Outlines %d 0 R" % self.outline_id
+        if self.named_dests:
+            dests_id = self._alloc()
+            entries = b" ".join(
+                _string_literal(name) + b" " + value for name, value in sorted(self.named_dests.items())
+            )
+            self._write_object(dests_id, b"<< /Names [" + entries + b"] >>")
+            catalog += b" /Names << /Dests %d 0 R >>" % dests_id
+        self._write_object(1, catalog + b" >>")
+
+        xref_offset = self.fp.tell()
+        size = self.next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[obj_id]:010d} 00000 n \n" for obj_id in range(1, size)]
+        lines.append(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self.fp.write("".join(lines).encode("latin-1"))
+
+    def _write_outline_root(self):
+        top = self.outline_top
+        visible = 0
+        for index, (item_id, entries, item_visible) in enumerate(top):
+            links = b" /Parent %d 0 R" % self.outline_id
+            if index > 0:
+                links += b" /Prev %d 0 R" % top[index - 1][0]
+            if index + 1 < len(top):
+                links += b" /Next %d 0 R" % top[index + 1][0]
+            self._write_object(item_id, b"<< " + entries + links + b" >>")
+            visible += 1 + item_visible
+
+        self._write_object(self.outline_id, b"<< /Type /Outlines /First %d 0 R /Last %d 0 R /Count %d >>"
+                           % (top[0][0], top[-1][0], visible))
+
+
+# ===================== HELPERS =====================
+def _get(obj, key):
+    """dict.get yang me-resolve IndirectObject (DictionaryObject.get mengembalikan referensi mentah)"""
+    value = obj.get(key)
+    return value.get_object() if value is not None else None
+
+
+def _name(key):
+    buf = io.BytesIO()
+    NameObject(key).write_to_stream(buf, None)
+    return buf.getvalue()
+
+
+def _string_literal(value):
+    buf = io.BytesIO()
+    ByteStringObject(value).write_to_stream(buf, None)
+    return buf.getvalue()
+
+
+def _shareable(obj):
+    if isinstance(obj, (StreamObject, ArrayObject)):
+        return True
+    return isinstance(obj, DictionaryObject) and _get(obj, "/Type") in SHAREABLE_TYPES
+
+
+def _string_bytes(value):
+    if isinstance(value, ByteStringObject):
+        return bytes(value)
+    if hasattr(value, "original_bytes"):
+        return value.original_bytes
+    return str(value).encode("utf-8")
+
+
+def _name_tree_items(node, visited):
+    """(nama bytes, value) dari name tree, aman terhadap /Kids melingkar"""
+    node_id = id(node)
+    if node_id in visited:
+        return
+    visited.add(node_id)
+
+    names = _get(node, "/Names")
+    if isinstance(names, ArrayObject):
+        for i in range(0, len(names) - 1, 2):
+            yield _string_bytes(names[i].get_object()), names[i + 1]
+
+    for kid in _get(node, "/Kids") or []:
+        kid = kid.get_object()
+        if isinstance(kid, DictionaryObject):
+            yield from _name_tree_items(kid, visited)
+
+
+def _outline_nodes(first, visited):
+    """Item outline (sibling mulai dari /First) → [{"item", "children", "closed"}]"""
+    nodes = []
+    ref = first
+    while isinstance(ref, IndirectObject) and (ref.idnum, ref.generation) not in visited:
+        visited.add((ref.idnum, ref.generation))
+        item = ref.get_object()
+        if not isinstance(item, DictionaryObject):
+            break
+
+        count = _get(item, "/Count")
+        nodes.append({
+            "item": item,
+            "children": _outline_nodes(item.raw_get("/First"), visited) if "/First" in item else [],
+            "closed": isinstance(count, int) and count < 0,
+        })
+        ref = item.raw_get("/Next") if "/Next" in item else None
+    return nodes
+
+
+def _visible_count(node):
+    if node["closed"]:
+        return 0
+    return sum(1 + _visible_count(child) for child in node["children"])
+
+
+def _outline_links(node):
+    children = node["children"]
+    if not children:
+        return b""
+
+    count = -len(children) if node["closed"] else _visible_count(node)
+    return b" /First %d 0 R /Last %d 0 R /Count %d" % (children[0]["id"], children[-1]["id"], count)
+
+
+def merge_pdfs(input_paths, output_path, progress=None, page_counts=None, stage="merge_write",
+               page_method="merge"):
+    """
+    Gabungkan PDF (urut sesuai input_paths) ke output_path.
+    page_counts (opsional, dari saat upload) hanya dipakai untuk progress per halaman.
+    stage: nama stage metrics untuk salin + tulis (mis. "compress_stitch" dari pdf_compress).
+    page_method: label metrics halaman yang diproses; None jika halaman sudah dihitung pemanggil.
+    Return {"pages", "deduplicated_objects", "deduplicated_bytes"}
+    """
+    weights = page_counts if page_counts and len(page_counts) == len(input_paths) else [1] * len(input_paths)
+    total = sum(weights) or 1
+
+    tmp_path = f"{output_path}.part"
+    try:
+        with open(tmp_path, "wb") as fp:
+            writer = PdfMergeWriter(fp)
+            done = 0
+            for path, weight in zip(input_paths, weights):
+                with open(path, "rb") as source:
+                    with metrics.stage_timer("pdf_parse"):
+                        reader = PyPDF2.PdfReader(source)
+                        if reader.is_encrypted and not reader.decrypt(""):
+                            raise ValueError(f"PDF terenkripsi: {os.path.basename(path)}")
+
+                    with metrics.stage_timer(stage):
+                        if progress and page_counts:
+                            writer.add_document(reader, lambda page: progress(int((done + min(page, weight)) / total * 90)))
+                        else:
+                            writer.add_document(reader)
+                    # Lepas object graph input ini sebelum input berikutnya dibuka
+                    del reader
+
+                done += weight
+                if progress:
+                    progress(int(done / total * 90))
+
+            with metrics.stage_timer(stage):
+                writer.close()
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if page_method:
+        metrics.count_pages(page_method, len(writer.page_ids))
+    return {
+        "pages": len(writer.page_ids),
+        "deduplicated_objects": writer.deduplicated_objects,
+        "deduplicated_bytes": writer.deduplicated_bytes,
+    }
@@ -0,0 +1,258 @@
+# progress_events.py
+import os
+import json
+import time
+import redis
+from dotenv import load_dotenv
+from celery_app import get_redis_url
+
+load_dotenv()
+
+# Event progress OCR dan job lewat Redis pub/sub.
+# Worker Celery publish event (per halaman, selesai, gagal); endpoint
+# long-poll (?wait=N) dan SSE di app.py subscribe ke channel yang sama,
+# sehingga client tidak perlu polling DB/backend Celery berulang kali.
+#
+# Channel : progress:ocr:<ocr_id>, progress:job:<job_id>
+# Event   : {"type": "started"|"page"|"progress"|"retrying"|"completed"|"failed"|"cancelled", ...}
+#
+# Publish bersifat best effort: jika Redis tidak tersedia, task tetap jalan
+# dan client jatuh kembali ke status dari DB.
+#
+# SSE dan ?wait= menahan satu request selama menunggu: jalankan app dengan
+# worker thread/async (gunicorn_config.py: gthread), bukan sync worker.
+
+PROGRESS_EVENTS_ENABLED = os.getenv("PROGRESS_EVENTS_ENABLED", "true").lower() in ("1", "true", "yes")
+PROGRESS_WAIT_MAX = int(os.getenv("PROGRESS_WAIT_MAX", 30))      # detik, batas ?wait=
+PROGRESS_STREAM_MAX = int(os.getenv("PROGRESS_STREAM_MAX", 120))  # detik, umur maksimal satu koneksi SSE
+PROGRESS_HEARTBEAT = int(os.getenv("PROGRESS_HEARTBEAT", 15))     # detik, komentar keep-alive SSE
+PROGRESS_KEY_TTL = 24 * 3600
+
+CHANNEL_PREFIX = "progress:"
+TERMINAL_EVENTS = ("completed", "failed", "cancelled")
+
+_redis_client = None
+
+
+def get_redis():
+    """Redis client (lazy, satu per proses)"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(get_redis_url(), socket_timeout=5)
+    return _redis_client
+
+
+def ocr_channel(ocr_id):
+    return f"{CHANNEL_PREFIX}ocr:{ocr_id}"
+
+
+def job_channel(job_id):
+    return f"{CHANNEL_PREFIX}job:{job_id}"
+
+
+def publish(channel, event_type, **data):
+    """Publish satu event ke channel, return jumlah subscriber (0 jika gagal)"""
+    if not PROGRESS_EVENTS_ENABLED:
+        return 0
+
+    event = {"type": event_type, "ts": round(time.time(), 3), **data}
+    try:
+        return get_redis().publish(channel, json.dumps(event, default=str))
+    except Exception as e:
+        print(f"⚠️  Progress publish error ({channel}): {e}")
+        return 0
+
+
+# ===================== OCR =====================
+def _ocr_pages_key(ocr_id):
+    return f"{ocr_channel(ocr_id)}:pages_done"
+
+
+def ocr_started(ocr_id, pages_done, total_pages):
+    """
+    Awal (atau retry) task OCR. pages_done = halaman text layer + checkpoint,
+    counter Redis di-reset ke nilai ini agar chunk paralel bisa INCR bersama.
+    """
+    if not ocr_id or not PROGRESS_EVENTS_ENABLED:
+        return
+    try:
+        get_redis().set(_ocr_pages_key(ocr_id), pages_done, ex=PROGRESS_KEY_TTL)
+    except Exception as e:
+        print(f"⚠️  Progress counter error: {e}")
+
+    publish(
+        ocr_channel(ocr_id), "started",
+        ocr_id=ocr_id, pages_done=pages_done, total_pages=total_pages,
+        percent=_percent(pages_done, total_pages)
+    )
+
+
+def ocr_page_done(ocr_id, page, total_pages, error=False):
+    """Satu halaman selesai di-OCR (mode serial maupun chunk paralel)"""
+    if not ocr_id or not PROGRESS_EVENTS_ENABLED:
+        return
+    try:
+        pages_done = int(get_redis().incr(_ocr_pages_key(ocr_id)))
+    except Exception as e:
+        print(f"⚠️  Progress counter error: {e}")
+        pages_done = None
+
+    publish(
+        ocr_channel(ocr_id), "page",
+        ocr_id=ocr_id, page=page, error=error, pages_done=pages_done, total_pages=total_pages,
+        percent=_percent(pages_done, total_pages)
+    )
+
+
+def ocr_retrying(ocr_id, attempt, max_retries, error=None, countdown=None):
+    """Attempt gagal dan akan di-retry: event non-terminal, counter halaman tetap"""
+    if not ocr_id:
+        return
+    publish(
+        ocr_channel(ocr_id), "retrying",
+        ocr_id=ocr_id, status="processing", attempt=attempt, max_retries=max_retries,
+        error=(error or "")[:1000], countdown=countdown
+    )
+
+
+def ocr_finished(ocr_id, status, error=None):
+    """Status akhir OCR (dipanggil setelah UPDATE ocr_files di-commit)"""
+    if not ocr_id:
+        return
+    data = {"ocr_id": ocr_id, "status": status}
+    if error:
+        data["error"] = error
+    publish(ocr_channel(ocr_id), status, **data)
+
+    if status in TERMINAL_EVENTS and PROGRESS_EVENTS_ENABLED:
+        try:
+            get_redis().delete(_ocr_pages_key(ocr_id))
+        except Exception:
+            pass
+
+
+def ocr_progress(ocr_id):
+    """Counter halaman selesai saat ini (untuk response status), None jika tidak ada"""
+    if not ocr_id or not PROGRESS_EVENTS_ENABLED:
+        return None
+    try:
+        value = get_redis().get(_ocr_pages_key(ocr_id))
+        return int(value) if value is not None else None
+    except Exception:
+        return None
+
+
+def _percent(pages_done, total_pages):
+    if pages_done is None or not total_pages:
+        return None
+    return min(100, int(pages_done * 100 / total_pages))
+
+
+# ===================== SUBSCRIBE =====================
+def subscribe(channel):
+    """
+    PubSub yang sudah subscribe ke channel, atau None jika Redis tidak tersedia.
+    Subscribe DULU, baru baca status dari DB, supaya event di antaranya tidak hilang.
+    """
+    if not PROGRESS_EVENTS_ENABLED:
+        return None
+    try:
+        pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        return pubsub
+    except Exception as e:
+        print(f"⚠️  Progress subscribe error ({channel}): {e}")
+        return None
+
+
+def close(pubsub):
+    if pubsub is None:
+        return
+    try:
+        pubsub.close()
+    except Exception:
+        pass
+
+
+def next_event(pubsub, timeout):
+    """
+    Tunggu event berikutnya maksimal timeout detik.
+    Return dict event, atau None jika timeout / koneksi Redis putus.
+    """
+    deadline = time.time() + max(0.0, timeout)
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+        try:
+            # Poll per detik: tetap di bawah socket_timeout client
+            message = pubsub.get_message(timeout=min(remaining, 1.0))
+        except Exception as e:
+            print(f"⚠️  Progress listen error: {e}")
+            time.sleep(min(remaining, 1.0))
+            return None
+
+        if message and message.get("type") == "message":
+            try:
+                return json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+
+
+def wait_for_change(pubsub, timeout):
+    """Long-poll: blok sampai ada event atau timeout. Return event atau None."""
+    if pubsub is None or not timeout or timeout <= 0:
+        return None
+    return next_event(pubsub, min(float(timeout), PROGRESS_WAIT_MAX))
+
+
+def parse_wait(value):
+    """Parse ?wait=N (detik), dibatasi PROGRESS_WAIT_MAX. Raise ValueError jika tidak valid."""
+    if value in (None, ""):
+        return 0
+    wait = float(value)
+    if wait < 0:
+        raise ValueError("wait harus >= 0")
+    return min(wait, PROGRESS_WAIT_MAX)
+
+
+def sse_format(event, event_name=None):
+    """Satu frame text/event-stream"""
+    lines = []
+    if event_name:
+        lines.append(f"event: {event_name}")
+    lines.append(f"data: {json.dumps(event, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream(pubsub, snapshot, max_seconds=None):
+    """
+    Generator SSE: kirim snapshot status awal, lalu forward event dari channel
+    sampai event terminal atau max_seconds (client reconnect otomatis via EventSource).
+    """
+    max_seconds = PROGRESS_STREAM_MAX if max_seconds is None else max_seconds
+    started = time.time()
+
+    try:
+        yield "retry: 2000\n\n"
+        yield sse_format(snapshot, "status")
+
+        if snapshot.get("status") in TERMINAL_EVENTS or pubsub is None:
+            return
+
+        while True:
+            remaining = max_seconds - (time.time() - started)
+            if remaining <= 0:
+                return
+
+            event = next_event(pubsub, min(PROGRESS_HEARTBEAT, remaining))
+            if event is None:
+                # Keep-alive agar proxy (Apache) tidak menutup koneksi idle
+                yield ": keep-alive\n\n"
+                continue
+
+            yield sse_format(event, event.get("type"))
+            if event.get("type") in TERMINAL_EVENTS:
+                return
+    finally:
+        close(pubsub)
@@ -1,36 +1,56 @@
 from celery_app import make_celery
-import os, PyPDF2, pytesseract
-from pdf2image import convert_from_path
+from celery import chord
+from celery.signals import task_retry, worker_ready, worker_process_shutdown
+import os, re, time, PyPDF2, json
 import requests
 from dotenv import load_dotenv
-import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
+from ocr_pipeline import iter_selected_page_images, classify_pages, extraction_method, OCR_LANG, OCR_DPI
+import ocr_cache
+import ocr_engine
+import ocr_stats
+import progress_events
+import metrics
+import job_profile
+import jobs
+import tool_handlers
+from db import db_cursor
 
 load_dotenv()
 
 celery = make_celery()
 
+
+# ===================== METRICS =====================
+@worker_ready.connect
+def start_metrics_server(**kwargs):
+    """/metrics worker di METRICS_WORKER_PORT (process utama, agregasi child via multiprocess dir)"""
+    metrics.start_worker_server()
+
+
+@worker_process_shutdown.connect
+def cleanup_process_metrics(**kwargs):
+    metrics.mark_process_dead(os.getpid())
+
+
+@task_retry.connect
+def count_task_retry(sender=None, **kwargs):
+    metrics.count_retry(getattr(sender, "name", "unknown"))
+
 # Get Poppler path if needed
 POPPLER_PATH = os.getenv("POPPLER_PATH", None)
 
+# Page-parallel OCR: dokumen dengan jumlah halaman >= threshold
+# dipecah per chunk dan diproses oleh beberapa worker sekaligus
+OCR_PARALLEL_MIN_PAGES = int(os.getenv("OCR_PARALLEL_MIN_PAGES", 20))
+OCR_PAGES_PER_CHUNK = int(os.getenv("OCR_PAGES_PER_CHUNK", 10))
 
-def get_db_connection():
-    """Get database connection"""
-    try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', '127.0.0.1'),
-            user=os.getenv('DB_USER', 'root'),
-            password=os.getenv('DB_PASS', ''),
-            database=os.getenv('DB_NAME', 'dokumi'),
-            port=int(os.getenv('DB_PORT', 3306)),
-            charset='utf8mb4',
-            use_unicode=True
-        )
-        return connection
-    except Error as e:
-        print(f"❌ Database connection error: {e}")
-        return None
+# Jumlah hari terakhir ocr_stats_daily yang dibangun ulang oleh reconcile_ocr_stats_task
+OCR_STATS_RECONCILE_DAYS = int(os.getenv("OCR_STATS_RECONCILE_DAYS", 7))
+
+# Penanda halaman di full_text (lihat build_full_text)
+PAGE_MARKER_RE = re.compile(r"^===== PAGE (\d+) =====$", re.MULTILINE)
 
 
 def update_ocr_status_in_task(ocr_id, status, extracted_text="", metadata_file=None):
@@ -43,53 +63,357 @@ def update_ocr_status_in_task(ocr_id, status, extracted_text="", metadata_file=N
     
     extracted_text = str(extracted_text)
 
+    now = datetime.now()
+    sets = ["status=%s", "updated_at=%s"]
+    params = [status, now]
+
+    if metadata_file is not None:
+        sets.append("metadata_file=%s")
+        params.append(metadata_file)
+
+    # Full text disimpan di ocr_texts, ocr_files hanya menyimpan ringkasan
+    # sehingga status poll tidak ikut membaca LONGTEXT
+    if status == "failed":
+        sets.append("error_message=%s")
+        params.append(extracted_text[:1000])
+    elif extracted_text:
+        sets.extend(["text_length=%s", "text_preview=%s"])
+        params.extend([len(extracted_text), extracted_text[:500]])
+
     try:
-        conn = get_db_connection()
-        if not conn:
-            return False
-            
-        cursor = conn.cursor()
-
-        if metadata_file is not None:
-            sql = """
-                UPDATE ocr_files
-                SET status=%s, extracted_text=%s, metadata_file=%s, updated_at=%s
-                WHERE id=%s
-            """
-            params = (status, extracted_text, metadata_file, datetime.now(), ocr_id)
-        else:
-            sql = """
-                UPDATE ocr_files
-                SET status=%s, extracted_text=%s, updated_at=%s
-                WHERE id=%s
-            """
-            params = (status, extracted_text, datetime.now(), ocr_id)
-
-        cursor.execute(sql, params)
-        conn.commit()
-
-        cursor.close()
-        conn.close()
+        with db_cursor() as cursor:
+            ocr_stats.record_transition(cursor, ocr_id, status, now)
+            cursor.execute(f"UPDATE ocr_files SET {', '.join(sets)} WHERE id=%s", params + [ocr_id])
+
+            if status != "failed" and extracted_text:
+                cursor.execute("""
+                    INSERT INTO ocr_texts (ocr_id, extracted_text, created_at, updated_at)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE extracted_text=VALUES(extracted_text), updated_at=VALUES(updated_at)
+                """, (ocr_id, extracted_text, now, now))
+
         print(f"✅ Database updated - OCR ID: {ocr_id}, Status: {status}")
+
+        if status == "failed":
+            metrics.count_failure("ocr")
+
+        # Push ke client long-poll/SSE setelah commit
+        if status in ("completed", "failed"):
+            progress_events.ocr_finished(ocr_id, status, error=extracted_text[:1000] if status == "failed" else None)
         return True
 
     except Error as e:
         print(f"❌ Database update error: {e}")
-        try:
-            if cursor:
-                cursor.close()
-            if conn and conn.is_connected():
-                conn.close()
-        except:
-            pass
         return False
 
 
+def save_page_checkpoint(ocr_id, page):
+    """
+    Simpan hasil satu halaman ke ocr_pages sebagai checkpoint.
+    Idempotent: halaman yang sama (redelivery/retry) di-overwrite.
+    """
+    if not ocr_id:
+        return False
+
+    try:
+        with db_cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO ocr_pages (ocr_id, page_number, method, extracted_text, char_count, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    method=VALUES(method), extracted_text=VALUES(extracted_text),
+                    char_count=VALUES(char_count), created_at=VALUES(created_at)
+            """, (ocr_id, page["page"], page.get("method", "ocr"), page["text"], len(page["text"]), datetime.now()))
+        return True
+
+    except Error as e:
+        print(f"⚠️  Checkpoint save error (page {page.get('page')}): {e}")
+        return False
+
+
+def load_page_checkpoints(ocr_id):
+    """Ambil halaman yang sudah selesai di run sebelumnya: {page_number: result}"""
+    if not ocr_id:
+        return {}
+
+    try:
+        with db_cursor(dictionary=True) as cursor:
+            cursor.execute(
+                "SELECT page_number, method, extracted_text FROM ocr_pages WHERE ocr_id=%s",
+                (ocr_id,)
+            )
+            rows = cursor.fetchall()
+
+        return {
+            row["page_number"]: {
+                "page": row["page_number"],
+                "method": row["method"],
+                "text": row["extracted_text"] or "",
+                "char_count": len(row["extracted_text"] or "")
+            }
+            for row in rows
+        }
+
+    except Error as e:
+        print(f"⚠️  Checkpoint load error: {e}")
+        return {}
+
+
+def save_search_pages(ocr_id, text_by_page):
+    """
+    Simpan semua halaman (text layer + OCR) ke ocr_pages saat OCR selesai.
+    FULLTEXT index di ocr_pages.extracted_text ikut ter-update oleh InnoDB,
+    jadi dokumen langsung bisa dicari lewat /ocr/search.
+    Halaman error tidak diindex.
+    """
+    if not ocr_id:
+        return False
+
+    now = datetime.now()
+    rows = [
+        (ocr_id, p["page"], p.get("method", "ocr"), p["text"], len(p["text"]), now)
+        for p in text_by_page if not p.get("error")
+    ]
+    if not rows:
+        return True
+
+    try:
+        with db_cursor() as cursor:
+            cursor.executemany("""
+                INSERT INTO ocr_pages (ocr_id, page_number, method, extracted_text, char_count, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    method=VALUES(method), extracted_text=VALUES(extracted_text),
+                    char_count=VALUES(char_count), created_at=VALUES(created_at)
+            """, rows)
+        print(f"🔎 Search index updated - OCR ID: {ocr_id}, {len(rows)} pages")
+        return True
+
+    except Error as e:
+        print(f"⚠️  Search index update error: {e}")
+        return False
+
+
+def ocr_images(page_images, total_pages, ocr_id=None):
+    """
+    OCR iterable (page_num, image) dan kembalikan hasil per halaman.
+    page_images biasanya generator iter_page_images, sehingga hanya
+    satu window halaman yang ada di memory.
+    Jika ocr_id diisi, setiap halaman yang berhasil disimpan sebagai checkpoint.
+    """
+    text_by_page = []
+    waited_from = time.perf_counter()
+
+    for page_num, img in page_images:
+        # Waktu menunggu generator = rasterisasi (satu window pdftoppm dibebankan ke halaman pertamanya)
+        rasterize_seconds = time.perf_counter() - waited_from
+        ocr_started = time.perf_counter()
+
+        try:
+            # Perform OCR on image
+            page_text = ocr_engine.image_to_string(img, lang=OCR_LANG)
+
+            # Clean up text
+            page_text = page_text.strip()
+            job_profile.record_page(
+                page_num, rasterize_seconds=rasterize_seconds,
+                ocr_seconds=time.perf_counter() - ocr_started, chars=len(page_text),
+                pixels=img.width * img.height
+            )
+
+            print(f"✓ Page {page_num}/{total_pages} processed - {len(page_text)} characters")
+
+            page_result = {
+                "page": page_num,
+                "method": "ocr",
+                "text": page_text,
+                "char_count": len(page_text)
+            }
+            text_by_page.append(page_result)
+            save_page_checkpoint(ocr_id, page_result)
+            metrics.count_pages("ocr")
+            progress_events.ocr_page_done(ocr_id, page_num, total_pages)
+
+        except Exception as e_page:
+            error_msg = f"ERROR OCR: {str(e_page)}"
+            print(f"✗ Page {page_num} failed: {error_msg}")
+
+            text_by_page.append({
+                "page": page_num,
+                "method": "ocr",
+                "text": error_msg,
+                "error": True
+            })
+            job_profile.record_page(page_num, rasterize_seconds=rasterize_seconds, error=True)
+            progress_events.ocr_page_done(ocr_id, page_num, total_pages, error=True)
+
+        waited_from = time.perf_counter()
+
+    return text_by_page
+
+
+def build_full_text(text_by_page):
+    """Gabungkan hasil per halaman menjadi full_text (urut nomor halaman)"""
+    full_text = ""
+    for page in sorted(text_by_page, key=lambda p: p["page"]):
+        full_text += f"\n\n===== PAGE {page['page']} =====\n{page['text']}\n"
+    return full_text
+
+
+def split_full_text(full_text):
+    """Kebalikan build_full_text: full_text → list hasil per halaman"""
+    parts = PAGE_MARKER_RE.split(full_text or "")
+    return [
+        {"page": int(parts[i]), "text": parts[i + 1].strip(), "char_count": len(parts[i + 1].strip())}
+        for i in range(1, len(parts) - 1, 2)
+    ]
+
+
+def chunk_pages(page_numbers, pages_per_chunk):
+    """Pecah list nomor halaman menjadi beberapa chunk"""
+    pages_per_chunk = max(1, int(pages_per_chunk))
+    return [
+        page_numbers[i:i + pages_per_chunk]
+        for i in range(0, len(page_numbers), pages_per_chunk)
+    ]
+
+
+def text_layer_results(classified_pages):
+    """Hasil per halaman untuk halaman yang cukup diambil dari text layer"""
+    return [
+        {
+            "page": p["page"],
+            "method": "text_layer",
+            "text": p["text"],
+            "char_count": len(p["text"])
+        }
+        for p in classified_pages if p["method"] == "text_layer"
+    ]
+
+
+def build_ocr_metadata(text_by_page, has_extractable_text):
+    """Metadata ocr_files.metadata_file, termasuk metode per halaman"""
+    pages = sorted(text_by_page, key=lambda p: p["page"])
+    return json.dumps({
+        "has_protection": not has_extractable_text,
+        "total_pages": len(pages),
+        "pages_text_layer": sum(1 for p in pages if p.get("method") == "text_layer"),
+        "pages_ocr": sum(1 for p in pages if p.get("method") == "ocr"),
+        "pages": [
+            {"page": p["page"], "method": p.get("method"), "error": p.get("error", False)}
+            for p in pages
+        ]
+    })
+
+
+def finalize_ocr(document_id, ocr_id, ocr_output_path, callback_data, text_by_page,
+                 has_extractable_text, cache_key=None):
+    """
+    Simpan hasil OCR ke file, update database, dan kirim callback ke SIRAMA.
+    Dipakai oleh mode serial maupun reducer mode paralel.
+    """
+    full_text = build_full_text(text_by_page)
+    total_pages = len(text_by_page)
+    metadata_file = build_ocr_metadata(text_by_page, has_extractable_text)
+
+    # Save extracted text to file
+    print(f"💾 Saving extracted text to: {ocr_output_path}")
+    with metrics.stage_timer("text_write"), open(ocr_output_path, "w", encoding="utf-8") as f:
+        f.write(full_text)
+
+    # ✅ UPDATE DATABASE WITH EXTRACTED TEXT
+    print(f"💾 Updating database with extracted text...")
+    update_success = update_ocr_status_in_task(
+        ocr_id,
+        "completed",
+        full_text,
+        metadata_file=metadata_file
+    )
+
+    if not update_success:
+        print(f"⚠️  Warning: Database update failed, but OCR completed")
+
+    # Index per halaman untuk full-text search
+    save_search_pages(ocr_id, text_by_page)
+
+    # Simpan ke cache hanya jika semua halaman berhasil
+    if cache_key and not any(p.get("error") for p in text_by_page):
+        pages_text_layer = sum(1 for p in text_by_page if p.get("method") == "text_layer")
+        pages_ocr = total_pages - pages_text_layer
+        ocr_cache.set_cached_ocr(cache_key, {
+            "extracted_text": full_text,
+            "method": extraction_method(pages_text_layer, pages_ocr),
+            "pages_text_layer": pages_text_layer,
+            "pages_ocr": pages_ocr,
+            "total_pages": total_pages,
+            "metadata_file": metadata_file
+        })
+
+    # Send callback to SIRAMA if letter_id provided
+    if callback_data and callback_data.get("letter_id"):
+        print(f"📤 Sending callback for letter_id: {callback_data.get('letter_id')}")
+        with metrics.stage_timer("callback"):
+            send_callback(
+                letter_id=callback_data["letter_id"],
+                extracted_text=full_text,
+                download_url=callback_data.get("download_url"),
+                has_protection=not has_extractable_text,
+                total_pages=total_pages
+            )
+
+    print(f"✅ OCR completed successfully - Total: {len(full_text)} characters")
+
+    return {
+        "status": "success",
+        "ocr_id": ocr_id,
+        "document_id": document_id,
+        "pages_processed": total_pages,
+        "has_copy_protection": not has_extractable_text,
+        "output_file": ocr_output_path,
+        "total_characters": len(full_text),
+        "database_updated": update_success
+    }
+
+
+def dispatch_parallel_ocr(document_id, ocr_id, file_path, pdf_password, ocr_output_path,
+                          callback_data, total_pages, ocr_page_numbers, text_pages,
+                          has_extractable_text, cache_key=None):
+    """
+    Kirim OCR per chunk halaman sebagai Celery chord.
+    Setiap chunk diproses oleh ocr_page_range_task di worker mana pun,
+    lalu ocr_reduce_task menggabungkan hasilnya dengan halaman text layer.
+    """
+    chunks = chunk_pages(ocr_page_numbers, OCR_PAGES_PER_CHUNK)
+
+    print(f"🔀 Page-parallel OCR: {len(ocr_page_numbers)} pages → {len(chunks)} chunks of {OCR_PAGES_PER_CHUNK}")
+
+    header = [
+        ocr_page_range_task.s(file_path, pdf_password, page_numbers, total_pages, ocr_id)
+        for page_numbers in chunks
+    ]
+    body = ocr_reduce_task.s(
+        document_id, ocr_id, ocr_output_path, callback_data, text_pages, has_extractable_text, cache_key
+    ).on_error(ocr_chord_failed.s(ocr_id, callback_data))
+
+    result = chord(header)(body)
+
+    return {
+        "status": "dispatched",
+        "ocr_id": ocr_id,
+        "document_id": document_id,
+        "total_pages": total_pages,
+        "chunks": len(chunks),
+        "reduce_task_id": result.id
+    }
+
+
 @celery.task(name="tasks.ocr_task_with_db", bind=True, max_retries=3)
-def ocr_task_with_db(self, document_id, ocr_id, file_path, pdf_password, ocr_output_path, callback_data):
+def ocr_task_with_db(self, document_id, ocr_id, file_path, pdf_password, ocr_output_path, callback_data, cache_key=None):
     """
     Async task untuk OCR PDF dengan database update
     """
+    profile = job_profile.start("ocr", input_bytes=job_profile.input_size(file_path), dpi=OCR_DPI)
+    status = "failed"
     try:
         print(f"📄 Starting OCR task - OCR ID: {ocr_id}, Document ID: {document_id}")
         print(f"📂 File: {file_path}")
@@ -100,11 +424,11 @@ def ocr_task_with_db(self, document_id, ocr_id, file_path, pdf_password, ocr_out
         # Validasi file exists
         if not os.path.exists(file_path):
             error_msg = f"File tidak ditemukan: {file_path}"
-            update_ocr_status_in_task(ocr_id, "failed", error_msg)
             raise FileNotFoundError(error_msg)
 
         # Read PDF
-        reader = PyPDF2.PdfReader(file_path)
+        with metrics.stage_timer("pdf_parse"):
+            reader = PyPDF2.PdfReader(file_path)
 
         # Handle encryption
         if reader.is_encrypted:
@@ -126,138 +450,243 @@ def ocr_task_with_db(self, document_id, ocr_id, file_path, pdf_password, ocr_out
             
             if not decrypted:
                 error_msg = "PDF terenkripsi dan password tidak valid"
-                update_ocr_status_in_task(ocr_id, "failed", error_msg)
                 raise Exception(error_msg)
 
-        # Check if PDF has copy protection
-        has_extractable_text = False
-        try:
-            for page in reader.pages:
-                text = page.extract_text()
-                if text and text.strip():
-                    has_extractable_text = True
-                    break
-        except:
-            has_extractable_text = False
-
-        if has_extractable_text:
-            print(f"ℹ️  PDF memiliki text yang bisa di-extract")
-        else:
-            print(f"🔒 PDF protected atau image-only, menggunakan OCR")
-
-        print(f"🖼️  Converting PDF to images...")
-        # Convert PDF → Images untuk OCR
-        pages = convert_from_path(
-            file_path,
-            dpi=300,
-            fmt="png",
-            userpw=pdf_password if pdf_password else None,
-            poppler_path=POPPLER_PATH if POPPLER_PATH else None
+        # Klasifikasi per halaman: text layer vs perlu OCR
+        with metrics.stage_timer("text_layer"):
+            classified_pages = classify_pages(reader)
+        total_pages = len(classified_pages)
+        text_pages = text_layer_results(classified_pages)
+        metrics.count_pages("text_layer", len(text_pages))
+        ocr_page_numbers = [p["page"] for p in classified_pages if p["method"] == "ocr"]
+        has_extractable_text = len(text_pages) > 0
+
+        print(f"ℹ️  {len(text_pages)} pages from text layer, {len(ocr_page_numbers)} pages need OCR")
+        job_profile.set_context(
+            pages=total_pages, text_layer_pages=len(text_pages), ocr_pages=len(ocr_page_numbers)
         )
 
-        # OCR process
-        ocr_lang = "eng+ind"
-        full_text = ""
-        text_by_page = []
-
-        print(f"🔍 Processing {len(pages)} pages with Tesseract OCR...")
-        for page_num, img in enumerate(pages, start=1):
-            try:
-                # Perform OCR on image
-                page_text = pytesseract.image_to_string(img, lang=ocr_lang)
-                
-                # Clean up text
-                page_text = page_text.strip()
-                
-                print(f"✓ Page {page_num}/{len(pages)} processed - {len(page_text)} characters")
-                
-                text_by_page.append({
-                    "page": page_num,
-                    "text": page_text,
-                    "char_count": len(page_text)
-                })
-
-                full_text += f"\n\n===== PAGE {page_num} =====\n{page_text}\n"
-
-            except Exception as e_page:
-                error_msg = f"ERROR OCR: {str(e_page)}"
-                print(f"✗ Page {page_num} failed: {error_msg}")
-                
-                text_by_page.append({
-                    "page": page_num,
-                    "text": error_msg,
-                    "error": True
-                })
-                
-                full_text += f"\n\n===== PAGE {page_num} =====\n{error_msg}\n"
-
-        # Save extracted text to file
-        print(f"💾 Saving extracted text to: {ocr_output_path}")
-        with open(ocr_output_path, "w", encoding="utf-8") as f:
-            f.write(full_text)
-
-        # ✅ UPDATE DATABASE WITH EXTRACTED TEXT
-        print(f"💾 Updating database with extracted text...")
-        update_success = update_ocr_status_in_task(
-            ocr_id, 
-            "completed", 
-            full_text,
-            metadata_file='{"has_protection": ' + str(not has_extractable_text).lower() + ', "total_pages": ' + str(len(pages)) + '}'
+        # Resume: halaman yang sudah di-OCR di run sebelumnya (retry/redelivery) dilewati
+        checkpoints = load_page_checkpoints(ocr_id)
+        done_pages = [checkpoints[n] for n in ocr_page_numbers if n in checkpoints]
+        ocr_page_numbers = [n for n in ocr_page_numbers if n not in checkpoints]
+        text_pages = text_pages + done_pages
+
+        if done_pages:
+            print(f"⏩ Resuming OCR - {len(done_pages)} pages from checkpoint, {len(ocr_page_numbers)} remaining")
+
+        progress_events.ocr_started(ocr_id, total_pages - len(ocr_page_numbers), total_pages)
+
+        # Dokumen besar dipecah per chunk halaman dan diproses paralel di worker lain
+        if ocr_id and len(ocr_page_numbers) >= OCR_PARALLEL_MIN_PAGES:
+            status = "dispatched"
+            return dispatch_parallel_ocr(
+                document_id, ocr_id, file_path, pdf_password,
+                ocr_output_path, callback_data, total_pages,
+                ocr_page_numbers, text_pages, has_extractable_text, cache_key
+            )
+
+        # Rasterisasi streaming hanya untuk halaman image-only
+        text_by_page = list(text_pages)
+        if ocr_page_numbers:
+            print(f"🔍 Processing {len(ocr_page_numbers)} pages with Tesseract OCR...")
+            page_images = iter_selected_page_images(
+                file_path,
+                ocr_page_numbers,
+                dpi=OCR_DPI,
+                pdf_password=pdf_password,
+                poppler_path=POPPLER_PATH
+            )
+            text_by_page += ocr_images(page_images, total_pages, ocr_id)
+
+        result = finalize_ocr(
+            document_id, ocr_id, ocr_output_path, callback_data,
+            text_by_page, has_extractable_text, cache_key
         )
-        
-        if not update_success:
-            print(f"⚠️  Warning: Database update failed, but OCR completed")
+        status = "completed"
+        return result
+
+    except Exception as e:
+        error_msg = str(e)
+        print(f"❌ OCR task failed: {error_msg}")
 
-        # Send callback to SIRAMA if letter_id provided
+        # Retry mechanism: status tetap 'processing', client SSE/long-poll hanya
+        # menerima event 'retrying' (non-terminal). 'failed' baru ditulis di attempt terakhir.
+        # Cek manual: self.retry(exc=...) me-raise exc asli (bukan MaxRetriesExceededError)
+        # jika retry sudah habis.
+        if self.request.retries < self.max_retries:
+            status = "retry"
+            progress_events.ocr_retrying(ocr_id, self.request.retries + 1, self.max_retries, error_msg, countdown=60)
+            print(f"🔄 Retrying task in 60 seconds...")
+            raise self.retry(exc=e, countdown=60)
+
+        print(f"❌ Max retries exceeded")
+        update_ocr_status_in_task(ocr_id, "failed", f"Error: {error_msg}")
+
+        # Send failed callback if applicable
         if callback_data and callback_data.get("letter_id"):
-            print(f"📤 Sending callback for letter_id: {callback_data.get('letter_id')}")
-            send_callback(
+            send_callback_failed(
                 letter_id=callback_data["letter_id"],
-                extracted_text=full_text,
-                download_url=callback_data.get("download_url"),
-                has_protection=not has_extractable_text,
-                total_pages=len(pages)
+                error=error_msg
             )
 
-        print(f"✅ OCR completed successfully - Total: {len(full_text)} characters")
-        
         return {
-            "status": "success",
+            "status": "failed",
             "ocr_id": ocr_id,
-            "document_id": document_id,
-            "pages_processed": len(pages),
-            "has_copy_protection": not has_extractable_text,
-            "output_file": ocr_output_path,
-            "total_characters": len(full_text),
-            "database_updated": update_success
+            "error": error_msg
         }
 
+    finally:
+        # Satu profil per attempt (retry menghasilkan profil baru)
+        job_profile.finish_and_save(profile, status, ocr_id=ocr_id)
+
+
+@celery.task(name="tasks.ocr_page_range_task", bind=True, max_retries=3)
+def ocr_page_range_task(self, file_path, pdf_password, page_numbers, total_pages, ocr_id=None):
+    """
+    OCR satu chunk halaman untuk mode paralel.
+    Return list hasil per halaman (lihat ocr_images).
+    """
+    profile = job_profile.start(
+        "ocr_chunk", pages=len(page_numbers), dpi=OCR_DPI,
+        first_page=page_numbers[0], last_page=page_numbers[-1]
+    )
+    status = "failed"
+    try:
+        print(f"🖼️  Processing pages {page_numbers[0]}-{page_numbers[-1]}...")
+
+        # Retry chunk: lewati halaman yang sudah ada checkpoint-nya
+        checkpoints = load_page_checkpoints(ocr_id)
+        done_pages = [checkpoints[n] for n in page_numbers if n in checkpoints]
+        remaining = [n for n in page_numbers if n not in checkpoints]
+
+        page_images = iter_selected_page_images(
+            file_path,
+            remaining,
+            dpi=OCR_DPI,
+            pdf_password=pdf_password,
+            poppler_path=POPPLER_PATH
+        )
+        results = done_pages + ocr_images(page_images, total_pages, ocr_id)
+        status = "completed"
+        return results
+
+    except Exception as e:
+        print(f"❌ OCR chunk {page_numbers[0]}-{page_numbers[-1]} failed: {str(e)}")
+        status = "retry"
+        raise self.retry(exc=e, countdown=30)
+
+    finally:
+        job_profile.finish_and_save(profile, status, ocr_id=ocr_id)
+
+
+@celery.task(name="tasks.ocr_reduce_task")
+def ocr_reduce_task(chunk_results, document_id, ocr_id, ocr_output_path, callback_data,
+                    text_pages, has_extractable_text, cache_key=None):
+    """
+    Reducer mode paralel: gabungkan hasil semua chunk dengan halaman
+    text layer, update ocr_files dan kirim callback.
+    """
+    text_by_page = list(text_pages) + [page for chunk in chunk_results for page in chunk]
+    print(f"🧩 Reducing {len(chunk_results)} chunks ({len(text_by_page)} pages) - OCR ID: {ocr_id}")
+
+    profile = job_profile.start("ocr_finalize", pages=len(text_by_page), chunks=len(chunk_results))
+    status = "failed"
+    try:
+        result = finalize_ocr(
+            document_id, ocr_id, ocr_output_path, callback_data,
+            text_by_page, has_extractable_text, cache_key
+        )
+        status = "completed"
+        return result
+    finally:
+        job_profile.finish_and_save(profile, status, ocr_id=ocr_id)
+
+
+@celery.task(name="tasks.ocr_chord_failed")
+def ocr_chord_failed(request, exc, traceback, ocr_id, callback_data):
+    """Errback chord: tandai OCR gagal jika ada chunk yang gagal permanen"""
+    error_msg = str(exc)
+    print(f"❌ Parallel OCR failed - OCR ID: {ocr_id}: {error_msg}")
+
+    update_ocr_status_in_task(ocr_id, "failed", f"Error: {error_msg}")
+
+    if callback_data and callback_data.get("letter_id"):
+        send_callback_failed(
+            letter_id=callback_data["letter_id"],
+            error=error_msg
+        )
+
+
+@celery.task(name="tasks.run_job_task", bind=True)
+def run_job_task(self, job_id):
+    """
+    Generic job runner: jalankan handler tool (compress, convert, merge, split)
+    dan simpan status/progress/hasil ke tabel jobs.
+    Tidak raise, supaya endpoint yang menunggu hasil selalu mendapat dict.
+    """
+    job = jobs.get_job(job_id)
+    if not job:
+        print(f"❌ Job not found: {job_id}")
+        return {"status": "failed", "job_id": job_id, "error": "Job not found"}
+
+    if not jobs.start_job(job_id):
+        print(f"⏭️  Job {job_id} skipped (status: {job['status']})")
+        return {"status": job["status"], "job_id": job_id}
+
+    handler = tool_handlers.HANDLERS.get(job["tool"])
+    if handler is None:
+        error_msg = f"Unknown tool: {job['tool']}"
+        jobs.finish_job(job_id, jobs.JOB_FAILED, error=error_msg)
+        metrics.count_failure(job["tool"])
+        return {"status": "failed", "job_id": job_id, "error": error_msg}
+
+    params = job["params"] or {}
+    input_paths = params.get("input_paths") or [params.get("input_path")]
+    profile = job_profile.start(
+        job["tool"], input_bytes=job_profile.input_size(*input_paths), input_files=len(input_paths)
+    )
+    status = jobs.JOB_FAILED
+
+    try:
+        print(f"🛠️  Starting job {job_id} ({job['tool']})")
+        result = handler(job["params"], jobs.progress_reporter(job_id))
+        jobs.finish_job(job_id, jobs.JOB_COMPLETED, result=result)
+        status = jobs.JOB_COMPLETED
+        print(f"✅ Job {job_id} completed")
+        return {"status": "completed", "job_id": job_id, "result": result}
+
     except Exception as e:
         error_msg = str(e)
-        print(f"❌ OCR task failed: {error_msg}")
-        
-        # Update database to failed
-        update_ocr_status_in_task(ocr_id, "failed", f"Error: {error_msg}")
-        
-        # Retry mechanism
-        try:
-            print(f"🔄 Retrying task in 60 seconds...")
-            raise self.retry(exc=e, countdown=60)
-        except self.MaxRetriesExceededError:
-            print(f"❌ Max retries exceeded")
-            
-            # Send failed callback if applicable
-            if callback_data and callback_data.get("letter_id"):
-                send_callback_failed(
-                    letter_id=callback_data["letter_id"],
-                    error=error_msg
-                )
-            
-            return {
-                "status": "failed",
-                "ocr_id": ocr_id,
-                "error": error_msg
-            }
+        error_type = tool_handlers.error_type(e)
+        print(f"❌ Job {job_id} failed: {error_msg}")
+        # error_type di result: endpoint membedakan input tidak valid (4xx) dari error server (5xx)
+        jobs.finish_job(
+            job_id, jobs.JOB_FAILED, error=error_msg,
+            result={"error_type": error_type} if error_type else None
+        )
+        metrics.count_failure(job["tool"])
+        return {"status": "failed", "job_id": job_id, "error": error_msg, "error_type": error_type}
+
+    finally:
+        job_profile.finish_and_save(profile, status, job_id=job_id)
+
+
+@celery.task(name="tasks.reconcile_ocr_stats_task")
+def reconcile_ocr_stats_task():
+    """
+    Periodik (Celery beat): samakan counter ocr_stats dan ocr_stats_daily
+    (OCR_STATS_RECONCILE_DAYS hari terakhir) dengan isi ocr_files
+    """
+    try:
+        with db_cursor() as cursor:
+            actual = ocr_stats.reconcile(cursor, days=OCR_STATS_RECONCILE_DAYS)
+        print(f"📊 OCR stats reconciled: {actual} (daily: {OCR_STATS_RECONCILE_DAYS} hari)")
+        return {"status": "success", "counts": actual}
+
+    except Error as e:
+        print(f"❌ OCR stats reconcile error: {e}")
+        return {"status": "failed", "error": str(e)}
 
 
 # Keep old task for backward compatibility
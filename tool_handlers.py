@@ -0,0 +1,351 @@
+# tool_handlers.py
+import os
+import json
+import uuid
+import shutil
+import subprocess
+from datetime import datetime
+import PyPDF2
+from PyPDF2.errors import PdfReadError
+from PIL import UnidentifiedImageError
+from db import db_cursor
+from pdf_compress import compress_pdf_file
+import office_pool
+import image_pdf
+import pdf_merge
+import metrics
+
+# Pekerjaan berat setiap tool (Ghostscript, LibreOffice, PIL, PyPDF2).
+# Dijalankan oleh Celery task run_job_task; endpoint Flask hanya menyimpan
+# upload, membuat record dan enqueue job.
+#
+# Setiap handler: handler(params, progress) → dict hasil (JSON serializable).
+# progress(percent) opsional untuk update progress job.
+# Raise Exception jika gagal (record tool sudah di-set failed). ValueError dan
+# file input rusak/tidak dikenal (INPUT_ERRORS) berarti kesalahan input client:
+# endpoint membalas 422, bukan 500.
+
+INPUT_ERRORS = (ValueError, PdfReadError, UnidentifiedImageError)
+
+ERROR_TYPE_INPUT = "invalid_input"
+
+
+def format_size(size_bytes):
+    """Ukuran human readable, format sama dengan convert_size di app.py"""
+    size_bytes = float(size_bytes)
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if size_bytes < 1024:
+            return f"{size_bytes:.2f}{unit}"
+        size_bytes /= 1024
+
+
+def error_type(exc):
+    """Klasifikasi error handler untuk job result: ERROR_TYPE_INPUT atau None (error server)"""
+    return ERROR_TYPE_INPUT if isinstance(exc, INPUT_ERRORS) else None
+
+
+# ===================== STATUS RECORD PER TOOL =====================
+def update_compress_status(compress_id, status, output_path=None, output_size=None):
+    sql = """
+        UPDATE compressed_files
+        SET status=%s, extracted_path=%s, extracted_size=%s, updated_at=%s
+        WHERE id=%s
+    """
+
+    now = datetime.now()
+
+    with db_cursor() as cursor:
+        cursor.execute(sql, (status, output_path, output_size, now, compress_id))
+
+
+def update_convert_status(convert_id, status, converted_path=None, converted_file_name=None):
+    sql = """
+        UPDATE convert_files
+        SET status=%s, converted_path=%s, converted_file_name=%s, updated_at=%s
+        WHERE id=%s
+    """
+
+    now = datetime.now()
+    with db_cursor() as cursor:
+        cursor.execute(sql, (status, converted_path, converted_file_name, now, convert_id))
+
+
+def update_merge_status(merge_id, status, merged_path=None, merged_file_name=None, merged_size=None):
+    sql = """
+        UPDATE merge_files
+        SET status=%s, merged_path=%s, merged_file_name=%s, merged_size=%s, updated_at=%s
+        WHERE id=%s
+    """
+
+    now = datetime.now()
+    with db_cursor() as cursor:
+        cursor.execute(sql, (status, merged_path, merged_file_name, merged_size, now, merge_id))
+
+
+def update_split_status(split_id, status, splited_path=None, splited_file_name=None, splited_size=None):
+    sql = """
+        UPDATE split_files
+        SET status=%s, splited_path=%s, splited_file_name=%s, splited_size=%s, updated_at=%s
+        WHERE id=%s
+    """
+
+    now = datetime.now()
+    with db_cursor() as cursor:
+        cursor.execute(sql, (status, splited_path, splited_file_name, splited_size, now, split_id))
+
+
+def mark_record(tool, params, status):
+    """Set status record tool (mis. failed/cancelled) tanpa output"""
+    try:
+        if tool == "compress":
+            update_compress_status(params["compress_id"], status)
+        elif tool in ("convert-doc", "convert-ppt", "convert-image"):
+            update_convert_status(params["convert_id"], status)
+        elif tool == "merge":
+            update_merge_status(params["merge_id"], status)
+        elif tool == "split":
+            update_split_status(params["split_id"], status)
+    except Exception as e:
+        print(f"⚠️  Failed to mark {tool} record as {status}: {e}")
+
+
+# ===================== HANDLERS =====================
+def run_compress(params, progress=None):
+    compress_id = params["compress_id"]
+    input_path = params["input_path"]
+    output_path = params["output_path"]
+
+    update_compress_status(compress_id, "processing")
+
+    result = compress_pdf_file(input_path, output_path)
+
+    if result["status"] == "failed":
+        update_compress_status(compress_id, "failed")
+        raise Exception(result["error"])
+
+    # File sudah optimal: simpan original sebagai hasil agar download tetap seragam
+    if result["status"] == "optimal":
+        shutil.copyfile(input_path, output_path)
+
+    output_size = os.path.getsize(output_path)
+    update_compress_status(compress_id, "completed", output_path, str(output_size))
+
+    response = {
+        "original_size": result["original_size"],
+        "compressed_size": output_size,
+        "reduction_percent": result["reduction_percent"],
+        "download_path": f"/download/compressed/{os.path.basename(output_path)}"
+    }
+
+    if result["status"] == "optimal":
+        response["message"] = "File PDF sudah optimal, tidak perlu dikompres"
+        response["note"] = "File original dikembalikan karena sudah dalam ukuran optimal"
+    else:
+        response["message"] = "Berhasil mengkompres PDF"
+
+    return response
+
+
+def run_convert_office(params, progress=None):
+    """DOC/DOCX/PPT/PPTX → PDF via pool LibreOffice warm"""
+    convert_id = params["convert_id"]
+
+    try:
+        output_pdf = office_pool.convert_to_pdf(
+            params["input_path"], params["output_dir"], timeout=params.get("timeout")
+        )
+    except subprocess.TimeoutExpired:
+        update_convert_status(convert_id, "failed")
+        raise Exception("Conversion timeout: File terlalu besar atau kompleks")
+    except Exception:
+        update_convert_status(convert_id, "failed")
+        raise
+
+    pdf_filename = os.path.basename(output_pdf)
+    update_convert_status(convert_id, "completed", output_pdf, pdf_filename)
+
+    return {
+        "message": f"{params['original_format'].upper()} to PDF conversion completed",
+        "converted_filename": pdf_filename,
+        "download_path": f"/download/converted/{pdf_filename}"
+    }
+
+
+def run_convert_image(params, progress=None):
+    convert_id = params["convert_id"]
+    # Job lama (sebelum multi-image) hanya punya input_path
+    input_paths = params.get("input_paths") or [params["input_path"]]
+
+    try:
+        # Generate PDF filename
+        pdf_filename = f"{uuid.uuid4().hex}.pdf"
+        pdf_path = os.path.join(params["output_dir"], pdf_filename)
+        with metrics.stage_timer("image_convert"):
+            stats = image_pdf.images_to_pdf(input_paths, pdf_path, progress)
+
+    except Exception:
+        update_convert_status(convert_id, "failed")
+        raise
+
+    update_convert_status(convert_id, "completed", pdf_path, pdf_filename)
+
+    return {
+        "message": "Image to PDF conversion completed",
+        "converted_filename": pdf_filename,
+        "total_images": len(input_paths),
+        "total_pages": stats["pages"],
+        "passthrough_pages": stats["passthrough_pages"],
+        "reduced_pages": stats["reduced_pages"],
+        "download_path": f"/download/converted/{pdf_filename}"
+    }
+
+
+def run_merge(params, progress=None):
+    merge_id = params["merge_id"]
+    input_paths = params["input_paths"]
+
+    try:
+        # Generate merged PDF filename
+        merged_filename = f"merged_{uuid.uuid4().hex}.pdf"
+        merged_path = os.path.join(params["output_dir"], merged_filename)
+
+        merge_stats = pdf_merge.merge_pdfs(input_paths, merged_path, progress, params.get("page_counts"))
+
+        merged_size = os.path.getsize(merged_path)
+
+        # Update merge status with completed info
+        update_merge_status(merge_id, "completed", merged_path, merged_filename, format_size(merged_size))
+
+        # Update document_ids in merge table
+        with db_cursor() as cursor:
+            cursor.execute("UPDATE merge_files SET document_id=%s WHERE id=%s",
+                           (json.dumps(params["document_ids"]), merge_id))
+
+    except Exception:
+        update_merge_status(merge_id, "failed")
+        raise
+
+    finally:
+        # Clean up temporary files (upload saja; input referensi/document_id tidak dihapus).
+        # Job lama tanpa temp_paths: semua input adalah upload.
+        for temp_file in params.get("temp_paths", input_paths):
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+
+    return {
+        "message": "PDF merge completed",
+        "merged_filename": merged_filename,
+        "files_merged": len(input_paths),
+        "total_pages": merge_stats["pages"],
+        "deduplicated_objects": merge_stats["deduplicated_objects"],
+        "merged_size": format_size(merged_size),
+        "download_path": f"/download/merged/{merged_filename}"
+    }
+
+
+def parse_page_ranges(page_ranges, total_pages):
+    """
+    "1-3,5,7-9" → [(output_filename, [page_index, ...]), ...]
+    Tanpa page_ranges: setiap halaman jadi file sendiri.
+    """
+    if not page_ranges:
+        return [(f"page_{i + 1}.pdf", [i]) for i in range(total_pages)]
+
+    parts = []
+    for range_str in page_ranges.split(','):
+        range_str = range_str.strip()
+
+        if '-' in range_str:
+            # Range: 1-3
+            start, end = map(int, range_str.split('-'))
+            pages = [i for i in range(start - 1, end) if i < total_pages]
+            parts.append((f"pages_{start}-{end}.pdf", pages))
+        else:
+            # Single page: 5
+            page_num = int(range_str) - 1
+            if page_num < total_pages:
+                parts.append((f"page_{page_num + 1}.pdf", [page_num]))
+
+    return parts
+
+
+def split_pdf(input_path, output_folder, page_ranges=None, progress=None):
+    """
+    Pecah PDF ke output_folder sesuai page_ranges.
+    Return (total_pages, split_files, total_split_size).
+    """
+    with metrics.stage_timer("pdf_parse"):
+        reader = PyPDF2.PdfReader(input_path)
+        total_pages = len(reader.pages)
+
+    split_files = []
+    total_split_size = 0
+
+    parts = parse_page_ranges(page_ranges, total_pages)
+    for i, (output_filename, page_indexes) in enumerate(parts, start=1):
+        writer = PyPDF2.PdfWriter()
+        for page_num in page_indexes:
+            writer.add_page(reader.pages[page_num])
+
+        output_path = os.path.join(output_folder, output_filename)
+        with metrics.stage_timer("split_write"), open(output_path, 'wb') as output_file:
+            writer.write(output_file)
+
+        total_split_size += os.path.getsize(output_path)
+        split_files.append(output_filename)
+
+        if progress:
+            progress(int(i / len(parts) * 100))
+
+    return total_pages, split_files, total_split_size
+
+
+def run_split(params, progress=None):
+    split_id = params["split_id"]
+
+    try:
+        # Create folder for split files
+        split_folder_name = f"split_{uuid.uuid4().hex}"
+        split_folder_path = os.path.join(params["output_dir"], split_folder_name)
+        os.makedirs(split_folder_path, exist_ok=True)
+
+        total_pages, split_files, total_split_size = split_pdf(
+            params["input_path"], split_folder_path, params.get("page_ranges"), progress
+        )
+
+        # Store first split file name as representative
+        first_split_file = split_files[0] if split_files else None
+        update_split_status(
+            split_id,
+            "completed",
+            split_folder_path,
+            first_split_file,
+            format_size(total_split_size)
+        )
+
+    except Exception:
+        update_split_status(split_id, "failed")
+        raise
+
+    return {
+        "message": "PDF split completed",
+        "total_pages": total_pages,
+        "split_count": len(split_files),
+        "split_files": split_files,
+        "total_split_size": format_size(total_split_size),
+        "download_folder": f"/download/splitted/{split_folder_name}",
+        # Semua hasil split sebagai satu ZIP streaming (?pages=... untuk sebagian)
+        "download_path": f"/download/zip/splitted/{split_folder_name}"
+    }
+
+
+HANDLERS = {
+    "compress": run_compress,
+    "convert-doc": run_convert_office,
+    "convert-ppt": run_convert_office,
+    "convert-image": run_convert_image,
+    "merge": run_merge,
+    "split": run_split,
+}
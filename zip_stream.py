@@ -0,0 +1,65 @@
+# zip_stream.py
+import os
+import zipfile
+
+# ZIP dibuat sambil dikirim (response streaming), tanpa file arsip di disk
+# dan tanpa menampung seluruh arsip di memory: zipfile menulis ke buffer
+# yang tidak seekable, sehingga ukuran/CRC tiap file ditulis di data
+# descriptor setelah isinya. Memory ≈ satu chunk.
+#
+# PDF hasil tool sudah terkompresi, jadi default ZIP_STORED (tanpa deflate):
+# CPU hampir nol dan ukuran arsip praktis sama.
+
+ZIP_STREAM_CHUNK = int(os.getenv("ZIP_STREAM_CHUNK", 1024 * 1024))
+
+
+class _StreamBuffer:
+    """File-like write-only tanpa seek/tell: zipfile otomatis memakai data descriptor"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_zip(entries, compression=zipfile.ZIP_STORED, chunk_size=None):
+    """
+    entries: [(arcname, path), ...] → generator bytes arsip ZIP.
+    File dibaca per chunk, setiap chunk langsung di-yield.
+    """
+    chunk_size = chunk_size or ZIP_STREAM_CHUNK
+    buffer = _StreamBuffer()
+
+    with zipfile.ZipFile(buffer, "w", compression=compression, allowZip64=True) as archive:
+        for arcname, path in entries:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compression
+
+            with open(path, "rb") as source, archive.open(info, "w", force_zip64=info.file_size > 0x7FFFFFFF) as target:
+                while True:
+                    chunk = source.read(chunk_size)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    data = buffer.pop()
+                    if data:
+                        yield data
+
+            data = buffer.pop()
+            if data:
+                yield data
+
+    # Central directory
+    data = buffer.pop()
+    if data:
+        yield data